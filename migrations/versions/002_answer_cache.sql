@@ -0,0 +1,15 @@
+-- Final-answer cache: completed answers reused for identical (normalized query, domain, config) keys.
+CREATE TABLE IF NOT EXISTS app.answer_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    domain_id VARCHAR(128) NOT NULL,
+    query TEXT NOT NULL,
+    request_id UUID NOT NULL,
+    final_answer TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_answer_cache_expires_at ON app.answer_cache(expires_at);
+
+-- Requests answered from the cache point at the request that produced the answer
+ALTER TABLE app.requests ADD COLUMN IF NOT EXISTS cached_from UUID;
@@ -0,0 +1,16 @@
+-- Durable work queue for POST /query?mode=async; one job per request, claimed with FOR UPDATE SKIP LOCKED.
+CREATE TABLE IF NOT EXISTS app.jobs (
+    request_id UUID PRIMARY KEY,
+    domain_id VARCHAR(128) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(32) NOT NULL DEFAULT 'queued',
+    attempts INT NOT NULL DEFAULT 0,
+    locked_by TEXT,
+    locked_until TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Only unfinished jobs are ever scanned by workers
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON app.jobs(created_at) WHERE status IN ('queued', 'running');
@@ -0,0 +1,10 @@
+-- migrate: no-transaction
+-- Indexes for GET /requests: keyset pages ordered by (created_at DESC, id DESC), optionally filtered
+-- by domain or status. Built CONCURRENTLY so applying this to a busy table does not block writes.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_requests_created_id ON app.requests(created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_requests_domain_created_id ON app.requests(domain_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_requests_status_created_id ON app.requests(status, created_at DESC, id DESC);
+
+-- Superseded: each is a prefix of one of the indexes above
+DROP INDEX CONCURRENTLY IF EXISTS app.idx_requests_created_at;
+DROP INDEX CONCURRENTLY IF EXISTS app.idx_requests_domain_id;
@@ -0,0 +1,104 @@
+-- Range-partition requests, plans and step_results by created_at, one partition per month, so
+-- each partition's indexes stay small and old history is detached, archived or dropped a
+-- partition at a time (scripts/partitions.py) instead of by DELETE.
+--
+-- Existing rows are copied into the new tables in this one transaction. Primary keys now include
+-- created_at (required for partitioned tables), so plans and step_results can no longer carry a
+-- foreign key to app.requests; retention removes the same months from all three tables instead.
+-- A plan row takes its request's created_at, which keeps (request_id, created_at) unique and the
+-- plan in its request's partition. Rows outside the pre-created months land in a DEFAULT partition.
+DO $$
+DECLARE
+    idx text;
+    t text;
+    lo timestamptz;
+    last_month timestamptz;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'app.requests'::regclass) THEN
+        RETURN;  -- already partitioned
+    END IF;
+    PERFORM set_config('TimeZone', 'UTC', true);  -- month boundaries in UTC
+
+    -- Free the index and constraint names for the new tables
+    FOR idx IN
+        SELECT ic.relname FROM pg_index i JOIN pg_class ic ON ic.oid = i.indexrelid
+        WHERE i.indrelid IN ('app.requests'::regclass, 'app.plans'::regclass, 'app.step_results'::regclass)
+    LOOP
+        EXECUTE format('ALTER INDEX app.%I RENAME TO %I', idx, left(idx, 55) || '_legacy');
+    END LOOP;
+    ALTER TABLE app.step_results RENAME TO step_results_legacy;
+    ALTER TABLE app.plans RENAME TO plans_legacy;
+    ALTER TABLE app.requests RENAME TO requests_legacy;
+
+    CREATE TABLE app.requests (
+        id UUID NOT NULL DEFAULT gen_random_uuid(),
+        domain_id VARCHAR(128) NOT NULL,
+        query TEXT NOT NULL,
+        status VARCHAR(32) NOT NULL DEFAULT 'running',
+        final_answer TEXT,
+        error_message TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        cached_from UUID,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    CREATE TABLE app.plans (
+        id UUID NOT NULL DEFAULT gen_random_uuid(),
+        request_id UUID NOT NULL,
+        steps JSONB NOT NULL DEFAULT '[]',
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, created_at),
+        UNIQUE (request_id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    CREATE TABLE app.step_results (
+        id UUID NOT NULL DEFAULT gen_random_uuid(),
+        request_id UUID NOT NULL,
+        step_index INT NOT NULL,
+        agent_name VARCHAR(128) NOT NULL,
+        input_payload JSONB,
+        output_payload JSONB,
+        status VARCHAR(32) NOT NULL DEFAULT 'success',
+        latency_ms INT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    -- Monthly partitions from the oldest row through three months ahead, plus a DEFAULT each
+    SELECT date_trunc('month', COALESCE(min(c), now())) INTO lo FROM (
+        SELECT min(created_at) AS c FROM app.requests_legacy
+        UNION ALL SELECT min(created_at) FROM app.plans_legacy
+        UNION ALL SELECT min(created_at) FROM app.step_results_legacy
+    ) m;
+    last_month := date_trunc('month', now()) + interval '3 months';
+    WHILE lo <= last_month LOOP
+        FOREACH t IN ARRAY ARRAY['requests', 'plans', 'step_results'] LOOP
+            EXECUTE format(
+                'CREATE TABLE app.%I PARTITION OF app.%I FOR VALUES FROM (%L) TO (%L)',
+                t || '_p' || to_char(lo, 'YYYY_MM'), t, lo, lo + interval '1 month'
+            );
+        END LOOP;
+        lo := lo + interval '1 month';
+    END LOOP;
+    FOREACH t IN ARRAY ARRAY['requests', 'plans', 'step_results'] LOOP
+        EXECUTE format('CREATE TABLE app.%I PARTITION OF app.%I DEFAULT', t || '_default', t);
+    END LOOP;
+
+    INSERT INTO app.requests (id, domain_id, query, status, final_answer, error_message, created_at, updated_at, cached_from)
+    SELECT id, domain_id, query, status, final_answer, error_message, created_at, updated_at, cached_from FROM app.requests_legacy;
+    INSERT INTO app.plans (id, request_id, steps, created_at)
+    SELECT p.id, p.request_id, p.steps, r.created_at FROM app.plans_legacy p JOIN app.requests_legacy r ON r.id = p.request_id;
+    INSERT INTO app.step_results (id, request_id, step_index, agent_name, input_payload, output_payload, status, latency_ms, created_at)
+    SELECT id, request_id, step_index, agent_name, input_payload, output_payload, status, latency_ms, created_at FROM app.step_results_legacy;
+
+    DROP TABLE app.step_results_legacy, app.plans_legacy, app.requests_legacy;
+
+    -- Same index names as 001/004, now partitioned indexes (one per partition). Plans are looked up
+    -- through their (request_id, created_at) unique index.
+    CREATE INDEX idx_requests_created_id ON app.requests(created_at DESC, id DESC);
+    CREATE INDEX idx_requests_domain_created_id ON app.requests(domain_id, created_at DESC, id DESC);
+    CREATE INDEX idx_requests_status_created_id ON app.requests(status, created_at DESC, id DESC);
+    CREATE INDEX idx_step_results_request_id ON app.step_results(request_id);
+END
+$$;
@@ -0,0 +1,32 @@
+-- migrate: no-transaction
+-- Step results take their request's created_at, as plans already do since 005, so a request's
+-- steps sit in its partition and lookups by (request_id, created_at) prune to that one partition.
+-- Rows written before this keep their own insert time; move them next to their request.
+--
+-- Changing the partition key moves each row (a delete plus an insert), so the rows are moved one
+-- day of step_results.created_at at a time, committing after each day: locks, WAL and the undo of
+-- a failure stay at one day's rows and the table stays writable throughout. A step's request
+-- always starts before the step, so moved rows only land in days already walked. Safe to rerun;
+-- it resumes where it stopped.
+DO $$
+DECLARE
+    lo timestamptz;
+    last_day timestamptz;
+    moved bigint;
+BEGIN
+    SELECT date_trunc('day', min(created_at)), date_trunc('day', max(created_at)) INTO lo, last_day FROM app.step_results;
+    WHILE lo <= last_day LOOP
+        UPDATE app.step_results s
+        SET created_at = r.created_at
+        FROM app.requests r
+        WHERE s.created_at >= lo AND s.created_at < lo + interval '1 day'
+          AND s.request_id = r.id AND s.created_at <> r.created_at;
+        GET DIAGNOSTICS moved = ROW_COUNT;
+        IF moved > 0 THEN
+            RAISE NOTICE 'step_results %: % rows moved', lo::date, moved;
+        END IF;
+        COMMIT;
+        lo := lo + interval '1 day';
+    END LOOP;
+END
+$$;
@@ -0,0 +1,4 @@
+-- The QueryRequest a request was submitted with (no_cache, session_id, ...), so a request
+-- recovered after a crash (jobs.recover_stale_requests) resumes with the same options.
+-- Nullable, no default: adding it is a catalog-only change on every partition.
+ALTER TABLE app.requests ADD COLUMN IF NOT EXISTS payload JSONB;
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark orchestrator -> agent call overhead: a fresh httpx client per step (old executor)
+vs. the shared keep-alive client in src/orchestrator/agent_client.py.
+
+Starts local stub agents (no LLM, no DB) that answer /invoke immediately, so the timings
+are pure HTTP + connection cost. Usage: PYTHONPATH=. python scripts/bench_agent_client.py --plans 200 --steps 3
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx
+
+from src.core.config.models import AgentConfig, DomainConfig
+from src.core.contracts.orchestrator import Plan, Step
+from src.orchestrator import agent_client
+from src.orchestrator.executor import run_plan
+
+_BODY = json.dumps({"result": "ok", "status": "success", "latency_ms": 0}).encode()
+_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: "
+    + str(len(_BODY)).encode()
+    + b"\r\n\r\n"
+    + _BODY
+)
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Minimal HTTP/1.1 keep-alive server: read headers + body, always answer 200."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            writer.write(_RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run_fresh_client(plan: Plan, config: DomainConfig) -> None:
+    """Old behaviour: one AsyncClient (and TCP connection) per step."""
+    for step in plan.steps:
+        agent = config.get_agent_by_name(step.agent_name)
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            r = await client.post(f"http://127.0.0.1:{agent.port}/invoke", json={"task": step.task_description, "context": ""})
+            r.raise_for_status()
+
+
+async def main_async(plans: int, steps: int) -> None:
+    servers = [await asyncio.start_server(_handle, "127.0.0.1", 0) for _ in range(steps)]
+    agents = [
+        AgentConfig(name=f"stub{i}", port=srv.sockets[0].getsockname()[1], system_prompt="")
+        for i, srv in enumerate(servers)
+    ]
+    config = DomainConfig(
+        domain_id="bench",
+        domain_name="bench",
+        env_file_path="",
+        orchestrator=AgentConfig(name="orchestrator", port=0, system_prompt=""),
+        agents=agents,
+    )
+    plan = Plan(steps=[Step(step_index=i + 1, agent_name=a.name, task_description="ping") for i, a in enumerate(agents)])
+
+    start = time.perf_counter()
+    for _ in range(plans):
+        await _run_fresh_client(plan, config)
+    before = time.perf_counter() - start
+
+    # Silence run_step's per-step console output for the measured loop.
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(plans):
+            await run_plan(plan, "bench", config)
+        after = time.perf_counter() - start
+    stats = agent_client.agent_client_stats()
+    await agent_client.close_agent_client()
+    for srv in servers:
+        srv.close()
+
+    calls = plans * steps
+    print(f"{plans} plans x {steps} steps = {calls} agent calls")
+    print(f"  fresh client per step : {before * 1000 / calls:8.3f} ms/call  ({calls} TCP connections)")
+    print(f"  shared keep-alive     : {after * 1000 / calls:8.3f} ms/call  ({stats['connections_opened']} TCP connections)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plans", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.plans, args.steps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark a named query tool against the same question asked through free-form query_facts.
+
+Both run against the real data source from the domain config (pooled client, read-only
+transaction, row cap). query_facts additionally pays for the EXPLAIN pre-flight and a fresh
+parse/plan of literal SQL; the named query binds parameters to a cached prepared statement.
+
+Usage:
+  PYTHONPATH=. python scripts/bench_named_queries.py defect_rate_by_line \\
+      --args '{"start_date": "2024-01-01", "end_date": "2024-01-31"}' \\
+      --sql "SELECT line_id, ... WHERE run_date BETWEEN '2024-01-01' AND '2024-01-31' GROUP BY line_id" -n 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.core.config.loader import load_domain_config
+from src.data_access.factory import build_clients
+from src.data_access.relational.client import PostgresClient
+from src.tools.rel_db.named import create_named_query_tool, find_named_query
+from src.tools.rel_db.query import create_query_facts_tool
+
+
+async def _time(label: str, call, n: int) -> float:
+    await call()  # warm-up: pool connection, statement cache
+    start = time.perf_counter()
+    for _ in range(n):
+        await call()
+    per_call = (time.perf_counter() - start) * 1000 / n
+    print(f"  {label:<22}: {per_call:8.3f} ms/call")
+    return per_call
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    config = load_domain_config(args.config, project_root=ROOT)
+    clients = build_clients(config, ROOT)
+    found = find_named_query(clients, args.name)
+    if found is None:
+        print(f"Named query {args.name} not found in {args.config}", file=sys.stderr)
+        sys.exit(1)
+    client, nq = found
+    named_tool = create_named_query_tool(client, nq)
+    facts_tool = create_query_facts_tool(client)
+    tool_args = json.loads(args.args)
+
+    print(f"{args.name} vs query_facts on {client.source_id}, {args.n} calls each")
+    named_ms = await _time("named query", lambda: named_tool.ainvoke(tool_args), args.n)
+    if args.sql:
+        facts_ms = await _time("query_facts (free SQL)", lambda: facts_tool.ainvoke({"query": args.sql}), args.n)
+        print(f"  speed-up               : {facts_ms / named_ms:8.2f}x")
+    for c in clients.values():
+        if isinstance(c, PostgresClient):
+            await c.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a named query tool with free-form query_facts.")
+    parser.add_argument("name", help="Named query (tool) name from data_sources[].named_queries")
+    parser.add_argument("--args", default="{}", help="Tool arguments as JSON")
+    parser.add_argument("--sql", default="", help="Equivalent free-form SELECT for query_facts (literals inlined)")
+    parser.add_argument("-n", type=int, default=200, help="Calls per variant")
+    parser.add_argument("--config", default=os.environ.get("CONFIG_PATH", "config/domains/manufacturing.json"))
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,34 @@
 #!/usr/bin/env python3
-"""Run migrations against POSTGRES_APP_URL."""
+"""
+Apply migrations/versions/*.sql to POSTGRES_APP_URL, in file name order, each at most once.
+
+Applied files are recorded in app.schema_migrations with a SHA-256 checksum; a recorded file
+whose content has changed stops the run (add a new file instead of editing an applied one).
+Each file runs as one script in its own transaction, together with its ledger row, so DO
+blocks and function bodies need no special care and a failed file leaves nothing behind.
+
+A file with a `-- migrate: no-transaction` line runs statement by statement
+outside a transaction instead, as CREATE INDEX CONCURRENTLY requires. Write such files to be
+rerunnable (IF NOT EXISTS): a failure midway leaves the earlier statements applied, and a failed
+concurrent build leaves an INVALID index behind that must be dropped before the rerun.
+
+A database migrated before the ledger existed must be adopted once with --baseline: it records
+every file up to and including the given version as applied, without running them. Until then
+the runner refuses to replay files against a schema that already has app.requests.
+
+Usage:
+  PYTHONPATH=. python scripts/migrate.py [--dry-run] [--lock-timeout 5s]
+  PYTHONPATH=. python scripts/migrate.py --baseline 005_partition_history
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
 import os
+import re
 import sys
+import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent
@@ -15,39 +42,196 @@ for p in [ROOT / "config" / "env" / ".env", ROOT / ".env"]:
         load_dotenv(p)
         break
 
-POSTGRES_APP_URL = os.getenv("POSTGRES_APP_URL")
-if not POSTGRES_APP_URL:
-    print("POSTGRES_APP_URL not set. Set it in config/env/.env or .env")
-    sys.exit(1)
-
-# asyncpg URL -> psycopg2-style for running raw SQL (sync)
-# We run SQL with asyncpg in sync style via asyncio.run, or use a sync driver.
-# Simplest: use asyncpg with asyncio to run the migration file.
-import asyncio
 import asyncpg
 
+VERSIONS_DIR = ROOT / "migrations" / "versions"
+NO_TRANSACTION = re.compile(r"^\s*--\s*migrate:\s*no-transaction\s*$", re.MULTILINE)
+_LOCK_ID = 0x6D696772  # pg_advisory_lock key: one runner at a time
+_DOLLAR_TAG = re.compile(r"\$[A-Za-z_0-9]*\$")
+# CREATE [UNIQUE] INDEX CONCURRENTLY [IF NOT EXISTS] name ON [ONLY] [schema.]table; the index lives in the table's schema
+_CONCURRENT_INDEX = re.compile(
+    r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(?:ONLY\s+)?(?:(\w+)\.)?\w+",
+    re.IGNORECASE,
+)
 
-async def run_migration():
-    # asyncpg uses postgresql:// not postgresql+asyncpg://
-    url = POSTGRES_APP_URL.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(url)
+LEDGER_SQL = """
+CREATE SCHEMA IF NOT EXISTS app;
+CREATE TABLE IF NOT EXISTS app.schema_migrations (
+    version TEXT PRIMARY KEY,
+    checksum CHAR(64) NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    duration_ms INT
+);
+"""
+
+
+def split_statements(sql: str) -> list[str]:
+    """Split a script on top-level semicolons, skipping those inside quotes, dollar quotes and comments."""
+    statements, start, i, n = [], 0, 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if c == "-" and sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end < 0 else end + 1
+        elif c == "/" and sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif c in ("'", '"'):
+            i += 1
+            while i < n:
+                if sql[i] == c:
+                    if i + 1 < n and sql[i + 1] == c:  # doubled quote
+                        i += 2
+                        continue
+                    break
+                i += 1
+            i += 1
+        elif c == "$" and (m := _DOLLAR_TAG.match(sql, i)):
+            end = sql.find(m.group(0), m.end())
+            i = n if end < 0 else end + len(m.group(0))
+        elif c == ";":
+            statements.append(sql[start:i])
+            start = i = i + 1
+        else:
+            i += 1
+    statements.append(sql[start:])
+    # Drop pieces that are only whitespace and comments
+    return [s.strip() for s in statements if re.sub(r"--[^\n]*|/\*.*?\*/", "", s, flags=re.DOTALL).strip()]
+
+
+def concurrent_indexes(statements: list[str]) -> list[tuple[str, str]]:
+    """(schema, name) of every index built by CREATE INDEX CONCURRENTLY among statements; an
+    unqualified table is taken to be in app, like everything this runner migrates."""
+    out = []
+    for stmt in statements:
+        m = _CONCURRENT_INDEX.match(re.sub(r"--[^\n]*|/\*.*?\*/", "", stmt, flags=re.DOTALL))
+        if m:
+            out.append(((m.group(2) or "app").lower(), m.group(1).lower()))
+    return out
+
+
+def discover() -> list[tuple[str, str, str]]:
+    """(version, sql, checksum) for every migration file, in apply order."""
+    out = []
+    for path in sorted(VERSIONS_DIR.glob("*.sql")):
+        sql = path.read_text(encoding="utf-8")
+        out.append((path.stem, sql, hashlib.sha256(sql.encode("utf-8")).hexdigest()))
+    return out
+
+
+async def apply(conn: asyncpg.Connection, version: str, sql: str, checksum: str) -> int:
+    started = time.perf_counter()
+    if NO_TRANSACTION.search(sql):
+        statements = split_statements(sql)
+        for stmt in statements:
+            await conn.execute(stmt)
+        # Only this file's concurrent builds: an unrelated INVALID index must not block it
+        built = concurrent_indexes(statements)
+        invalid = await conn.fetch(
+            """
+            SELECT ns.nspname, c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace ns ON ns.oid = c.relnamespace
+            WHERE NOT i.indisvalid AND (ns.nspname, c.relname) IN (SELECT * FROM unnest($1::text[], $2::text[]))
+            """,
+            [schema for schema, _ in built],
+            [name for _, name in built],
+        ) if built else []
+        if invalid:
+            names = ", ".join(f"{r['nspname']}.{r['relname']}" for r in invalid)
+            raise SystemExit(f"Migration {version} not recorded: INVALID index(es) {names} (failed concurrent build); drop and rerun.")
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        await conn.execute(
+            "INSERT INTO app.schema_migrations (version, checksum, duration_ms) VALUES ($1, $2, $3)",
+            version, checksum, duration_ms,
+        )
+        return duration_ms
+    async with conn.transaction():
+        await conn.execute(sql)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        await conn.execute(
+            "INSERT INTO app.schema_migrations (version, checksum, duration_ms) VALUES ($1, $2, $3)",
+            version, checksum, duration_ms,
+        )
+    return duration_ms
+
+
+def plan(files: list[tuple[str, str, str]], applied: dict[str, str], baseline: str | None = None) -> tuple[list[tuple[str, str, str]], list[tuple[str, str, str]]]:
+    """(files to record as applied without running them, files to apply), in order.
+
+    Raises SystemExit on an applied file whose checksum changed, or an unknown baseline version."""
+    versions = [version for version, _, _ in files]
+    if baseline is not None and baseline not in versions:
+        raise SystemExit(f"Unknown baseline version {baseline!r}; expected one of: {', '.join(versions)}")
+    adopt, pending = [], []
+    for version, sql, checksum in files:
+        if version in applied:
+            if applied[version].strip() != checksum:
+                raise SystemExit(f"Migration {version} was changed after it was applied (checksum mismatch); add a new migration instead.")
+        elif baseline is not None and version <= baseline:
+            adopt.append((version, sql, checksum))
+        else:
+            pending.append((version, sql, checksum))
+    return adopt, pending
+
+
+async def run_migrations(url: str, dry_run: bool = False, lock_timeout: str | None = None, baseline: str | None = None) -> int:
+    """Apply pending migrations; returns the number applied (or pending, with dry_run)."""
+    settings = {"lock_timeout": lock_timeout} if lock_timeout else None
+    conn = await asyncpg.connect(url, server_settings=settings)
     try:
-        sql_path = ROOT / "migrations" / "versions" / "001_initial.sql"
-        sql = sql_path.read_text(encoding="utf-8")
-        # Remove single-line comments and split by semicolon
-        lines = [line for line in sql.split("\n") if not line.strip().startswith("--")]
-        clean = "\n".join(lines)
-        for stmt in clean.split(";"):
-            stmt = stmt.strip()
-            if stmt:
-                await conn.execute(stmt + ";")
-        print("Migration 001_initial.sql applied successfully.")
+        await conn.execute("SELECT pg_advisory_lock($1)", _LOCK_ID)
+        if not dry_run:
+            await conn.execute(LEDGER_SQL)
+        has_ledger = await conn.fetchval("SELECT to_regclass('app.schema_migrations') IS NOT NULL")
+        applied = {}
+        if has_ledger:
+            applied = {r["version"]: r["checksum"] for r in await conn.fetch("SELECT version, checksum FROM app.schema_migrations")}
+
+        adopt, pending = plan(discover(), applied, baseline)
+        if not applied and not adopt and await conn.fetchval("SELECT to_regclass('app.requests') IS NOT NULL"):
+            raise SystemExit(
+                "app.requests exists but app.schema_migrations is empty: this database was migrated without the "
+                "ledger. Adopt it with --baseline <last applied version> instead of replaying every file."
+            )
+        for version, _, checksum in adopt:
+            if dry_run:
+                print(f"Would record {version} as applied (baseline).")
+                continue
+            await conn.execute(
+                "INSERT INTO app.schema_migrations (version, checksum, duration_ms) VALUES ($1, $2, NULL)",
+                version, checksum,
+            )
+            print(f"Migration {version} recorded as applied (baseline).")
+
+        if not pending:
+            print("Database is up to date.")
+            return 0
+        for version, sql, checksum in pending:
+            mode = "no transaction" if NO_TRANSACTION.search(sql) else "transaction"
+            if dry_run:
+                count = len(split_statements(sql)) if mode == "no transaction" else 1
+                print(f"Would apply {version} ({mode}, {count} {'statements' if count != 1 else 'script'}).")
+                continue
+            duration_ms = await apply(conn, version, sql, checksum)
+            print(f"Migration {version} applied ({mode}, {duration_ms} ms).")
+        return len(pending)
     finally:
         await conn.close()
 
 
 def main():
-    asyncio.run(run_migration())
+    parser = argparse.ArgumentParser(description="Apply pending SQL migrations and record them in app.schema_migrations.")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations and how each would run, without applying them")
+    parser.add_argument("--baseline", default=None, metavar="VERSION", help="Record every migration up to and including VERSION (file name without .sql) as applied, without running it")
+    parser.add_argument("--lock-timeout", default=None, help="Postgres lock_timeout for DDL, e.g. 5s: fail fast instead of queueing behind long transactions")
+    args = parser.parse_args()
+    postgres_app_url = os.getenv("POSTGRES_APP_URL")
+    if not postgres_app_url:
+        print("POSTGRES_APP_URL not set. Set it in config/env/.env or .env")
+        sys.exit(1)
+    # asyncpg uses postgresql:// not postgresql+asyncpg://
+    url = postgres_app_url.replace("postgresql+asyncpg://", "postgresql://")
+    asyncio.run(run_migrations(url, dry_run=args.dry_run, lock_timeout=args.lock_timeout, baseline=args.baseline))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Partition maintenance for app.requests, app.plans and app.step_results (migration 005).
+
+Creates the partitions for the current and the next `premake` intervals, then applies the
+retention policy to partitions entirely older than the newest `keep` intervals: detach them
+(they stay behind as plain tables), drop them, or archive them to gzip CSV files and drop them.
+The policy is session_store.retention in the domain config. Run it daily, e.g. from cron:
+
+  PYTHONPATH=. python scripts/partitions.py [--dry-run]
+"""
+import argparse
+import asyncio
+import datetime
+import gzip
+import os
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+for p in [ROOT / "config" / "env" / ".env", ROOT / ".env"]:
+    if p.exists():
+        load_dotenv(p)
+        break
+
+import asyncpg
+
+from src.core.config.loader import load_domain_config
+from src.core.config.models import RetentionConfig
+
+# Requests last: a run interrupted midway leaves requests without steps, never orphaned steps
+TABLES = ("step_results", "plans", "requests")
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def period_start(ts: datetime.datetime, interval: str) -> datetime.datetime:
+    ts = ts.astimezone(datetime.timezone.utc)
+    if interval == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def shift(start: datetime.datetime, interval: str, n: int) -> datetime.datetime:
+    """Start of the interval n intervals after (n < 0: before) the one starting at start."""
+    if interval == "day":
+        return start + datetime.timedelta(days=n)
+    month = start.year * 12 + start.month - 1 + n
+    return start.replace(year=month // 12, month=month % 12 + 1)
+
+
+def partition_name(table: str, start: datetime.datetime, interval: str) -> str:
+    return f"{table}_p{start:%Y_%m_%d}" if interval == "day" else f"{table}_p{start:%Y_%m}"
+
+
+def _parse_ts(value: str) -> datetime.datetime:
+    if re.search(r"[+-]\d\d$", value):
+        value += ":00"  # Python < 3.11 needs +00:00
+    return datetime.datetime.fromisoformat(value)
+
+
+async def list_partitions(conn: asyncpg.Connection, table: str) -> list[tuple[str, datetime.datetime, datetime.datetime]]:
+    """(name, from, to) of the range partitions of app.<table>; the DEFAULT partition is left out."""
+    rows = await conn.fetch(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass($1)
+        """,
+        f"app.{table}",
+    )
+    out = []
+    for r in rows:
+        m = _BOUNDS.search(r["bound"] or "")
+        if m:
+            out.append((r["relname"], _parse_ts(m.group(1)), _parse_ts(m.group(2))))
+    return sorted(out, key=lambda p: p[1])
+
+
+async def ensure_partitions(conn: asyncpg.Connection, table: str, cfg: RetentionConfig, now: datetime.datetime, dry_run: bool) -> None:
+    existing = await list_partitions(conn, table)
+    start = period_start(now, cfg.interval)
+    for n in range(cfg.premake + 1):
+        lo, hi = shift(start, cfg.interval, n), shift(start, cfg.interval, n + 1)
+        if any(p_lo < hi and lo < p_hi for _, p_lo, p_hi in existing):
+            continue  # covered, e.g. by a monthly partition when the interval is now "day"
+        name = partition_name(table, lo, cfg.interval)
+        print(f"  create app.{name} [{lo:%Y-%m-%d}, {hi:%Y-%m-%d})")
+        if dry_run:
+            continue
+        try:
+            await conn.execute(f"CREATE TABLE app.{name} PARTITION OF app.{table} FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')")
+        except asyncpg.PostgresError as e:
+            # Typically rows for this range already sit in the DEFAULT partition
+            print(f"  ! app.{name} not created: {e}")
+
+
+async def archive(conn: asyncpg.Connection, name: str, archive_dir: Path) -> Path:
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    with gzip.open(path, "wb") as fh:
+        await conn.copy_from_table(name, schema_name="app", output=fh, format="csv", header=True)
+    return path
+
+
+async def apply_retention(conn: asyncpg.Connection, table: str, cfg: RetentionConfig, now: datetime.datetime, dry_run: bool) -> None:
+    if cfg.keep is None:
+        return
+    cutoff = shift(period_start(now, cfg.interval), cfg.interval, -(max(cfg.keep, 1) - 1))
+    for name, lo, hi in await list_partitions(conn, table):
+        if hi > cutoff:
+            continue
+        print(f"  {cfg.action} app.{name} [{lo:%Y-%m-%d}, {hi:%Y-%m-%d})")
+        if dry_run:
+            continue
+        if cfg.action == "archive":
+            path = await archive(conn, name, ROOT / cfg.archive_dir)
+            print(f"    -> {path}")
+        await conn.execute(f"ALTER TABLE app.{table} DETACH PARTITION app.{name}")
+        if cfg.action in ("drop", "archive"):
+            await conn.execute(f"DROP TABLE app.{name}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    config = load_domain_config(args.config_path, project_root=ROOT)
+    cfg = config.session_store.retention if config.session_store else RetentionConfig()
+    if cfg.interval not in ("month", "day") or cfg.action not in ("detach", "drop", "archive"):
+        raise SystemExit(f"Invalid session_store.retention: {cfg}")
+    url = os.environ["POSTGRES_APP_URL"].replace("postgresql+asyncpg://", "postgresql://")
+    conn = await asyncpg.connect(url, server_settings={"TimeZone": "UTC"})
+    now = datetime.datetime.now(datetime.timezone.utc)
+    try:
+        for table in TABLES:
+            print(f"app.{table}:")
+            await ensure_partitions(conn, table, cfg, now, args.dry_run)
+            await apply_retention(conn, table, cfg, now, args.dry_run)
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming history partitions and apply the retention policy.")
+    parser.add_argument("--config-path", default=os.environ.get("CONFIG_PATH", "config/domains/manufacturing.json"))
+    parser.add_argument("--dry-run", action="store_true", help="Print what would be created, detached, archived or dropped")
+    args = parser.parse_args()
+    if not os.environ.get("POSTGRES_APP_URL"):
+        print("POSTGRES_APP_URL not set. Set it in config/env/.env or .env")
+        sys.exit(1)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
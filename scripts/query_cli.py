@@ -4,6 +4,7 @@ import argparse
 import json
 import os
 import sys
+import time
 from pathlib import Path
 from typing import Any
 
@@ -49,11 +50,66 @@ def _trace_response(status: int, headers: dict, body: Any, trace: bool, max_body
     print("---", flush=True)
 
 
+def _stream(base: str, query: str, trace: bool) -> None:
+    """POST /query/stream and print events as they arrive, with time to first byte and per-event timings."""
+    url = f"{base}/query/stream"
+    body = {"query": query}
+    _trace_request("POST", url, body, trace)
+    start = time.perf_counter()
+    ttfb = None
+    in_answer = False
+    with httpx.stream("POST", url, json=body, timeout=httpx.Timeout(120, read=None)) as r:
+        r.raise_for_status()
+        event = None
+        for line in r.iter_lines():
+            if ttfb is None:
+                ttfb = (time.perf_counter() - start) * 1000
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+                continue
+            if not line.startswith("data: "):
+                continue
+            data = json.loads(line[len("data: "):])
+            at = f"[{(time.perf_counter() - start) * 1000:7.0f} ms]"
+            if trace:
+                print(f"{at} {event}: {_trunc(json.dumps(data), 300)}", flush=True)
+            if event == "request":
+                print(f"{at} Request ID: {data.get('request_id')}" + (f" (cached from {data['cached_from']})" if data.get("cached_from") else ""), flush=True)
+            elif event == "plan":
+                print(f"{at} Plan ({len(data.get('steps', []))} steps{', cached' if data.get('from_cache') else ''}):", flush=True)
+                for step in data.get("steps", []):
+                    print(f"  [step {step.get('step_index')}] → {step.get('agent_name')}: {_trunc(step.get('task_description', ''))}", flush=True)
+            elif event == "step":
+                lat = data.get("latency_ms")
+                lat_str = f" ({lat} ms)" if lat is not None else ""
+                print(f"{at} [step {data.get('step_index')}] ← {data.get('agent_name')} [{data.get('status')}]: {_trunc(data.get('output', ''), 150)}{lat_str}", flush=True)
+            elif event == "token":
+                if not in_answer:
+                    print(f"{at} Final answer:", flush=True)
+                    in_answer = True
+                print(data.get("text", ""), end="", flush=True)
+            elif event == "final":
+                if in_answer:
+                    print(flush=True)
+                elif data.get("final_answer"):
+                    print(f"{at} Final answer:", flush=True)
+                    print(data["final_answer"], flush=True)
+                print(f"{at} Status: {data.get('status')}", flush=True)
+                if data.get("error"):
+                    print("Error:", data["error"], file=sys.stderr)
+            elif event == "error":
+                print("Error:", data.get("error"), file=sys.stderr)
+    total = (time.perf_counter() - start) * 1000
+    print("---", flush=True)
+    print(f"Time to first byte: {ttfb or 0:.0f} ms, total: {total:.0f} ms", flush=True)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Send a query to the orchestrator. Prints query, step-by-step agent calls, and final answer.")
     parser.add_argument("query", nargs="*", help="Query text (or pass as single argument)")
     parser.add_argument("--url", default=ORCHESTRATOR_URL, help="Orchestrator base URL")
     parser.add_argument("--trace", action="store_true", help="Print each URL, request body, and response (status + body) so you can see what’s going on")
+    parser.add_argument("--stream", action="store_true", help="Use /query/stream: print the plan, each step and the answer as they happen, plus time to first byte")
     args = parser.parse_args()
     query = " ".join(args.query).strip()
     if not query:
@@ -65,6 +121,9 @@ def main():
     try:
         print("Query:", query, flush=True)
         print("---", flush=True)
+        if args.stream:
+            _stream(base, query, trace)
+            return
 
         # POST /query
         post_url = f"{base}/query"
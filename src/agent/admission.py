@@ -0,0 +1,56 @@
+"""Admission control: bound in-flight /invoke calls and the queue in front of them."""
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from src.core.exceptions import AgentOverloaded
+
+
+class AdmissionController:
+    """At most max_concurrency calls run; up to max_queue wait (for queue_timeout seconds); the rest are rejected."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            self._rejected += 1
+            raise AgentOverloaded("Agent busy: queue full", status_code=429, retry_after=self._retry_after())
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise AgentOverloaded("Agent busy: timed out waiting for a slot", status_code=503, retry_after=self._retry_after())
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    def _retry_after(self) -> int:
+        # Rough hint: one queue "generation" of work ahead of the caller.
+        return max(1, int(self._waiting / self.max_concurrency) + 1)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+        }
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
 from pathlib import Path
 from typing import Any
@@ -7,7 +9,11 @@ from typing import Any
 from src.core.config.loader import load_domain_config
 from src.core.config.models import AgentConfig, DomainConfig
 from src.data_access.factory import build_clients
+from src.data_access.relational.client import PostgresClient
 from src.agent.worker import build_agent
+from src.tools.registry import default_rel_db_client
+from src.tools.rel_db.cache import get_result_cache, listen_for_invalidations
+from src.tools.rel_db.schema import get_catalog
 
 
 def get_agent_config(domain_config: DomainConfig, agent_id: str) -> AgentConfig:
@@ -23,3 +29,27 @@ def get_clients(domain_config: DomainConfig, project_root: Path | None = None) -
 
 def get_agent_runner(agent_config: AgentConfig, clients: dict[str, Any]):
     return build_agent(agent_config, clients)
+
+
+async def warm_schema_catalog(clients: dict[str, Any]) -> None:
+    """Build the describe_schema catalog at startup so the first tool call is served from cache."""
+    client = default_rel_db_client(clients)
+    if client is None:
+        return
+    try:
+        await get_catalog(client).refresh()
+    except Exception as e:
+        logging.getLogger("agent").warning("Schema catalog for %s not loaded at startup: %s", client.source_id, e)
+
+
+def start_cache_invalidation(clients: dict[str, Any]) -> list[asyncio.Task]:
+    """Start a LISTEN task per data source that has a result cache and an invalidation channel."""
+    tasks = []
+    for client in clients.values():
+        if not isinstance(client, PostgresClient):
+            continue
+        channel = client.source.cache_invalidation_channel
+        cache = get_result_cache(client)
+        if channel and cache.enabled:
+            tasks.append(asyncio.create_task(listen_for_invalidations(client, cache, channel)))
+    return tasks
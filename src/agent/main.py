@@ -5,16 +5,25 @@ import argparse
 import logging
 import os
 import time
+from contextlib import AsyncExitStack
 from pathlib import Path
+from typing import Awaitable, Callable
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s", datefmt="%H:%M:%S")
 
 from src.core.config.loader import load_domain_config
-from src.core.contracts.agent import AgentInvokeRequest, AgentInvokeResponse
-from src.agent.deps import get_agent_config, get_clients, get_agent_runner
+from src.core.contracts.agent import AgentInvokeRequest, AgentInvokeResponse, AgentStreamEvent
+from src.core.exceptions import AgentOverloaded
+from src.agent.admission import AdmissionController
+from src.data_access.relational.client import PostgresClient
+from src.tools.rel_db.cache import result_cache_stats
+from src.core.llm_cache import configure_llm_cache, llm_cache_stats
+from src.agent.deps import get_agent_config, get_clients, get_agent_runner, warm_schema_catalog, start_cache_invalidation
 
 app = FastAPI(title="Multi-Agent: Agent API")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
@@ -23,19 +32,36 @@ app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], all
 DOMAIN_CONFIG = None
 AGENT_RUNNER = None
 AGENT_NAME = None
+ADMISSION = None
+CLIENTS: dict = {}
+BACKGROUND_TASKS: list = []
 
 
 @app.on_event("startup")
-def startup():
-    global DOMAIN_CONFIG, AGENT_RUNNER, AGENT_NAME
+async def startup():
+    global DOMAIN_CONFIG, AGENT_RUNNER, AGENT_NAME, ADMISSION, CLIENTS
     config_path = os.environ.get("CONFIG_PATH", "config/domains/manufacturing.json")
     agent_id = os.environ.get("AGENT_ID", "researcher")
     root = Path(__file__).resolve().parent.parent.parent
     DOMAIN_CONFIG = load_domain_config(config_path, project_root=root)
     agent_config = get_agent_config(DOMAIN_CONFIG, agent_id)
-    clients = get_clients(DOMAIN_CONFIG, root)
-    AGENT_RUNNER = get_agent_runner(agent_config, clients)
+    configure_llm_cache(DOMAIN_CONFIG.llm_cache, root)
+    CLIENTS = get_clients(DOMAIN_CONFIG, root)
+    AGENT_RUNNER = get_agent_runner(agent_config, CLIENTS)
     AGENT_NAME = agent_id
+    if "describe_schema" in agent_config.tool_names:
+        await warm_schema_catalog(CLIENTS)
+    BACKGROUND_TASKS.extend(start_cache_invalidation(CLIENTS))
+    ADMISSION = AdmissionController(agent_config.max_concurrency, agent_config.max_queue, agent_config.queue_timeout)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in BACKGROUND_TASKS:
+        task.cancel()
+    for client in CLIENTS.values():
+        if isinstance(client, PostgresClient):
+            await client.close()
 
 
 @app.get("/health")
@@ -43,33 +69,107 @@ def health():
     return {"status": "ok", "agent": AGENT_NAME}
 
 
+@app.get("/metrics")
+def metrics():
+    """Runtime stats for capacity planning (admission, tool iterations per call, data-source pools, result and LLM caches)."""
+    return {
+        "agent": AGENT_NAME,
+        "admission": ADMISSION.stats() if ADMISSION else None,
+        "runner": AGENT_RUNNER.stats() if AGENT_RUNNER else None,
+        "db_pools": {k: c.stats() for k, c in CLIENTS.items() if isinstance(c, PostgresClient)},
+        "result_caches": result_cache_stats(),
+        "llm_cache": llm_cache_stats(),
+    }
+
+
+class _ReleasingStreamingResponse(StreamingResponse):
+    """StreamingResponse that calls release however the response ends. A BackgroundTask is not
+    enough: it is skipped when the client disconnects, and the body's own finally never runs if the
+    body is not iterated at all."""
+
+    def __init__(self, content, release: Callable[[], Awaitable[object]], **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._release()
+
+
+def _input_text(req: AgentInvokeRequest) -> str:
+    context = req.context
+    if isinstance(context, dict):
+        context_str = "\n".join(f"{k}: {v}" for k, v in context.items())
+    else:
+        context_str = str(context)
+    return f"{req.task}\n\nContext:\n{context_str}" if context_str else req.task
+
+
 @app.post("/invoke", response_model=AgentInvokeResponse)
-def invoke(req: AgentInvokeRequest):
+async def invoke(req: AgentInvokeRequest):
     if AGENT_RUNNER is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     log = logging.getLogger(f"agent.{AGENT_NAME}")
     task = req.task
     task_preview = (task[:120] + "…") if len(task) > 120 else task
     log.info("RECV: %s", task_preview)
-    context = req.context
-    if isinstance(context, dict):
-        context_str = "\n".join(f"{k}: {v}" for k, v in context.items())
-    else:
-        context_str = str(context)
-    input_text = f"{task}\n\nContext:\n{context_str}" if context_str else task
+    input_text = _input_text(req)
     start = time.perf_counter()
     try:
-        result = AGENT_RUNNER(input_text)
+        async with ADMISSION.slot():
+            result = await AGENT_RUNNER.ainvoke(input_text)
         latency_ms = int((time.perf_counter() - start) * 1000)
         out_preview = (str(result)[:120] + "…") if len(str(result)) > 120 else str(result)
         log.info("SEND: %s (%s ms)", out_preview, latency_ms)
         return AgentInvokeResponse(result=result, status="success", latency_ms=latency_ms)
+    except AgentOverloaded as e:
+        log.warning("REJECT: %s (%s waiting)", e, ADMISSION.stats()["waiting"])
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         latency_ms = int((time.perf_counter() - start) * 1000)
         log.warning("SEND (failed): %s (%s ms)", e, latency_ms)
         return AgentInvokeResponse(result=str(e), status="failed", latency_ms=latency_ms)
 
 
+@app.post("/invoke/stream")
+async def invoke_stream(req: AgentInvokeRequest):
+    """Streaming /invoke: NDJSON AgentStreamEvent lines (tool_start, tool_end, token) ending with one
+    "final" line that carries what /invoke would have returned. Admission is checked before the
+    response starts, so a saturated agent still answers 429/503 with Retry-After."""
+    if AGENT_RUNNER is None:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    log = logging.getLogger(f"agent.{AGENT_NAME}")
+    task_preview = (req.task[:120] + "…") if len(req.task) > 120 else req.task
+    log.info("RECV (stream): %s", task_preview)
+    input_text = _input_text(req)
+    start = time.perf_counter()
+    slot = AsyncExitStack()
+    try:
+        await slot.enter_async_context(ADMISSION.slot())
+    except AgentOverloaded as e:
+        log.warning("REJECT: %s (%s waiting)", e, ADMISSION.stats()["waiting"])
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    async def ndjson():
+        try:
+            async for event in AGENT_RUNNER.astream(input_text):
+                if event.type == "final":
+                    event.latency_ms = int((time.perf_counter() - start) * 1000)
+                    out_preview = (str(event.result)[:120] + "…") if len(str(event.result)) > 120 else str(event.result)
+                    log.info("SEND: %s (%s ms)", out_preview, event.latency_ms)
+                yield event.model_dump_json(exclude_none=True) + "\n"
+        except Exception as e:
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            log.warning("SEND (failed): %s (%s ms)", e, latency_ms)
+            yield AgentStreamEvent(type="final", result=str(e), status="failed", latency_ms=latency_ms).model_dump_json(exclude_none=True) + "\n"
+        finally:
+            await slot.aclose()
+
+    return _ReleasingStreamingResponse(ndjson(), slot.aclose, media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
     import uvicorn
     parser = argparse.ArgumentParser()
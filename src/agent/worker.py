@@ -1,47 +1,111 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, AsyncIterator
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
 from src.core.config.models import AgentConfig
+from src.core.contracts.agent import AgentStreamEvent
+from src.core.llm_cache import get_chat_model
 from src.agent.guardrails import apply_guardrails
 from src.tools.registry import get_tools
 
 
-def _invoke_simple_chain(llm: Any, prompt: ChatPromptTemplate, input_text: str) -> str:
-    out = (prompt | llm).invoke({"input": input_text})
+def _content(out: Any) -> str:
     return out.content if hasattr(out, "content") else str(out)
 
 
-def _invoke_agent_with_tools(llm: Any, tools: list, prompt: ChatPromptTemplate, input_text: str) -> str:
+def _build_executor(llm: Any, tools: list, prompt: ChatPromptTemplate) -> Any:
     try:
         from langchain.agents import AgentExecutor, create_tool_calling_agent
         agent = create_tool_calling_agent(llm, tools, prompt)
-        executor = AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True)
-        out = executor.invoke({"input": input_text})
-        return out.get("output", str(out))
+        return AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True, return_intermediate_steps=True)
     except Exception:
         # Fallback: no tool loop, just LLM
-        return _invoke_simple_chain(llm, prompt, input_text)
+        return None
 
 
-def build_agent(agent_config: AgentConfig, clients: dict[str, Any]) -> Any:
-    """Build a LangChain agent from config and data clients."""
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    tools = get_tools(agent_config.tool_names, clients)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", agent_config.system_prompt),
-        ("human", "{input}"),
-        MessagesPlaceholder(variable_name="agent_scratchpad", optional=True),
-    ])
-
-    def run_with_guardrails(input_text: str) -> str:
-        if not tools:
-            content = _invoke_simple_chain(llm, prompt, input_text)
+class AgentRunner:
+    """LangChain agent built once at startup; the LLM, tools and AgentExecutor are reused for every call."""
+
+    def __init__(self, agent_config: AgentConfig, clients: dict[str, Any]):
+        self.config = agent_config
+        self.llm = get_chat_model(model="gpt-4o-mini", temperature=0, memoize=agent_config.llm_cache)
+        self.tools = get_tools(agent_config.tool_names, clients)
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", agent_config.system_prompt),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad", optional=True),
+        ])
+        self.chain = self.prompt | self.llm
+        self.executor = _build_executor(self.llm, self.tools, self.prompt) if self.tools else None
+        self._stats = {"invocations": 0, "tool_calls": 0, "tool_errors": 0, "by_tool": {}}
+
+    def _record(self, out: dict[str, Any]) -> None:
+        """Count tool iterations per call; each one costs an extra LLM round trip in the executor loop."""
+        self._stats["invocations"] += 1
+        for action, observation in out.get("intermediate_steps", []):
+            name = getattr(action, "tool", "?")
+            self._stats["tool_calls"] += 1
+            self._stats["by_tool"][name] = self._stats["by_tool"].get(name, 0) + 1
+            if str(observation).startswith(("Query failed", "Query rejected", "Error:", "Unknown table")):
+                self._stats["tool_errors"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        n = self._stats["invocations"]
+        per_invoke = round(self._stats["tool_calls"] / n, 2) if n else 0.0
+        return {**self._stats, "by_tool": dict(self._stats["by_tool"]), "tool_calls_per_invoke": per_invoke}
+
+    async def ainvoke(self, input_text: str) -> str:
+        """Used by /invoke: the LLM and tools are awaited on the server's event loop."""
+        if self.executor is None:
+            content = _content(await self.chain.ainvoke({"input": input_text}))
         else:
-            content = _invoke_agent_with_tools(llm, tools, prompt, input_text)
-        return apply_guardrails(content, agent_config.guardrails)
+            try:
+                out = await self.executor.ainvoke({"input": input_text})
+                self._record(out)
+                content = out.get("output", str(out))
+            except Exception:
+                content = _content(await self.chain.ainvoke({"input": input_text}))
+        return apply_guardrails(content, self.config.guardrails)
+
+    async def astream(self, input_text: str) -> AsyncIterator[AgentStreamEvent]:
+        """Like ainvoke, but yields tool calls and LLM tokens as they happen, then a "final" event
+        with the guarded result. Tokens are raw model output; only the final result has guardrails applied."""
+        if self.executor is None:
+            chunks: list[str] = []
+            async for chunk in self.chain.astream({"input": input_text}):
+                text = _content(chunk)
+                if isinstance(text, str) and text:
+                    chunks.append(text)
+                    yield AgentStreamEvent(type="token", text=text)
+            yield AgentStreamEvent(type="final", result=apply_guardrails("".join(chunks), self.config.guardrails), status="success")
+            return
+        root_run_id = None
+        output: Any = None
+        async for event in self.executor.astream_events({"input": input_text}, version="v2"):
+            kind = event["event"]
+            if root_run_id is None:
+                root_run_id = event["run_id"]
+            if kind == "on_chat_model_stream":
+                text = _content(event["data"]["chunk"])
+                if isinstance(text, str) and text:
+                    yield AgentStreamEvent(type="token", text=text)
+            elif kind == "on_tool_start":
+                yield AgentStreamEvent(type="tool_start", tool=event["name"])
+            elif kind == "on_tool_end":
+                yield AgentStreamEvent(type="tool_end", tool=event["name"])
+            elif kind == "on_chain_end" and event["run_id"] == root_run_id:
+                out = event["data"].get("output")
+                if isinstance(out, dict):
+                    self._record(out)
+                    output = out.get("output", str(out))
+                else:
+                    output = out
+        content = output if isinstance(output, str) else str(output or "")
+        yield AgentStreamEvent(type="final", result=apply_guardrails(content, self.config.guardrails), status="success")
 
-    return run_with_guardrails
+
+def build_agent(agent_config: AgentConfig, clients: dict[str, Any]) -> AgentRunner:
+    """Build a LangChain agent from config and data clients."""
+    return AgentRunner(agent_config, clients)
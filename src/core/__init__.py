@@ -1,6 +1,6 @@
 from src.core.config.loader import load_domain_config
-from src.core.config.models import DomainConfig, AgentConfig, DataSourceConfig, SessionStoreConfig
-from src.core.exceptions import ConfigError, AgentUnavailable
+from src.core.config.models import DomainConfig, AgentConfig, DataSourceConfig, SessionStoreConfig, PoolConfig
+from src.core.exceptions import ConfigError, AgentUnavailable, AgentOverloaded
 
 __all__ = [
     "load_domain_config",
@@ -8,6 +8,8 @@ __all__ = [
     "AgentConfig",
     "DataSourceConfig",
     "SessionStoreConfig",
+    "PoolConfig",
     "ConfigError",
     "AgentUnavailable",
+    "AgentOverloaded",
 ]
@@ -1,5 +1,5 @@
 from src.core.config.loader import load_domain_config
-from src.core.config.models import DomainConfig, AgentConfig, DataSourceConfig, SessionStoreConfig
+from src.core.config.models import DomainConfig, AgentConfig, DataSourceConfig, SessionStoreConfig, RetentionConfig, PoolConfig, AgentClientConfig, ExecutionConfig, NamedQueryConfig, QueryParamConfig, PlanCacheConfig, LLMCacheConfig, AnswerCacheConfig, TraceCacheConfig, JobsConfig, PersistenceConfig
 from src.core.config.env import get_env_vars
 
-__all__ = ["load_domain_config", "DomainConfig", "AgentConfig", "DataSourceConfig", "SessionStoreConfig", "get_env_vars"]
+__all__ = ["load_domain_config", "DomainConfig", "AgentConfig", "DataSourceConfig", "SessionStoreConfig", "RetentionConfig", "PoolConfig", "AgentClientConfig", "ExecutionConfig", "NamedQueryConfig", "QueryParamConfig", "PlanCacheConfig", "LLMCacheConfig", "AnswerCacheConfig", "TraceCacheConfig", "JobsConfig", "PersistenceConfig", "get_env_vars"]
@@ -8,10 +8,17 @@ from pydantic import BaseModel, Field
 class AgentConfig(BaseModel):
     name: str
     port: int
+    host: str = "127.0.0.1"  # where the orchestrator reaches this agent
     system_prompt: str
     guardrails: list[str] = Field(default_factory=list)
     tool_names: list[str] = Field(default_factory=list)
     chat_history_path: str | None = None  # JSON file for this agent's chat history; default data/chat/{name}.json
+    max_concurrency: int = 4  # /invoke calls executing at once in this agent process
+    max_queue: int = 16  # calls allowed to wait for a slot; beyond this /invoke answers 429
+    queue_timeout: float = 30.0  # seconds a queued call waits before /invoke answers 503
+    llm_cache: bool = True  # memoize this agent's deterministic LLM calls (see DomainConfig.llm_cache)
+    step_cache_ttl_seconds: float = 0.0  # orchestrator reuses this agent's successful step results this long; 0 disables
+    context_token_budget: int | None = None  # overrides execution.context_token_budget for this agent (orchestrator: the reporter)
 
     def get_chat_history_path(self, project_root: Any = None) -> str:
         """Resolved path for this agent's chat history JSON (relative to project root)."""
@@ -20,17 +27,133 @@ class AgentConfig(BaseModel):
         return f"data/chat/{self.name}.json"
 
 
+class PoolConfig(BaseModel):
+    """asyncpg connection pool sizing. Shared by the session store and relational data sources."""
+    min_size: int = 1
+    max_size: int = 10
+    statement_cache_size: int = 100  # prepared statements cached per connection; 0 disables (e.g. behind pgbouncer)
+    acquire_timeout: float = 10.0  # seconds to wait for a free connection before failing
+    max_inactive_connection_lifetime: float = 300.0  # seconds before an idle connection is closed
+
+
+class QueryParamConfig(BaseModel):
+    name: str
+    type: str = "str"  # "str" | "int" | "float" | "bool" | "date" | "datetime"
+    description: str = ""
+    default: Any = None  # None = required
+
+
+class NamedQueryConfig(BaseModel):
+    """A fixed, parameterized SELECT exposed to agents as its own tool (listed by name in tool_names)."""
+    name: str
+    description: str
+    sql: str  # placeholders $1..$n, in the order of params
+    params: list[QueryParamConfig] = Field(default_factory=list)
+
+
 class DataSourceConfig(BaseModel):
     id: str
     type: str  # "rel_db" | "vector_db"
     engine: str  # "postgres" | "chroma"
     connection_id: str  # env var name
     collection_name: str | None = None  # for chroma
+    pool: PoolConfig = Field(default_factory=PoolConfig)  # for postgres
+    statement_timeout_ms: int = 15000  # for postgres: server-side cap on each tool query
+    max_rows: int = 50  # for postgres: rows read from the server-side cursor per tool query
+    max_result_bytes: int = 32000  # for postgres: stop reading once the rendered rows reach this size
+    max_query_cost: float | None = 1_000_000.0  # for postgres: EXPLAIN total cost above which a query is limited or rejected
+    max_estimated_rows: int | None = None  # for postgres: EXPLAIN row estimate above which a query is limited or rejected
+    schema_ttl_seconds: float = 600.0  # for postgres: how long the describe_schema catalog is reused before a refresh
+    named_queries: list[NamedQueryConfig] = Field(default_factory=list)  # for postgres
+    cache_ttl_seconds: float = 0.0  # for postgres: reuse identical tool query results this long; 0 disables
+    cache_max_bytes: int = 16_000_000  # for postgres: LRU bound on cached result text
+    cache_invalidation_channel: str | None = None  # for postgres: LISTEN channel whose payload is a changed table name
+
+
+class RetentionConfig(BaseModel):
+    """Partition maintenance for app.requests, app.plans and app.step_results (scripts/partitions.py)."""
+    interval: str = "month"  # "month" | "day": span of each partition created from now on
+    premake: int = 3  # partitions kept ready ahead of the current one
+    keep: int | None = None  # partitions of history kept, the current one included; None = keep everything
+    action: str = "detach"  # for older partitions: "detach" (leave a plain table) | "drop" | "archive" (gzip CSV, then drop)
+    archive_dir: str = "data/archive"  # relative to the project root
 
 
 class SessionStoreConfig(BaseModel):
     type: str  # "postgres"
     connection_id: str
+    pool: PoolConfig = Field(default_factory=PoolConfig)
+    retention: RetentionConfig = Field(default_factory=RetentionConfig)
+
+
+class AgentClientConfig(BaseModel):
+    """Orchestrator-side HTTP client used for every agent call (one per process, kept alive)."""
+    base_url_template: str = "http://{host}:{port}"  # placeholders: host, port, name
+    timeout: float = 120.0
+    connect_timeout: float = 5.0
+    max_connections_per_agent: int = 20
+    max_keepalive_per_agent: int = 10
+    keepalive_expiry: float = 60.0  # seconds an idle keep-alive connection is retained
+    http2: bool = False  # requires the "h2" package; only negotiated over TLS
+    max_retries: int = 2  # retries when an agent answers 429/503 (honours Retry-After)
+    streaming: bool = False  # call agents' /invoke/stream for /query/stream requests and forward their tokens
+
+
+class ExecutionConfig(BaseModel):
+    """How the orchestrator runs a plan."""
+    max_parallel_steps: int = 4  # cap on concurrently running independent steps (DAG plans)
+    max_concurrent_llm_calls: int = 16  # per-process cap on in-flight planner/reporter LLM calls
+    step_cache_max_entries: int = 2000  # LRU bound on step results cached across requests
+    context_token_budget: int | None = 8000  # tokens of prior step output sent to an agent or the reporter; None = unbounded
+    heartbeat_seconds: float = 15.0  # how often a running request's updated_at is refreshed
+
+
+class PlanCacheConfig(BaseModel):
+    """Reuse plans for repeated question shapes instead of calling the planner LLM."""
+    enabled: bool = True
+    max_entries: int = 1000  # LRU bound
+    seed_limit: int = 1000  # recent completed requests loaded from app.plans on startup
+    similarity_threshold: float | None = None  # cosine similarity for the embedding tier; None = exact match only
+    max_semantic_scan: int = 1000  # most recent embedded plans compared per lookup (one matrix-vector product)
+    embedding_model: str = "text-embedding-3-small"
+
+
+class AnswerCacheConfig(BaseModel):
+    """Reuse the final answer of an identical earlier query (same normalized text, domain and config)."""
+    enabled: bool = True
+    ttl_seconds: float = 300.0  # how long a completed answer is served from the cache; 0 disables
+    max_entries: int = 1000  # in-process LRU in front of app.answer_cache
+
+
+class TraceCacheConfig(BaseModel):
+    """Finished request traces served by GET /request/{id} without a database read."""
+    max_entries: int = 1000  # in-process LRU bound; 0 disables
+
+
+class JobsConfig(BaseModel):
+    """Workers for POST /query?mode=async, backed by the app.jobs queue table."""
+    workers: int = 4  # jobs run concurrently by each orchestrator process; 0 = this process only enqueues
+    lease_seconds: float = 60.0  # a claimed job is reclaimable by another worker once its lease lapses
+    max_attempts: int = 3  # claims per job before it is marked failed
+    poll_interval: float = 2.0  # seconds between queue checks when no NOTIFY arrives
+    recover_after_seconds: float = 120.0  # a running request without a heartbeat this long is re-queued and resumed
+
+
+class PersistenceConfig(BaseModel):
+    """Write-behind batching of plan, step result and request status writes."""
+    enabled: bool = True  # False = every write is its own statement, awaited by the request
+    batch_size: int = 500  # rows written per flush (one transaction, one executemany per table)
+    flush_interval: float = 0.05  # seconds a queued row waits for the batch to fill
+    queue_size: int = 10_000  # queued rows before writers wait for the flusher (backpressure)
+
+
+class LLMCacheConfig(BaseModel):
+    """Exact-match memoization of temperature-0 LLM calls (planner, reporter, agents)."""
+    enabled: bool = True
+    max_entries: int = 2000  # in-memory LRU bound per process
+    max_bytes: int = 64_000_000  # in-memory LRU bound on serialized responses
+    sqlite_path: str | None = "data/cache/llm_cache.sqlite"  # shared by processes on the host; None = memory only
+    ttl_seconds: float | None = None  # None = entries never expire
 
 
 class DomainConfig(BaseModel):
@@ -41,6 +164,14 @@ class DomainConfig(BaseModel):
     agents: list[AgentConfig] = Field(default_factory=list)
     data_sources: list[DataSourceConfig] = Field(default_factory=list)
     session_store: SessionStoreConfig | None = None
+    agent_client: AgentClientConfig = Field(default_factory=AgentClientConfig)
+    execution: ExecutionConfig = Field(default_factory=ExecutionConfig)
+    plan_cache: PlanCacheConfig = Field(default_factory=PlanCacheConfig)
+    llm_cache: LLMCacheConfig = Field(default_factory=LLMCacheConfig)
+    answer_cache: AnswerCacheConfig = Field(default_factory=AnswerCacheConfig)
+    trace_cache: TraceCacheConfig = Field(default_factory=TraceCacheConfig)
+    jobs: JobsConfig = Field(default_factory=JobsConfig)
+    persistence: PersistenceConfig = Field(default_factory=PersistenceConfig)
 
     def get_agent_by_name(self, name: str) -> AgentConfig | None:
         for a in self.agents:
@@ -48,8 +179,14 @@ class DomainConfig(BaseModel):
                 return a
         return None
 
-    def get_agent_base_url(self, name: str, host: str = "127.0.0.1") -> str:
+    def get_context_budget(self, agent: AgentConfig | None) -> int | None:
+        if agent is not None and agent.context_token_budget is not None:
+            return agent.context_token_budget
+        return self.execution.context_token_budget
+
+    def get_agent_base_url(self, name: str, host: str | None = None, template: str | None = None) -> str:
         agent = self.get_agent_by_name(name)
         if not agent:
             raise ValueError(f"Agent {name} not in config")
-        return f"http://{host}:{agent.port}"
+        template = template or self.agent_client.base_url_template
+        return template.format(host=host or agent.host, port=agent.port, name=agent.name).rstrip("/")
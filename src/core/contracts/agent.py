@@ -13,3 +13,13 @@ class AgentInvokeResponse(BaseModel):
     result: str | dict[str, Any]
     status: str  # "success" | "failed"
     latency_ms: int | None = None
+
+
+class AgentStreamEvent(BaseModel):
+    """One NDJSON line of POST /invoke/stream; the last line is always type "final"."""
+    type: str  # "tool_start" | "tool_end" | "token" | "final"
+    text: str | None = None  # token: a chunk of LLM output
+    tool: str | None = None  # tool_start / tool_end: tool name
+    result: str | dict[str, Any] | None = None  # final: same as AgentInvokeResponse.result
+    status: str | None = None  # final: "success" | "failed"
+    latency_ms: int | None = None  # final
@@ -5,10 +5,12 @@ class QueryRequest(BaseModel):
     query: str
     domain_id: str | None = None
     session_id: str | None = None
+    no_cache: bool = False  # bypass the final-answer cache and run the full pipeline
 
 
 class QueryResponse(BaseModel):
     request_id: str
-    status: str  # "completed" | "failed" | "partial"
+    status: str  # "completed" | "failed" | "partial" | "queued" (mode=async)
     final_answer: str | None = None
     error: str | None = None
+    cached_from: str | None = None  # request_id whose answer was reused
@@ -7,10 +7,12 @@ class Step(BaseModel):
     step_index: int
     agent_name: str
     task_description: str
+    depends_on: list[int] | None = None  # step_index values whose outputs this step needs; None = unknown (sequential)
 
 
 class Plan(BaseModel):
     steps: list[Step] = Field(default_factory=list)
+    from_cache: bool = False  # True when served by the plan cache instead of the planner LLM
 
 
 class StepResult(BaseModel):
@@ -19,3 +21,4 @@ class StepResult(BaseModel):
     output: str | dict[str, Any]
     status: str  # "success" | "failed" | "timeout"
     latency_ms: int | None = None
+    context_tokens: int | None = None  # tokens of context sent to the agent
@@ -6,5 +6,18 @@ class AgentUnavailable(Exception):
     """Raised when an agent cannot be reached or returns error."""
 
 
+class AgentOverloaded(Exception):
+    """Raised when an agent's in-flight limit and queue are saturated (HTTP 429/503 with Retry-After)."""
+
+    def __init__(self, message: str, status_code: int = 429, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
 class ValidationError(Exception):
     """Raised when request/response validation fails."""
+
+
+class QueryRejected(Exception):
+    """Raised when a tool query is refused before execution (e.g. estimated cost too high). The message is shown to the model."""
@@ -0,0 +1,24 @@
+"""Stable fingerprints for cache keys (queries, prompts, configs)."""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation, so trivially different phrasings share a key."""
+    return " ".join(text.lower().split()).rstrip(" ?!.")
+
+
+def stable_hash(*parts: Any) -> str:
+    """sha256 over the JSON encoding of parts (dict keys sorted); identical across processes and hosts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def config_fingerprint(model: BaseModel) -> str:
+    """Hash of a loaded config model; changes whenever any field that shapes behaviour changes."""
+    return stable_hash(model.model_dump(mode="json"))
@@ -0,0 +1,206 @@
+"""Exact-match memoization of LLM responses: in-memory LRU in front of a host-wide SQLite store.
+
+Plugged into LangChain chat models through their `cache=` parameter, so every call site
+(planner, reporter, agents) shares it without changing how it invokes the model. Streaming
+calls are not memoized by LangChain and always reach the provider.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+from langchain_openai import ChatOpenAI
+
+from src.core.config.models import LLMCacheConfig
+
+_MAX_PENDING = 10_000  # outstanding misses tracked for latency accounting
+
+
+class MemoizingLLMCache(BaseCache):
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        max_bytes: int = 64_000_000,
+        sqlite_path: str | Path | None = None,
+        ttl_seconds: float | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[str, float, float]] = OrderedDict()  # key -> (blob, latency_ms, stored_at)
+        self._memory_bytes = 0
+        self._pending: OrderedDict[str, float] = OrderedDict()  # key -> time of the miss, to measure the call it triggered
+        self._lock = threading.Lock()  # memory tier, stats and pending misses; never held during disk I/O
+        self._db_lock = threading.Lock()  # the SQLite connection
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "saved_ms": 0.0}
+        self._db: sqlite3.Connection | None = None
+        self._db_path = Path(sqlite_path) if sqlite_path else None
+        if self._db_path is not None:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            # One connection guarded by _db_lock; WAL lets other processes on the host read and write concurrently.
+            self._db = sqlite3.connect(str(self._db_path), check_same_thread=False, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, latency_ms REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        # llm_string is LangChain's serialization of the model and its parameters (incl. bound tools).
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, blob: str, latency_ms: float, stored_at: float) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old[0])
+        self._memory[key] = (blob, latency_ms, stored_at)
+        self._memory_bytes += len(blob)
+        while self._memory and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes):
+            _, (evicted, _, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _memory_get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or self._expired(entry[2]):
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            self._stats["saved_ms"] += entry[1]
+            return entry[0]
+
+    def _disk_get(self, key: str) -> str | None:
+        with self._db_lock:
+            row = self._db.execute("SELECT value, latency_ms, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or self._expired(row[2]):
+            return None
+        with self._lock:
+            self._remember(key, row[0], row[1], row[2])
+            self._stats["disk_hits"] += 1
+            self._stats["saved_ms"] += row[1]
+            return row[0]
+
+    def _miss(self, key: str) -> None:
+        with self._lock:
+            self._stats["misses"] += 1
+            self._pending.pop(key, None)
+            self._pending[key] = time.perf_counter()
+            # A failed or cancelled call never reports back through update; forget the oldest.
+            while len(self._pending) > _MAX_PENDING:
+                self._pending.popitem(last=False)
+
+    def _store(self, key: str, return_val: Sequence[Generation]) -> tuple[str, str, float, float]:
+        """Remember a fresh response in memory; returns the row to write to SQLite."""
+        blob = dumps(list(return_val))
+        now = time.time()
+        with self._lock:
+            started = self._pending.pop(key, None)
+            latency_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+            self._remember(key, blob, latency_ms, now)
+        return (key, blob, latency_ms, now)
+
+    def _disk_put(self, row: tuple[str, str, float, float]) -> None:
+        with self._db_lock:
+            self._db.execute("INSERT OR REPLACE INTO llm_cache (key, value, latency_ms, created_at) VALUES (?, ?, ?, ?)", row)
+            self._db.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Sequence[Generation] | None:
+        key = self._key(prompt, llm_string)
+        blob = self._memory_get(key)
+        if blob is None and self._db is not None:
+            blob = self._disk_get(key)
+        if blob is None:
+            self._miss(key)
+            return None
+        return loads(blob)
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        row = self._store(self._key(prompt, llm_string), return_val)
+        if self._db is not None:
+            self._disk_put(row)
+
+    # The async variants keep the in-memory LRU inline and move SQLite I/O to a worker thread, so
+    # a slow disk or a WAL lock held by another process never stalls the event loop.
+    async def alookup(self, prompt: str, llm_string: str) -> Sequence[Generation] | None:
+        key = self._key(prompt, llm_string)
+        blob = self._memory_get(key)
+        if blob is None and self._db is not None:
+            blob = await asyncio.to_thread(self._disk_get, key)
+        if blob is None:
+            self._miss(key)
+            return None
+        return loads(blob)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        row = self._store(self._key(prompt, llm_string), return_val)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, row)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        disk_bytes = 0
+        if self._db_path is not None and self._db_path.exists():
+            disk_bytes = self._db_path.stat().st_size
+        return {
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": disk_bytes,
+            **self._stats,
+            "saved_ms": round(self._stats["saved_ms"], 1),
+        }
+
+
+_cache: MemoizingLLMCache | None = None
+
+
+def configure_llm_cache(config: LLMCacheConfig, project_root: Path | None = None) -> None:
+    """Create the process-wide cache; call on startup before any chat model is built."""
+    global _cache
+    if not config.enabled:
+        _cache = None
+        return
+    path = None
+    if config.sqlite_path:
+        path = Path(config.sqlite_path)
+        if not path.is_absolute() and project_root is not None:
+            path = Path(project_root) / path
+    _cache = MemoizingLLMCache(config.max_entries, config.max_bytes, path, config.ttl_seconds)
+
+
+def get_chat_model(model: str = "gpt-4o-mini", temperature: float = 0, memoize: bool = True, **kwargs: Any) -> ChatOpenAI:
+    """ChatOpenAI wired to the shared cache. Only temperature-0 models are memoized: sampled
+    outputs are meant to differ between calls."""
+    cache = _cache if memoize and temperature == 0 else None
+    # cache=False (not None) so a globally set LangChain cache cannot apply where memoization is off.
+    return ChatOpenAI(model=model, temperature=temperature, cache=cache if cache is not None else False, **kwargs)
+
+
+def llm_cache_stats() -> dict[str, Any]:
+    if _cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **_cache.stats()}
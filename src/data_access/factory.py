@@ -7,7 +7,7 @@ from typing import Any
 from dotenv import load_dotenv
 
 from src.core.config.models import DomainConfig
-from src.data_access.relational.postgres import create_engine as create_pg_engine
+from src.data_access.relational.client import create_pg_client
 from src.data_access.vector.chroma import create_chroma_retriever
 
 
@@ -32,8 +32,8 @@ def build_clients(
             url = env.get(ds.connection_id)
             if not url:
                 continue
-            create_pg_engine(url, key=ds.id)
-            clients[ds.id] = url
+            # Pool connections are opened lazily on the first query, on the caller's event loop.
+            clients[ds.id] = create_pg_client(url, ds)
         elif ds.type == "vector_db" and ds.engine == "chroma":
             path = env.get(ds.connection_id, "")
             if not path:
@@ -1,3 +1,4 @@
 from src.data_access.relational.postgres import create_engine, get_session, get_engine
+from src.data_access.relational.client import PostgresClient, create_pg_client
 
-__all__ = ["create_engine", "get_session", "get_engine"]
+__all__ = ["create_engine", "get_session", "get_engine", "PostgresClient", "create_pg_client"]
@@ -0,0 +1,176 @@
+"""Pooled, loop-safe asyncpg client for read-only tool queries against a relational data source."""
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import asyncpg
+
+from src.core.config.models import DataSourceConfig
+
+
+@dataclass
+class BoundedRows:
+    """Rows read through a server-side cursor, stopped at a row or byte cap."""
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    truncated: bool = False
+    nbytes: int = 0  # size of the rows as rendered for the model (str of each dict)
+
+
+class PostgresClient:
+    """One asyncpg pool per event loop, created on first use.
+
+    Async callers get the pool bound to their running loop. Sync callers (e.g. a tool invoked
+    outside any loop, or from a worker thread) are served by a private background loop, so the
+    caller's loop is never re-entered.
+    """
+
+    def __init__(self, url: str, source: DataSourceConfig):
+        self.url = url.replace("postgresql+asyncpg://", "postgresql://")
+        self.source = source
+        self.source_id = source.id
+        self.pool_config = source.pool
+        self._pools: dict[asyncio.AbstractEventLoop, asyncio.Future[asyncpg.Pool]] = {}
+        self._bg_loop: asyncio.AbstractEventLoop | None = None
+        self._bg_lock = threading.Lock()
+        self._waiters = 0
+        self._stats = {"acquires": 0, "queries": 0, "errors": 0}
+
+    async def get_pool(self) -> asyncpg.Pool:
+        loop = asyncio.get_running_loop()
+        fut = self._pools.get(loop)
+        if fut is None:
+            cfg = self.pool_config
+            fut = asyncio.ensure_future(asyncpg.create_pool(
+                self.url,
+                min_size=cfg.min_size,
+                max_size=cfg.max_size,
+                statement_cache_size=cfg.statement_cache_size,
+                max_inactive_connection_lifetime=cfg.max_inactive_connection_lifetime,
+                # Startup parameter: survives the RESET ALL the pool runs on release.
+                server_settings={"statement_timeout": str(int(self.source.statement_timeout_ms))},
+            ))
+            self._pools[loop] = fut
+        try:
+            return await asyncio.shield(fut)
+        except Exception:
+            self._pools.pop(loop, None)
+            raise
+
+    @asynccontextmanager
+    async def read_only(self) -> AsyncIterator[asyncpg.Connection]:
+        """Borrow a pooled connection inside a READ ONLY transaction (statement_timeout applies)."""
+        pool = await self.get_pool()
+        self._waiters += 1
+        try:
+            conn = await pool.acquire(timeout=self.pool_config.acquire_timeout)
+        finally:
+            self._waiters -= 1
+        self._stats["acquires"] += 1
+        try:
+            async with conn.transaction(readonly=True):
+                yield conn
+        finally:
+            await pool.release(conn)
+
+    async def fetch(self, query: str, *args: Any) -> list[dict[str, Any]]:
+        self._stats["queries"] += 1
+        try:
+            async with self.read_only() as conn:
+                rows = await conn.fetch(query, *args)
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        return [dict(r) for r in rows]
+
+    async def fetch_bounded(
+        self,
+        query: str,
+        *args: Any,
+        max_rows: int = 50,
+        max_bytes: int | None = None,
+        preflight: Callable[[asyncpg.Connection, str], Awaitable[str]] | None = None,
+    ) -> BoundedRows:
+        """Read at most max_rows (and about max_bytes) through a server-side cursor.
+
+        The cursor fetches in batches of max_rows + 1, so the server never materializes or sends
+        more than one extra row; that row only tells us the result was truncated. preflight runs
+        on the same connection and transaction first and returns the SQL to execute (it may
+        rewrite the query or raise to refuse it).
+        """
+        self._stats["queries"] += 1
+        out = BoundedRows()
+        try:
+            async with self.read_only() as conn:
+                if preflight is not None:
+                    query = await preflight(conn, query)
+                async for record in conn.cursor(query, *args, prefetch=max_rows + 1):
+                    if len(out.rows) >= max_rows:
+                        out.truncated = True
+                        break
+                    row = dict(record)
+                    size = len(str(row))
+                    if max_bytes is not None and out.rows and out.nbytes + size > max_bytes:
+                        out.truncated = True
+                        break
+                    out.rows.append(row)
+                    out.nbytes += size
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        return out
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._bg_lock:
+            if self._bg_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=f"pg-{self.source_id}", daemon=True).start()
+                self._bg_loop = loop
+            return self._bg_loop
+
+    def run_sync(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Run one of this client's coroutines from sync code on the private background loop."""
+        return asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), self._background_loop()).result()
+
+    def _ready_pools(self) -> list[tuple[asyncio.AbstractEventLoop, asyncpg.Pool]]:
+        return [
+            (owner, fut.result())
+            for owner, fut in list(self._pools.items())
+            if fut.done() and not fut.cancelled() and fut.exception() is None
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        size = idle = 0
+        for _, pool in self._ready_pools():
+            size += pool.get_size()
+            idle += pool.get_idle_size()
+        return {
+            "source_id": self.source_id,
+            "pools": len(self._pools),
+            "max_size": self.pool_config.max_size,
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiters": self._waiters,
+            **self._stats,
+        }
+
+    async def close(self) -> None:
+        """Close the pool of the running loop and, if started, the background loop's pool."""
+        loop = asyncio.get_running_loop()
+        for owner, pool in self._ready_pools():
+            if owner is loop:
+                await pool.close()
+            elif owner is self._bg_loop:
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pool.close(), owner))
+            self._pools.pop(owner, None)
+        if self._bg_loop is not None:
+            self._bg_loop.call_soon_threadsafe(self._bg_loop.stop)
+            self._bg_loop = None
+
+
+def create_pg_client(url: str, source: DataSourceConfig) -> PostgresClient:
+    return PostgresClient(url, source)
@@ -1,6 +1,7 @@
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from src.core.contracts.gateway import QueryRequest, QueryResponse
 from src.gateway.deps import get_orchestrator_url
@@ -17,14 +18,83 @@ def health():
 
 
 @app.post("/query", response_model=QueryResponse)
-async def query(req: QueryRequest):
+async def query(req: QueryRequest, mode: str = "sync"):
     base = get_orchestrator_url()
     url = f"{base.rstrip('/')}/query"
     try:
         async with httpx.AsyncClient(timeout=120.0) as client:
-            r = await client.post(url, json=req.model_dump())
+            r = await client.post(url, json=req.model_dump(), params={"mode": mode})
     except httpx.ConnectError as e:
         raise HTTPException(status_code=503, detail=f"Orchestrator unavailable: {e}")
+    if r.status_code == 202:
+        # Location is /request/{id}, which the gateway proxies below
+        headers = {"Location": r.headers["Location"]} if "Location" in r.headers else None
+        return JSONResponse(status_code=202, content=QueryResponse(**r.json()).model_dump(), headers=headers)
     if r.status_code != 200:
         raise HTTPException(status_code=r.status_code, detail=r.text)
     return QueryResponse(**r.json())
+
+
+_TRACE_HEADERS = ("ETag", "Cache-Control")
+
+
+async def _proxy_trace(path: str, http_request: Request, params: dict | None = None, timeout: float = 30.0) -> Response:
+    """GET a trace from the orchestrator, forwarding If-None-Match and passing 200/304 with their ETag through."""
+    url = f"{get_orchestrator_url().rstrip('/')}{path}"
+    headers = {"If-None-Match": http_request.headers["if-none-match"]} if "if-none-match" in http_request.headers else None
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            r = await client.get(url, params=params, headers=headers)
+    except httpx.ConnectError as e:
+        raise HTTPException(status_code=503, detail=f"Orchestrator unavailable: {e}")
+    if r.status_code not in (200, 304):
+        try:
+            detail = r.json()["detail"]
+        except (ValueError, KeyError, TypeError):
+            detail = r.text
+        raise HTTPException(status_code=r.status_code, detail=detail)
+    passed = {h: r.headers[h] for h in _TRACE_HEADERS if h in r.headers}
+    if r.status_code == 304:
+        return Response(status_code=304, headers=passed)
+    return Response(content=r.content, media_type="application/json", headers=passed)
+
+
+@app.get("/request/{request_id}")
+async def get_request_trace(request_id: str, http_request: Request):
+    """The orchestrator's /request/{id} trace (the Location of an async /query)."""
+    return await _proxy_trace(f"/request/{request_id}", http_request)
+
+
+@app.get("/request/{request_id}/wait")
+async def wait_for_request(request_id: str, http_request: Request, timeout: float = 30.0):
+    """Long-poll the orchestrator's /request/{id}/wait; the upstream call outlives its (capped) timeout."""
+    timeout = max(0.0, min(timeout, 300.0))
+    return await _proxy_trace(f"/request/{request_id}/wait", http_request, {"timeout": timeout}, timeout=timeout + 30.0)
+
+
+@app.post("/query/stream")
+async def query_stream(req: QueryRequest):
+    """Pass the orchestrator's Server-Sent Events through unbuffered."""
+    base = get_orchestrator_url()
+    url = f"{base.rstrip('/')}/query/stream"
+    client = httpx.AsyncClient(timeout=httpx.Timeout(120.0, read=None))
+    try:
+        r = await client.send(client.build_request("POST", url, json=req.model_dump()), stream=True)
+    except httpx.ConnectError as e:
+        await client.aclose()
+        raise HTTPException(status_code=503, detail=f"Orchestrator unavailable: {e}")
+    if r.status_code != 200:
+        body = await r.aread()
+        await r.aclose()
+        await client.aclose()
+        raise HTTPException(status_code=r.status_code, detail=body.decode("utf-8", "replace"))
+
+    async def relay():
+        try:
+            async for chunk in r.aiter_raw():
+                yield chunk
+        finally:
+            await r.aclose()
+            await client.aclose()
+
+    return StreamingResponse(relay(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
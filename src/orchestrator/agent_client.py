@@ -0,0 +1,119 @@
+"""Long-lived HTTP client for orchestrator -> agent calls (keep-alive, per-agent connection limits)."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.core.config.models import AgentClientConfig, DomainConfig
+
+log = logging.getLogger("agent_client")
+
+_client: httpx.AsyncClient | None = None
+_stats = {"requests": 0, "connections_opened": 0, "retries": 0}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _transport(cfg: AgentClientConfig, http2: bool) -> httpx.AsyncHTTPTransport:
+    limits = httpx.Limits(
+        max_connections=cfg.max_connections_per_agent,
+        max_keepalive_connections=cfg.max_keepalive_per_agent,
+        keepalive_expiry=cfg.keepalive_expiry,
+    )
+    return httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+
+
+def build_agent_client(domain_config: DomainConfig) -> httpx.AsyncClient:
+    """One client with a dedicated connection pool (transport) per agent, so a busy agent cannot starve the others."""
+    cfg = domain_config.agent_client
+    http2 = cfg.http2
+    if http2 and not _http2_available():
+        log.warning("agent_client.http2 is set but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+    mounts: dict[str, httpx.AsyncBaseTransport] = {}
+    for agent in domain_config.agents:
+        parts = urlsplit(domain_config.get_agent_base_url(agent.name))
+        mounts[f"{parts.scheme}://{parts.netloc}"] = _transport(cfg, http2)
+    timeout = httpx.Timeout(cfg.timeout, connect=cfg.connect_timeout)
+    return httpx.AsyncClient(timeout=timeout, mounts=mounts, http2=http2)
+
+
+def get_agent_client(domain_config: DomainConfig) -> httpx.AsyncClient:
+    """Process-wide client, created on first use and reused for every step of every request."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_agent_client(domain_config)
+    return _client
+
+
+async def close_agent_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _trace(event_name: str, info: dict[str, Any]) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _stats["connections_opened"] += 1
+
+
+def _retry_after(r: httpx.Response) -> float:
+    try:
+        return min(float(r.headers.get("Retry-After", "1")), 30.0)
+    except ValueError:
+        return 1.0
+
+
+async def post(domain_config: DomainConfig, url: str, payload: dict[str, Any]) -> httpx.Response:
+    """POST JSON to an agent over the shared client, counting new TCP connections for agent_client_stats().
+
+    An agent that is saturated answers 429/503 with Retry-After; the call is retried up to
+    agent_client.max_retries times before the last response is returned to the caller.
+    """
+    client = get_agent_client(domain_config)
+    retries = domain_config.agent_client.max_retries
+    for attempt in range(retries + 1):
+        _stats["requests"] += 1
+        r = await client.post(url, json=payload, extensions={"trace": _trace})
+        if r.status_code not in (429, 503) or attempt == retries:
+            return r
+        _stats["retries"] += 1
+        await asyncio.sleep(_retry_after(r))
+    return r
+
+
+@asynccontextmanager
+async def stream(domain_config: DomainConfig, url: str, payload: dict[str, Any]) -> AsyncIterator[httpx.Response]:
+    """POST and yield the response before its body is read (for /invoke/stream), with the same 429/503 retries as post()."""
+    client = get_agent_client(domain_config)
+    retries = domain_config.agent_client.max_retries
+    for attempt in range(retries + 1):
+        _stats["requests"] += 1
+        request = client.build_request("POST", url, json=payload, extensions={"trace": _trace})
+        r = await client.send(request, stream=True)
+        if r.status_code not in (429, 503) or attempt == retries:
+            break
+        await r.aclose()
+        _stats["retries"] += 1
+        await asyncio.sleep(_retry_after(r))
+    try:
+        yield r
+    finally:
+        await r.aclose()
+
+
+def agent_client_stats() -> dict[str, Any]:
+    """Requests sent vs. TCP connections opened; with keep-alive the ratio should stay far above 1."""
+    return {"initialized": _client is not None and not _client.is_closed, **_stats}
@@ -0,0 +1,74 @@
+"""Final-answer cache: identical questions against an unchanged config reuse the earlier answer.
+
+Keyed by normalized query, domain_id and a fingerprint of the loaded DomainConfig, so editing
+agents, prompts or data sources invalidates every entry. app.answer_cache is the shared tier;
+an in-process LRU in front of it answers repeats without a database round trip.
+"""
+from __future__ import annotations
+
+import datetime
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+import asyncpg
+
+from src.core.config.models import AnswerCacheConfig, DomainConfig
+from src.core.hashing import config_fingerprint, normalize_query, stable_hash
+from src.orchestrator.session import get_cached_answer, put_cached_answer
+
+
+class AnswerCache:
+    def __init__(self, config: AnswerCacheConfig, domain_config: DomainConfig):
+        self.config = config
+        self.fingerprint = config_fingerprint(domain_config)
+        # key -> (request_id, final_answer, expires_at)
+        self._entries: OrderedDict[str, tuple[uuid.UUID, str, datetime.datetime]] = OrderedDict()
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stored": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled and self.config.ttl_seconds > 0
+
+    def key(self, query: str, domain_id: str) -> str:
+        return stable_hash(domain_id, normalize_query(query), self.fingerprint)
+
+    def _remember(self, key: str, request_id: uuid.UUID, answer: str, expires_at: datetime.datetime) -> None:
+        self._entries[key] = (request_id, answer, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+    async def lookup(self, conn: asyncpg.Connection, key: str) -> tuple[uuid.UUID, str] | None:
+        """(original request_id, final_answer) for an unexpired entry, else None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[2] > datetime.datetime.now(datetime.timezone.utc):
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[0], entry[1]
+            del self._entries[key]
+        row = await get_cached_answer(conn, key)
+        if row is None:
+            self._stats["misses"] += 1
+            return None
+        self._remember(key, row["request_id"], row["final_answer"], row["expires_at"])
+        self._stats["db_hits"] += 1
+        return row["request_id"], row["final_answer"]
+
+    async def put(self, conn: asyncpg.Connection, key: str, domain_id: str, query: str, request_id: uuid.UUID, answer: str) -> None:
+        ttl = self.config.ttl_seconds
+        await put_cached_answer(conn, key, domain_id, query, request_id, answer, ttl)
+        expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=ttl)
+        self._remember(key, request_id, answer, expires_at)
+        self._stats["stored"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        hits = self._stats["memory_hits"] + self._stats["db_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
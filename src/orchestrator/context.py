@@ -0,0 +1,108 @@
+"""Token-budgeted context for agent steps and the reporter.
+
+The original query and a step's direct dependencies are passed verbatim; older step outputs
+share whatever budget is left and are cut back to their leading sentences (extractive, no LLM).
+Tokens are counted with tiktoken when it is installed, else estimated at ~4 characters each.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any
+
+from src.core.contracts.orchestrator import StepResult
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")  # gpt-4o family
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def compact(text: str, budget: int) -> str:
+    """Keep whole leading sentences of text within budget tokens; hard-truncate a first sentence that alone is too long."""
+    if budget <= 0:
+        return "[omitted]"
+    if count_tokens(text) <= budget:
+        return text
+    marker = " […]"
+    budget -= count_tokens(marker)
+    kept: list[str] = []
+    used = 0
+    for sentence in _SENTENCE_END.split(text):
+        if not sentence:
+            continue
+        n = count_tokens(sentence) + 1
+        if used + n > budget:
+            break
+        kept.append(sentence)
+        used += n
+    if kept:
+        return " ".join(kept) + marker
+    enc = _encoding()
+    if enc is None:
+        return text[: max(0, budget) * 4] + marker
+    return enc.decode(enc.encode(text, disallowed_special=())[: max(0, budget)]) + marker
+
+
+def _render(sr: StepResult, output: str | None = None) -> str:
+    return f"Step {sr.step_index} ({sr.agent_name}): {sr.output if output is None else output}"
+
+
+def fit_outputs(results: list[StepResult], budget: int) -> list[str]:
+    """Split budget across outputs so short ones stay whole and long ones get an equal share of the rest."""
+    sizes = {sr.step_index: count_tokens(_render(sr)) for sr in results}
+    remaining, pending = budget, sorted(results, key=lambda sr: sizes[sr.step_index])
+    allowance: dict[int, int] = {}
+    while pending:
+        share = remaining // len(pending)
+        sr = pending[0]
+        if sizes[sr.step_index] > share:
+            for other in pending:
+                allowance[other.step_index] = share
+            break
+        allowance[sr.step_index] = sizes[sr.step_index]
+        remaining -= sizes[sr.step_index]
+        pending.pop(0)
+    out = []
+    for sr in results:
+        if allowance[sr.step_index] >= sizes[sr.step_index]:
+            out.append(_render(sr))
+        else:
+            prefix = count_tokens(_render(sr, ""))
+            out.append(_render(sr, compact(str(sr.output), allowance[sr.step_index] - prefix)))
+    return out
+
+
+def build_context(
+    query: str,
+    direct: list[StepResult],
+    older: list[StepResult] | None = None,
+    budget: int | None = None,
+    separator: str = "\n",
+) -> tuple[str, int]:
+    """(context text, its token count). Without a budget everything is passed verbatim."""
+    head = [f"Original query: {query}", *(_render(sr) for sr in direct)]
+    older = older or []
+    if budget is None or not older:
+        parts = head + [_render(sr) for sr in older]
+    else:
+        left = budget - count_tokens(separator.join(head))
+        parts = head + fit_outputs(older, left)
+    text = separator.join(parts)
+    return text, count_tokens(text)
@@ -1,49 +1,71 @@
 """Execute plan by calling each agent via HTTP and collecting StepResults."""
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from typing import Any
-
-import httpx
+from typing import Any, Awaitable, Callable
 
 log = logging.getLogger("executor")
 
 from src.core.config.models import DomainConfig
-from src.core.contracts.orchestrator import Plan, StepResult
-from src.core.contracts.agent import AgentInvokeRequest, AgentInvokeResponse
+from src.core.contracts.orchestrator import Plan, Step, StepResult
+from src.core.contracts.agent import AgentInvokeRequest, AgentStreamEvent
+from src.core.hashing import stable_hash
+from src.orchestrator import agent_client
+from src.orchestrator.step_cache import context_digest, get_step_cache
+from src.orchestrator.context import build_context
+
+OnStep = Callable[[StepResult], Awaitable[None]]  # called as each step finishes, e.g. to stream or persist it
+OnDelta = Callable[[int, str, str], Awaitable[None]]  # (step_index, agent_name, text) for agent tokens while a step runs
 
 
 async def run_step(
     step: Any,
     context: str,
     domain_config: DomainConfig,
-    base_url_template: str = "http://127.0.0.1:{port}",
+    base_url_template: str | None = None,
+    digest: str | None = None,
+    on_delta: OnDelta | None = None,
 ) -> StepResult:
+    """Call one agent. With a step_cache_ttl_seconds on the agent, a successful result is reused for
+    the same task and context digest (default: a hash of the full context) and returned as "cached".
+    With on_delta and agent_client.streaming, the agent's /invoke/stream is used and its tokens are
+    passed to on_delta while the step runs."""
     agent_name = step.agent_name
     agent = domain_config.get_agent_by_name(agent_name)
     if not agent:
         return StepResult(step_index=step.step_index, agent_name=agent_name, output="Agent not found", status="failed", latency_ms=None)
-    url = f"http://127.0.0.1:{agent.port}/invoke"
+    cache_key = None
+    if agent.step_cache_ttl_seconds > 0:
+        cache = get_step_cache(domain_config.execution.step_cache_max_entries)
+        cache_key = cache.key(agent, step.task_description, digest or stable_hash(context))
+        cached = cache.get(cache_key)
+        if cached is not None:
+            log.info("← %s: served from step cache", agent_name)
+            print(f"  [step {step.step_index}] ← {agent_name}: cached", flush=True)
+            return StepResult(step_index=step.step_index, agent_name=agent_name, output=cached, status="cached", latency_ms=0)
+    base_url = domain_config.get_agent_base_url(agent_name, template=base_url_template)
     payload = AgentInvokeRequest(task=step.task_description, context=context).model_dump()
     task_preview = (step.task_description[:100] + "…") if len(step.task_description) > 100 else step.task_description
     log.info("→ %s: %s", agent_name, task_preview)
     print(f"  [step {step.step_index}] → {agent_name}: {task_preview}", flush=True)
     start = time.perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            r = await client.post(url, json=payload)
+        if on_delta is not None and domain_config.agent_client.streaming:
+            result, status, http_status = await _invoke_stream(step, f"{base_url}/invoke/stream", payload, domain_config, on_delta)
+        else:
+            result, status, http_status = await _invoke(f"{base_url}/invoke", payload, domain_config)
         latency_ms = int((time.perf_counter() - start) * 1000)
-        if r.status_code != 200:
-            log.warning("← %s: HTTP %s (%s ms)", agent_name, r.status_code, latency_ms)
-            print(f"  [step {step.step_index}] ← {agent_name}: HTTP {r.status_code} ({latency_ms} ms)", flush=True)
-            return StepResult(step_index=step.step_index, agent_name=agent_name, output={"error": r.text}, status="failed", latency_ms=latency_ms)
-        data = r.json()
-        result = data.get("result", data)
-        status = data.get("status", "success")
+        if http_status != 200:
+            log.warning("← %s: HTTP %s (%s ms)", agent_name, http_status, latency_ms)
+            print(f"  [step {step.step_index}] ← {agent_name}: HTTP {http_status} ({latency_ms} ms)", flush=True)
+            return StepResult(step_index=step.step_index, agent_name=agent_name, output=result, status="failed", latency_ms=latency_ms)
         out_str = str(result)[:150] + "…" if len(str(result)) > 150 else str(result)
         log.info("← %s: %s (%s ms)", agent_name, out_str, latency_ms)
         print(f"  [step {step.step_index}] ← {agent_name}: {out_str} ({latency_ms} ms)", flush=True)
+        if cache_key is not None and status == "success":
+            get_step_cache().put(cache_key, result, agent.step_cache_ttl_seconds)
         return StepResult(step_index=step.step_index, agent_name=agent_name, output=result, status=status, latency_ms=latency_ms)
     except Exception as e:
         latency_ms = int((time.perf_counter() - start) * 1000)
@@ -52,18 +74,154 @@ async def run_step(
         return StepResult(step_index=step.step_index, agent_name=agent_name, output=str(e), status="failed", latency_ms=latency_ms)
 
 
-async def run_plan(
+async def _invoke(url: str, payload: dict[str, Any], domain_config: DomainConfig) -> tuple[Any, str, int]:
+    """(result, status, HTTP status) from the agent's /invoke."""
+    r = await agent_client.post(domain_config, url, payload)
+    if r.status_code != 200:
+        return {"error": r.text}, "failed", r.status_code
+    data = r.json()
+    return data.get("result", data), data.get("status", "success"), 200
+
+
+async def _invoke_stream(
+    step: Any,
+    url: str,
+    payload: dict[str, Any],
+    domain_config: DomainConfig,
+    on_delta: OnDelta,
+) -> tuple[Any, str, int]:
+    """Same as _invoke over /invoke/stream, forwarding token events to on_delta as they arrive."""
+    async with agent_client.stream(domain_config, url, payload) as r:
+        if r.status_code != 200:
+            await r.aread()
+            return {"error": r.text}, "failed", r.status_code
+        async for line in r.aiter_lines():
+            if not line.strip():
+                continue
+            event = AgentStreamEvent.model_validate_json(line)
+            if event.type == "token" and event.text:
+                await on_delta(step.step_index, step.agent_name, event.text)
+            elif event.type == "tool_start":
+                log.info("   %s: calling %s", step.agent_name, event.tool)
+            elif event.type == "final":
+                return event.result, event.status or "success", 200
+    return "Agent stream ended without a final event", "failed", 200
+
+
+def _context(
+    step: Step,
+    query: str,
+    direct: list[StepResult],
+    older: list[StepResult],
+    domain_config: DomainConfig,
+) -> tuple[str, int]:
+    budget = domain_config.get_context_budget(domain_config.get_agent_by_name(step.agent_name))
+    text, tokens = build_context(query, direct, older, budget)
+    log.info("step %s context: %s tokens (budget %s)", step.step_index, tokens, budget)
+    return text, tokens
+
+
+def _dependency_order(plan: Plan) -> list[tuple[Step, list[int]]] | None:
+    """Topologically sort steps by depends_on. None if any step lacks dependency info or the graph is not a DAG."""
+    by_idx = {s.step_index: s for s in plan.steps}
+    if len(by_idx) != len(plan.steps) or any(s.depends_on is None for s in plan.steps):
+        return None
+    deps: dict[int, list[int]] = {}
+    for s in plan.steps:
+        known = [d for d in dict.fromkeys(s.depends_on) if d in by_idx]
+        if len(known) != len(s.depends_on):
+            log.warning("step %s: ignoring unknown dependencies %s", s.step_index, sorted(set(s.depends_on) - set(known)))
+        deps[s.step_index] = known
+    order: list[tuple[Step, list[int]]] = []
+    remaining = dict(deps)
+    while remaining:
+        ready = sorted(i for i, d in remaining.items() if all(x not in remaining for x in d))
+        if not ready:
+            log.warning("plan dependencies contain a cycle %s; running sequentially", sorted(remaining))
+            return None
+        for i in ready:
+            order.append((by_idx[i], remaining.pop(i)))
+    return order
+
+
+async def _run_sequential(
     plan: Plan,
     query: str,
     domain_config: DomainConfig,
+    on_step: OnStep | None = None,
+    on_delta: OnDelta | None = None,
+    completed: dict[int, StepResult] | None = None,
 ) -> list[StepResult]:
-    results = []
-    context_parts = [f"Original query: {query}"]
+    """Each step sees the previous step's output verbatim and earlier outputs compacted to the token budget
+    (used when the plan carries no dependency info)."""
+    results: list[StepResult] = []
     for step in plan.steps:
-        context = "\n".join(context_parts)
-        sr = await run_step(step, context, domain_config)
+        if completed and step.step_index in completed:
+            results.append(completed[step.step_index])
+            continue
+        context, tokens = _context(step, query, results[-1:], results[:-1], domain_config)
+        sr = await run_step(step, context, domain_config, digest=context_digest(results), on_delta=on_delta)
+        sr.context_tokens = tokens
         results.append(sr)
-        # Append this step's output for next steps
-        out = sr.output
-        context_parts.append(f"Step {step.step_index} ({step.agent_name}): {out}")
+        if on_step is not None:
+            await on_step(sr)
     return results
+
+
+async def _run_dag(
+    order: list[tuple[Step, list[int]]],
+    query: str,
+    domain_config: DomainConfig,
+    max_parallel: int,
+    on_step: OnStep | None = None,
+    on_delta: OnDelta | None = None,
+    completed: dict[int, StepResult] | None = None,
+) -> list[StepResult]:
+    """Start every step as soon as its dependencies finish; each step sees only its dependencies' outputs."""
+    slots = asyncio.Semaphore(max(1, max_parallel))
+    tasks: dict[int, asyncio.Task[StepResult]] = {}
+
+    async def run(step: Step, deps: list[int]) -> StepResult:
+        if completed and step.step_index in completed:
+            return completed[step.step_index]
+        prior = [await tasks[d] for d in deps]
+        context, tokens = _context(step, query, prior, [], domain_config)
+        async with slots:
+            sr = await run_step(step, context, domain_config, digest=context_digest(prior), on_delta=on_delta)
+        sr.context_tokens = tokens
+        if on_step is not None:
+            await on_step(sr)
+        return sr
+
+    for step, deps in order:
+        tasks[step.step_index] = asyncio.create_task(run(step, deps))
+    try:
+        results = await asyncio.gather(*tasks.values())
+    finally:
+        # gather does not cancel the siblings of a failed step (e.g. on_step raised); don't leave them running.
+        pending = [t for t in tasks.values() if not t.done()]
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return sorted(results, key=lambda sr: sr.step_index)
+
+
+async def run_plan(
+    plan: Plan,
+    query: str,
+    domain_config: DomainConfig,
+    max_parallel: int | None = None,
+    on_step: OnStep | None = None,
+    on_delta: OnDelta | None = None,
+    completed: list[StepResult] | None = None,
+) -> list[StepResult]:
+    """Run a plan as a DAG when every step declares depends_on, otherwise strictly in order.
+    on_step is awaited with each StepResult as soon as that step finishes; on_delta with agent
+    tokens while steps run (see run_step). Steps in completed (a resumed request's checkpoints)
+    are not run again and their results are used as-is."""
+    done = {sr.step_index: sr for sr in completed or []}
+    order = _dependency_order(plan)
+    if order is None:
+        return await _run_sequential(plan, query, domain_config, on_step, on_delta, done)
+    max_parallel = max_parallel or domain_config.execution.max_parallel_steps
+    return await _run_dag(order, query, domain_config, max_parallel, on_step, on_delta, done)
@@ -0,0 +1,430 @@
+"""Async query jobs: a durable Postgres work queue (app.jobs) and the workers that drain it.
+
+POST /query?mode=async creates the request as "queued" and a job row in one transaction.
+Any orchestrator process with jobs.workers > 0 claims jobs with FOR UPDATE SKIP LOCKED, so
+workers on several processes or hosts never run the same job twice. A running job holds a
+lease that its worker keeps extending; if the worker dies the lease lapses and another worker
+reclaims the job. Requests run synchronously (POST /query) heartbeat app.requests.updated_at;
+if that goes stale, recover_stale_requests() queues a job that resumes the request from its
+checkpointed plan and step results. Completion is announced with NOTIFY on REQUEST_DONE_CHANNEL, which
+/request/{id}/wait listens on.
+
+Run workers without the HTTP API:
+  PYTHONPATH=. python -m src.orchestrator.jobs --config-path config/domains/manufacturing.json
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Callable
+
+import asyncpg
+
+from src.core.config.models import JobsConfig
+from src.core.contracts.gateway import QueryRequest
+from src.orchestrator.pipeline import QueryPipeline, SessionFactory
+from src.orchestrator.session import update_request_final
+
+log = logging.getLogger("jobs")
+
+JOB_QUEUED_CHANNEL = "app_job_queued"
+REQUEST_DONE_CHANNEL = "app_request_done"
+TERMINAL_STATUSES = ("completed", "failed", "partial")
+_RETRY_SECONDS = 1.0  # first backoff delay while the database is unreachable; doubles up to _MAX_RETRY_SECONDS
+_MAX_RETRY_SECONDS = 30.0
+
+
+def _backoff(failures: int, base: float) -> float:
+    return min(base * 2 ** max(0, failures - 1), _MAX_RETRY_SECONDS)
+
+
+async def _connect_listener(db_url: str, channel: str, callback: Any, what: str) -> asyncpg.Connection:
+    """LISTEN on channel from a dedicated connection, retrying with backoff until the database is reachable."""
+    failures = 0
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(db_url)
+            await conn.add_listener(channel, callback)
+            return conn
+        except Exception as e:
+            failures += 1
+            delay = _backoff(failures, _RETRY_SECONDS)
+            log.warning("%s LISTEN failed, retrying in %.1fs: %s", what, delay, e)
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(delay)
+
+
+async def enqueue_job(conn: asyncpg.Connection, request_id: uuid.UUID, domain_id: str, req: QueryRequest) -> None:
+    """Insert the job and wake idle workers (the NOTIFY is delivered when the caller's transaction commits)."""
+    await conn.execute(
+        "INSERT INTO app.jobs (request_id, domain_id, payload) VALUES ($1, $2, $3::jsonb)",
+        request_id,
+        domain_id,
+        req.model_dump_json(),
+    )
+    await conn.execute("SELECT pg_notify($1, $2)", JOB_QUEUED_CHANNEL, str(request_id))
+
+
+async def claim_job(conn: asyncpg.Connection, worker_id: str, lease_seconds: float) -> asyncpg.Record | None:
+    """Claim the oldest queued job, or a running one whose lease lapsed. Rows locked by other workers are skipped."""
+    return await conn.fetchrow(
+        """
+        UPDATE app.jobs j
+        SET status = 'running', attempts = j.attempts + 1, locked_by = $1,
+            locked_until = now() + make_interval(secs => $2), updated_at = now()
+        FROM (
+            SELECT request_id FROM app.jobs
+            WHERE status = 'queued' OR (status = 'running' AND locked_until < now())
+            ORDER BY created_at
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        ) next
+        WHERE j.request_id = next.request_id
+        RETURNING j.request_id, j.payload, j.attempts
+        """,
+        worker_id,
+        float(lease_seconds),
+    )
+
+
+async def extend_lease(conn: asyncpg.Connection, request_id: uuid.UUID, worker_id: str, lease_seconds: float) -> bool:
+    result = await conn.execute(
+        """
+        UPDATE app.jobs SET locked_until = now() + make_interval(secs => $3), updated_at = now()
+        WHERE request_id = $1 AND locked_by = $2 AND status = 'running'
+        """,
+        request_id,
+        worker_id,
+        float(lease_seconds),
+    )
+    return result.endswith(" 1")
+
+
+async def finish_job(conn: asyncpg.Connection, request_id: uuid.UUID, status: str, error: str | None = None) -> None:
+    """Mark the job done or failed and announce the request's completion."""
+    await conn.execute(
+        """
+        UPDATE app.jobs SET status = $2, last_error = $3, locked_by = NULL, locked_until = NULL, updated_at = now()
+        WHERE request_id = $1
+        """,
+        request_id,
+        status,
+        error,
+    )
+    await conn.execute("SELECT pg_notify($1, $2)", REQUEST_DONE_CHANNEL, str(request_id))
+
+
+async def release_job(conn: asyncpg.Connection, request_id: uuid.UUID, worker_id: str, error: str | None = None) -> None:
+    """Put a claimed job back on the queue (worker shutdown or a retryable failure)."""
+    await conn.execute(
+        """
+        UPDATE app.jobs SET status = 'queued', last_error = COALESCE($3, last_error),
+            locked_by = NULL, locked_until = NULL, updated_at = now()
+        WHERE request_id = $1 AND locked_by = $2
+        """,
+        request_id,
+        worker_id,
+        error,
+    )
+    await conn.execute("SELECT pg_notify($1, $2)", JOB_QUEUED_CHANNEL, str(request_id))
+
+
+async def recover_stale_requests(conn: asyncpg.Connection, stale_seconds: float, limit: int = 100) -> list[uuid.UUID]:
+    """Re-queue running requests whose process stopped heartbeating (crash, deploy) and that no pending job
+    covers (a job with a lapsed lease is reclaimed by claim_job instead, within max_attempts).
+
+    Workers resume them from their checkpoints: the saved plan and every successful step result.
+    Safe to run from every process at once: candidate rows are locked with SKIP LOCKED.
+    """
+    async with conn.transaction():
+        rows = await conn.fetch(
+            """
+            SELECT r.id, r.created_at, r.domain_id, r.query,
+                   COALESCE(r.payload, (SELECT j.payload FROM app.jobs j WHERE j.request_id = r.id)) AS payload
+            FROM app.requests r
+            WHERE r.status = 'running' AND r.updated_at < now() - make_interval(secs => $1)
+              AND NOT EXISTS (
+                  SELECT 1 FROM app.jobs j
+                  WHERE j.request_id = r.id AND j.status IN ('queued', 'running')
+              )
+            ORDER BY r.updated_at
+            FOR UPDATE OF r SKIP LOCKED
+            LIMIT $2
+            """,
+            float(stale_seconds),
+            limit,
+        )
+        for r in rows:
+            # The original request (no_cache, session_id, ...); rows from before migration 007 only have the query
+            payload = r["payload"] or QueryRequest(query=r["query"], domain_id=r["domain_id"]).model_dump_json()
+            await conn.execute(
+                """
+                INSERT INTO app.jobs (request_id, domain_id, payload) VALUES ($1, $2, $3::jsonb)
+                ON CONFLICT (request_id) DO UPDATE SET status = 'queued', attempts = 0,
+                    locked_by = NULL, locked_until = NULL, last_error = 'recovered', updated_at = now()
+                """,
+                r["id"],
+                r["domain_id"],
+                payload,
+            )
+            await conn.execute(
+                "UPDATE app.requests SET status = 'queued', updated_at = now() WHERE id = $1 AND created_at = $2",
+                r["id"],
+                r["created_at"],
+            )
+        if rows:
+            await conn.execute("SELECT pg_notify($1, '')", JOB_QUEUED_CHANNEL)
+    return [r["id"] for r in rows]
+
+
+class JobWorker:
+    """Runs up to config.workers jobs at a time in this process."""
+
+    def __init__(self, pipeline: QueryPipeline, session: SessionFactory, config: JobsConfig, db_url: str):
+        self.pipeline = pipeline
+        self.session = session
+        self.config = config
+        self.db_url = db_url
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake = asyncio.Event()
+        self._running: dict[uuid.UUID, asyncio.Task] = {}
+        self._loop_task: asyncio.Task | None = None
+        self._recovery_task: asyncio.Task | None = None
+        self._listen_task: asyncio.Task | None = None
+        self._listener: asyncpg.Connection | None = None
+        self._stats = {"claimed": 0, "completed": 0, "failed": 0, "retried": 0, "recovered": 0}
+
+    def start(self) -> asyncio.Task:
+        """Start claiming. Works without a reachable database: claims and the LISTEN connection
+        are retried with backoff, and the queue is polled every poll_interval until NOTIFY is up."""
+        self._listen_task = asyncio.create_task(self._listen())
+        self._loop_task = asyncio.create_task(self._run())
+        self._recovery_task = asyncio.create_task(self._recover())
+        return self._loop_task
+
+    async def _recover(self) -> None:
+        """Periodic sweep for requests orphaned by a crashed or redeployed orchestrator."""
+        while True:
+            try:
+                async with self.session() as conn:
+                    recovered = await recover_stale_requests(conn, self.config.recover_after_seconds)
+                if recovered:
+                    self._stats["recovered"] += len(recovered)
+                    log.info("re-queued %s stale running requests: %s", len(recovered), ", ".join(map(str, recovered)))
+            except Exception as e:
+                log.warning("recovery sweep failed: %s", e)
+            await asyncio.sleep(self.config.recover_after_seconds / 2)
+
+    async def _listen(self) -> None:
+        self._listener = await _connect_listener(self.db_url, JOB_QUEUED_CHANNEL, lambda *_: self._wake.set(), "job queue")
+
+    async def _run(self) -> None:
+        slots = asyncio.Semaphore(self.config.workers)
+        log.info("job worker %s started (%s slots)", self.worker_id, self.config.workers)
+        failures = 0
+        while True:
+            await slots.acquire()
+            self._wake.clear()  # before claiming, so a NOTIFY that races the claim is not lost
+            wait = self.config.poll_interval
+            try:
+                async with self.session() as conn:
+                    job = await claim_job(conn, self.worker_id, self.config.lease_seconds)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                wait = max(wait, _backoff(failures, _RETRY_SECONDS))
+                log.warning("job claim failed, retrying in %.1fs: %s", wait, getattr(e, "detail", e))
+                job = None
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._stats["claimed"] += 1
+            task = asyncio.create_task(self._execute(job))
+            self._running[job["request_id"]] = task
+            task.add_done_callback(lambda t, rid=job["request_id"]: (self._running.pop(rid, None), slots.release()))
+
+    async def _heartbeat(self, request_id: uuid.UUID) -> None:
+        while True:
+            await asyncio.sleep(self.config.lease_seconds / 3)
+            try:
+                async with self.session() as conn:
+                    if not await extend_lease(conn, request_id, self.worker_id, self.config.lease_seconds):
+                        log.warning("job %s: lease lost", request_id)
+            except Exception as e:
+                log.warning("job %s: lease not extended: %s", request_id, e)
+
+    async def _execute(self, job: asyncpg.Record) -> None:
+        request_id: uuid.UUID = job["request_id"]
+        payload = job["payload"]
+        req = QueryRequest(**(json.loads(payload) if isinstance(payload, str) else payload))
+        if job["attempts"] > self.config.max_attempts:
+            error = f"Gave up after {job['attempts'] - 1} attempts"
+            async with self.session() as conn:
+                await update_request_final(conn, request_id, "failed", error_message=error)
+                await finish_job(conn, request_id, "failed", error)
+            self._stats["failed"] += 1
+            return
+        log.info("job %s: attempt %s", request_id, job["attempts"])
+        heartbeat = asyncio.create_task(self._heartbeat(request_id))
+        try:
+            final: dict[str, Any] = {}
+            async for name, data in self.pipeline.events(req, stream_tokens=False, request_id=request_id):
+                if name == "final":
+                    final = data
+            # completed and partial requests have an answer (or a usable partial one); failed ones do not
+            status = "done" if final.get("status") in ("completed", "partial") else "failed"
+            async with self.session() as conn:
+                await finish_job(conn, request_id, status, final.get("error"))
+            self._stats["completed"] += 1
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back so another worker picks it up without waiting for the lease.
+            try:
+                async with self.session() as conn:
+                    await release_job(conn, request_id, self.worker_id, "worker shut down")
+            except Exception:
+                pass
+            raise
+        except Exception as e:
+            log.exception("job %s failed", request_id)
+            self._stats["retried"] += 1
+            async with self.session() as conn:
+                await release_job(conn, request_id, self.worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._recovery_task, self._listen_task):
+            if task is not None:
+                task.cancel()
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {"worker_id": self.worker_id, "slots": self.config.workers, "running": len(self._running), **self._stats}
+
+
+class CompletionListener:
+    """One LISTEN connection per process that wakes /request/{id}/wait callers when their request finishes."""
+
+    def __init__(self, db_url: str, on_done: Callable[[str], None] | None = None):
+        """on_done(request_id) runs for every completion announced by any process, e.g. to drop a cached trace."""
+        self.db_url = db_url
+        self.on_done = on_done
+        self._conn: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+        self._waiters: dict[str, set[asyncio.Future]] = {}
+
+    def start(self) -> asyncio.Task:
+        """Connect in the background, retrying with backoff; until then waits fall back to their timeout."""
+        self._task = asyncio.create_task(self._listen())
+        return self._task
+
+    async def _listen(self) -> None:
+        self._conn = await _connect_listener(self.db_url, REQUEST_DONE_CHANNEL, self._on_notify, "completion")
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        if self.on_done is not None:
+            self.on_done(payload)
+        for fut in self._waiters.pop(payload, ()):
+            if not fut.done():
+                fut.set_result(None)
+
+    def register(self, request_id: str) -> asyncio.Future:
+        """Register before checking the request's status, so a completion in between is not missed."""
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(request_id, set()).add(fut)
+        return fut
+
+    @staticmethod
+    async def wait(fut: asyncio.Future, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def discard(self, request_id: str, fut: asyncio.Future) -> None:
+        waiters = self._waiters.get(request_id)
+        if waiters is not None:
+            waiters.discard(fut)
+            if not waiters:
+                del self._waiters[request_id]
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+
+
+async def _main_async(config_path: str) -> None:
+    from pathlib import Path
+
+    from src.core.config.loader import load_domain_config
+    from src.orchestrator.answer_cache import AnswerCache
+    from src.orchestrator.agent_client import close_agent_client, get_agent_client
+    from src.orchestrator.llm import configure_llm_concurrency
+    from src.core.llm_cache import configure_llm_cache
+    from src.orchestrator.persistence import WriteBehindPersister
+    from src.orchestrator.plan_cache import PlanCache
+    from src.orchestrator.session import acquire, close_pool, get_app_db_url, init_pool
+
+    root = Path(__file__).resolve().parent.parent.parent
+    config = load_domain_config(config_path, project_root=root)
+    url = get_app_db_url(dict(os.environ))
+    configure_llm_concurrency(config.execution.max_concurrent_llm_calls)
+    configure_llm_cache(config.llm_cache, root)
+    get_agent_client(config)
+    await init_pool(url, config.session_store.pool if config.session_store else None)
+    persister = WriteBehindPersister(config.persistence, acquire)
+    persister.start()
+    pipeline = QueryPipeline(config, PlanCache(config.plan_cache), AnswerCache(config.answer_cache, config), acquire, persister)
+    worker = JobWorker(pipeline, acquire, config.jobs, url)
+    try:
+        await worker.start()
+    finally:
+        await worker.stop()
+        await persister.stop()
+        await close_agent_client()
+        await close_pool()
+
+
+def main() -> None:
+    import argparse
+
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Run async query job workers without the orchestrator HTTP API.")
+    parser.add_argument("--config-path", default=os.environ.get("CONFIG_PATH", "config/domains/manufacturing.json"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s", datefmt="%H:%M:%S")
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for p in (os.path.join(root, "config", "env", ".env"), os.path.join(root, ".env")):
+        if os.path.exists(p):
+            load_dotenv(p, override=False)
+            break
+    try:
+        asyncio.run(_main_async(args.config_path))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Per-process cap on in-flight orchestrator LLM calls (planner + reporter)."""
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+_limit = 16
+_slots: asyncio.Semaphore | None = None
+_stats = {"in_flight": 0, "waiting": 0, "calls": 0}
+
+
+def configure_llm_concurrency(limit: int) -> None:
+    """Set the cap; call on startup before any LLM call is made."""
+    global _limit, _slots
+    _limit = max(1, limit)
+    _slots = None
+
+
+@asynccontextmanager
+async def llm_slot() -> AsyncIterator[None]:
+    """Hold one of the process-wide LLM slots for the duration of an ainvoke/astream call."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(_limit)
+    _stats["waiting"] += 1
+    try:
+        await _slots.acquire()
+    finally:
+        _stats["waiting"] -= 1
+    _stats["in_flight"] += 1
+    _stats["calls"] += 1
+    try:
+        yield
+    finally:
+        _stats["in_flight"] -= 1
+        _slots.release()
+
+
+def llm_stats() -> dict[str, Any]:
+    return {"limit": _limit, **_stats}
@@ -1,10 +1,16 @@
 """Orchestrator FastAPI app: POST /query -> plan, execute, report."""
 from __future__ import annotations
 
+import asyncio
+import base64
+import datetime
+import json
 import logging
 import os
 import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator
 
 from dotenv import load_dotenv
 
@@ -15,30 +21,38 @@ for _p in (_PROJECT_ROOT / "config" / "env" / ".env", _PROJECT_ROOT / ".env"):
         load_dotenv(_p, override=False)
         break
 
-import asyncpg
-
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger("orchestrator")
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from src.core.config.loader import load_domain_config
 from src.core.contracts.gateway import QueryRequest, QueryResponse
-from src.core.contracts.orchestrator import Plan, StepResult
 from src.orchestrator.session import (
     get_app_db_url,
+    init_pool,
+    close_pool,
+    get_pool,
+    acquire,
+    pool_stats,
+    get_trace,
+    get_latest_trace,
+    get_recent_plans,
+    list_requests,
     create_request,
-    update_request_final,
-    save_plan,
-    save_step_result,
-    get_request,
-    get_plan,
-    get_step_results,
-    get_latest_request_id,
+    delete_expired_answers,
 )
-from src.orchestrator.planner import build_plan
-from src.orchestrator.executor import run_plan
-from src.orchestrator.reporter import synthesize_final_answer
+from src.orchestrator.agent_client import get_agent_client, close_agent_client, agent_client_stats
+from src.orchestrator.llm import configure_llm_concurrency, llm_stats
+from src.core.llm_cache import configure_llm_cache, llm_cache_stats
+from src.orchestrator.plan_cache import PlanCache
+from src.orchestrator.answer_cache import AnswerCache
+from src.orchestrator.pipeline import QueryPipeline
+from src.orchestrator.persistence import WriteBehindPersister
+from src.orchestrator.jobs import TERMINAL_STATUSES, CompletionListener, JobWorker, enqueue_job
+from src.orchestrator.step_cache import step_cache_stats
+from src.orchestrator.trace_cache import TraceCache, trace_etag
 
 app = FastAPI(title="Multi-Agent: Orchestrator")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
@@ -46,6 +60,22 @@ app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], all
 CONFIG_PATH = os.environ.get("CONFIG_PATH", "config/domains/manufacturing.json")
 PROJECT_ROOT = _PROJECT_ROOT
 DOMAIN_CONFIG = None
+PLAN_CACHE = None
+ANSWER_CACHE = None
+TRACE_CACHE: TraceCache | None = None
+PIPELINE = None
+PERSISTER: WriteBehindPersister | None = None
+JOB_WORKER: JobWorker | None = None
+COMPLETIONS: CompletionListener | None = None
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+def _spawn(coro) -> asyncio.Task:
+    """Run a background coroutine, keeping a reference so it is not garbage-collected mid-flight."""
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return task
 
 
 def get_config():
@@ -55,161 +85,326 @@ def get_config():
     return DOMAIN_CONFIG
 
 
-@app.on_event("startup")
-def startup():
-    get_config()
+def get_plan_cache() -> PlanCache:
+    global PLAN_CACHE
+    if PLAN_CACHE is None:
+        PLAN_CACHE = PlanCache(get_config().plan_cache)
+    return PLAN_CACHE
 
 
-@app.get("/health")
-def health():
-    return {"status": "ok"}
+def get_answer_cache() -> AnswerCache:
+    global ANSWER_CACHE
+    if ANSWER_CACHE is None:
+        config = get_config()
+        ANSWER_CACHE = AnswerCache(config.answer_cache, config)
+    return ANSWER_CACHE
 
 
-@app.get("/request/{request_id}")
-async def get_request_trace(request_id: str):
-    """Return full trace for a request: request, plan, step_results. For Chat UI flow and internal chat."""
-    try:
-        rid = uuid.UUID(request_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid request_id")
-    env = dict(os.environ)
-    try:
-        url = get_app_db_url(env)
-    except ValueError:
-        url = os.getenv("POSTGRES_APP_URL", "").replace("postgresql+asyncpg://", "postgresql://")
-    if not url:
-        raise HTTPException(status_code=500, detail="POSTGRES_APP_URL not set")
-    conn = await asyncpg.connect(url)
-    try:
-        req = await get_request(conn, rid)
-        if not req:
-            raise HTTPException(status_code=404, detail="Request not found")
-        plan = await get_plan(conn, rid)
-        step_results = await get_step_results(conn, rid)
-    finally:
-        await conn.close()
-    steps = [s.model_dump() for s in plan.steps] if plan else []
-    return {
-        "request_id": req["id"],
-        "query": req["query"],
-        "status": req["status"],
-        "final_answer": req["final_answer"],
-        "error_message": req["error_message"],
-        "created_at": req["created_at"],
-        "plan": {"steps": steps},
-        "step_results": step_results,
-    }
+def get_trace_cache() -> TraceCache:
+    global TRACE_CACHE
+    if TRACE_CACHE is None:
+        TRACE_CACHE = TraceCache(get_config().trace_cache.max_entries)
+    return TRACE_CACHE
 
 
-@app.get("/trace/last")
-async def get_trace_last(domain_id: str | None = None):
-    """Return full trace for the most recent request (optional domain_id filter). For Chat UI."""
-    env = dict(os.environ)
+def get_persister() -> WriteBehindPersister:
+    global PERSISTER
+    if PERSISTER is None:
+        PERSISTER = WriteBehindPersister(get_config().persistence, _session)
+    return PERSISTER
+
+
+def get_pipeline() -> QueryPipeline:
+    global PIPELINE
+    if PIPELINE is None:
+        PIPELINE = QueryPipeline(get_config(), get_plan_cache(), get_answer_cache(), _session, get_persister(), get_trace_cache())
+    return PIPELINE
+
+
+def _app_db_url() -> str:
     try:
-        url = get_app_db_url(env)
+        url = get_app_db_url(dict(os.environ))
     except ValueError:
         url = os.getenv("POSTGRES_APP_URL", "").replace("postgresql+asyncpg://", "postgresql://")
     if not url:
         raise HTTPException(status_code=500, detail="POSTGRES_APP_URL not set")
-    conn = await asyncpg.connect(url)
-    try:
-        rid = await get_latest_request_id(conn, domain_id)
-        if not rid:
-            raise HTTPException(status_code=404, detail="No requests found")
-        req = await get_request(conn, rid)
-        plan = await get_plan(conn, rid)
-        step_results = await get_step_results(conn, rid)
-    finally:
-        await conn.close()
-    steps = [s.model_dump() for s in plan.steps] if plan else []
-    return {
-        "request_id": req["id"],
-        "query": req["query"],
-        "status": req["status"],
-        "final_answer": req["final_answer"],
-        "error_message": req["error_message"],
-        "created_at": req["created_at"],
-        "plan": {"steps": steps},
-        "step_results": step_results,
-    }
+    return url
 
 
-@app.post("/query", response_model=QueryResponse)
-async def query(req: QueryRequest):
+async def _init_session_pool() -> None:
     config = get_config()
-    domain_id = req.domain_id or config.domain_id
-    env = dict(os.environ)
+    pool_config = config.session_store.pool if config.session_store else None
+    await init_pool(_app_db_url(), pool_config)
 
-    log.info("QUERY: %s", (req.query[:200] + "…") if len(req.query) > 200 else req.query)
 
+@app.on_event("startup")
+async def startup():
+    config = get_config()
+    configure_llm_concurrency(config.execution.max_concurrent_llm_calls)
+    configure_llm_cache(config.llm_cache, PROJECT_ROOT)
+    get_agent_client(config)
+    get_persister().start()
+    try:
+        await _init_session_pool()
+    except Exception as e:
+        # Keep /health up; the pool is retried on the first request that needs the database.
+        log.warning("Session store pool not created: %s", getattr(e, "detail", e))
+    else:
+        _spawn(_seed_plan_cache())
+        _spawn(_purge_answer_cache())
+    _start_jobs()
+
+
+def _start_jobs() -> None:
+    """Completion listener for /request/{id}/wait, plus job workers unless jobs.workers is 0.
+    Started even when the database is down at boot: both retry their connections with backoff."""
+    global JOB_WORKER, COMPLETIONS
+    config = get_config()
     try:
-        url = get_app_db_url(env)
+        url = _app_db_url()
+    except HTTPException as e:
+        log.warning("Job workers not started: %s", e.detail)
+        return
+    COMPLETIONS = CompletionListener(url, on_done=_discard_trace)
+    COMPLETIONS.start()
+    if config.jobs.workers > 0:
+        JOB_WORKER = JobWorker(get_pipeline(), _session, config.jobs, url)
+        JOB_WORKER.start()
+
+
+def _discard_trace(request_id: str) -> None:
+    """A request finished (again, if its job was rerun) in some process: reload its trace on the next read."""
+    try:
+        get_trace_cache().discard(uuid.UUID(request_id))
     except ValueError:
-        url = os.getenv("POSTGRES_APP_URL", "").replace("postgresql+asyncpg://", "postgresql://")
-    if not url:
-        raise HTTPException(status_code=500, detail="POSTGRES_APP_URL not set")
+        pass
+
 
-    conn = await asyncpg.connect(url)
+async def _seed_plan_cache() -> None:
+    config = get_config()
+    cache = get_plan_cache()
+    if not config.plan_cache.enabled:
+        return
     try:
-        request_id = await create_request(conn, domain_id, req.query, req.session_id)
-    finally:
-        await conn.close()
+        async with _session() as conn:
+            history = await get_recent_plans(conn, config.domain_id, config.plan_cache.seed_limit)
+        await cache.seed(history, config)
+    except Exception as e:
+        log.warning("Plan cache not seeded: %s", e)
 
+
+async def _purge_answer_cache() -> None:
     try:
-        plan = build_plan(req.query, config)
+        async with _session() as conn:
+            purged = await delete_expired_answers(conn)
+        if purged:
+            log.info("Answer cache: purged %s expired entries", purged)
     except Exception as e:
-        log.exception("Plan failed")
-        await _update_status(url, request_id, "failed", error_message=str(e))
-        return QueryResponse(request_id=str(request_id), status="failed", error=str(e))
+        log.warning("Answer cache not purged: %s", e)
+
 
-    for i, s in enumerate(plan.steps, 1):
-        log.info("PLAN step %s → %s: %s", i, s.agent_name, (s.task_description[:80] + "…") if len(s.task_description) > 80 else s.task_description)
+@app.on_event("shutdown")
+async def shutdown():
+    if JOB_WORKER is not None:
+        await JOB_WORKER.stop()
+    if COMPLETIONS is not None:
+        await COMPLETIONS.close()
+    if PERSISTER is not None:
+        await PERSISTER.stop()
+    await close_agent_client()
+    await close_pool()
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics():
+    """Runtime stats for capacity planning (session store pool, write-behind persister, agent HTTP client, LLM slots and cache, plan, step, answer and trace caches, job workers)."""
+    return {
+        "session_pool": pool_stats(),
+        "persistence": get_persister().stats(),
+        "agent_client": agent_client_stats(),
+        "llm": llm_stats(),
+        "llm_cache": llm_cache_stats(),
+        "plan_cache": get_plan_cache().stats(),
+        "step_cache": step_cache_stats(),
+        "answer_cache": get_answer_cache().stats(),
+        "trace_cache": get_trace_cache().stats(),
+        "jobs": JOB_WORKER.stats() if JOB_WORKER else None,
+    }
 
-    conn = await asyncpg.connect(url)
+
+def _trace_response(http_request: Request, immutable: bool, body: bytes, etag: str) -> Response:
+    """Trace JSON with an ETag; 304 when the client already has this version. A finished request's
+    trace never changes, so /request/{id} lets clients keep it; anything else must be revalidated."""
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400, immutable" if immutable else "no-cache"}
+    if_none_match = http_request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _load_trace(request_id: uuid.UUID) -> tuple[bool, bytes, str] | None:
+    """(finished, JSON body, ETag) for a request: from the trace cache, else one aggregated query."""
+    cache = get_trace_cache()
+    hit = cache.get(request_id)
+    if hit is not None:
+        return True, *hit
+    async with _session() as conn:
+        row = await get_trace(conn, request_id)
+    if row is None:
+        return None
+    status, trace = row
+    body = trace.encode()
+    etag = trace_etag(body)
+    finished = status in TERMINAL_STATUSES
+    if finished:
+        cache.put(request_id, body, etag)
+    return finished, body, etag
+
+
+def _parse_request_id(request_id: str) -> uuid.UUID:
     try:
-        await save_plan(conn, request_id, plan)
-    finally:
-        await conn.close()
+        return uuid.UUID(request_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid request_id")
 
-    step_results = await run_plan(plan, req.query, config)
 
-    conn = await asyncpg.connect(url)
+@app.get("/request/{request_id}")
+async def get_request_trace(request_id: str, http_request: Request):
+    """Return full trace for a request: request, plan, step_results. For Chat UI flow and internal chat.
+    Sends an ETag; pollers that send it back as If-None-Match get 304 while nothing changed."""
+    rid = _parse_request_id(request_id)
+    loaded = await _load_trace(rid)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Request not found")
+    return _trace_response(http_request, *loaded)
+
+
+@app.get("/request/{request_id}/wait")
+async def wait_for_request(request_id: str, http_request: Request, timeout: float = 30.0):
+    """Long-poll: return the trace once the request reaches a terminal status, or after timeout
+    seconds (capped at 300) with whatever status it has then. For async (mode=async) queries."""
+    rid = _parse_request_id(request_id)
+    if COMPLETIONS is None:
+        return await get_request_trace(request_id, http_request)
+    fut = COMPLETIONS.register(request_id)
     try:
-        step_by_idx = {s.step_index: s for s in plan.steps}
-        for sr in step_results:
-            step = step_by_idx.get(sr.step_index)
-            task_desc = step.task_description if step else ""
-            await save_step_result(
-                conn,
-                request_id,
-                sr.step_index,
-                sr.agent_name,
-                {"task": task_desc},
-                sr.output,
-                sr.status,
-                sr.latency_ms,
-            )
+        loaded = await _load_trace(rid)
+        if loaded is None:
+            raise HTTPException(status_code=404, detail="Request not found")
+        if not loaded[0] and await COMPLETIONS.wait(fut, max(0.0, min(timeout, 300.0))):
+            loaded = await _load_trace(rid) or loaded
+        return _trace_response(http_request, *loaded)
     finally:
-        await conn.close()
+        COMPLETIONS.discard(request_id, fut)
+
+
+@app.get("/trace/last")
+async def get_trace_last(http_request: Request, domain_id: str | None = None):
+    """Return full trace for the most recent request (optional domain_id filter). For Chat UI."""
+    async with _session() as conn:
+        row = await get_latest_trace(conn, domain_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="No requests found")
+    rid, status, trace = row
+    body = trace.encode()
+    etag = trace_etag(body)
+    if status in TERMINAL_STATUSES:
+        get_trace_cache().put(rid, body, etag)
+    return _trace_response(http_request, False, body, etag)  # "last" moves on with the next request
 
-    try:
-        final_answer = synthesize_final_answer(req.query, step_results)
-    except Exception as e:
-        log.exception("Synthesis failed")
-        await _update_status(url, request_id, "partial", error_message=str(e))
-        return QueryResponse(request_id=str(request_id), status="partial", final_answer=None, error=str(e))
 
-    log.info("FINAL ANSWER: %s", (final_answer[:300] + "…") if final_answer and len(final_answer) > 300 else (final_answer or "(empty)"))
-    await _update_status(url, request_id, "completed", final_answer=final_answer)
-    return QueryResponse(request_id=str(request_id), status="completed", final_answer=final_answer)
+def _encode_cursor(created_at: datetime.datetime, request_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{request_id}".encode()).decode().rstrip("=")
 
 
-async def _update_status(url: str, request_id, status: str, final_answer: str | None = None, error_message: str | None = None):
-    conn = await asyncpg.connect(url)
+def _decode_cursor(cursor: str) -> tuple[datetime.datetime, uuid.UUID]:
     try:
-        await update_request_final(conn, request_id, status, final_answer=final_answer, error_message=error_message)
-    finally:
-        await conn.close()
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, request_id = raw.split("|", 1)
+        return datetime.datetime.fromisoformat(created_at), uuid.UUID(request_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _utc(value: datetime.datetime | None) -> datetime.datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+@app.get("/requests")
+async def list_request_history(
+    domain_id: str | None = None,
+    status: str | None = None,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+):
+    """Request summaries, newest first. status takes a comma-separated list; since/until are ISO
+    timestamps (UTC when no offset is given). Pass next_cursor back as cursor for the next page."""
+    limit = max(1, min(limit, 500))
+    statuses = [s.strip() for s in status.split(",") if s.strip()] if status else None
+    after = _decode_cursor(cursor) if cursor else None
+    async with _session() as conn:
+        rows = await list_requests(conn, domain_id, statuses, _utc(since), _utc(until), after, limit + 1)
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1]["created_at"], page[-1]["request_id"]) if len(rows) > limit else None
+    return {"requests": page, "next_cursor": next_cursor}
+
+
+@app.post("/query", response_model=QueryResponse)
+async def query(req: QueryRequest, mode: str = "sync"):
+    """mode=sync (default) runs the pipeline and answers when done. mode=async answers 202 with the
+    request_id as soon as the job is queued; poll /request/{id} or long-poll /request/{id}/wait."""
+    pipeline = get_pipeline()
+    if mode == "sync":
+        return await pipeline.run(req)
+    if mode != "async":
+        raise HTTPException(status_code=400, detail="mode must be 'sync' or 'async'")
+    cached = await pipeline.answer_from_cache(req)
+    if cached is not None:
+        return cached
+    domain_id = req.domain_id or get_config().domain_id
+    async with _session() as conn:
+        async with conn.transaction():
+            request_id = await create_request(conn, domain_id, req.query, req.session_id, status="queued", payload=req.model_dump_json())
+            await enqueue_job(conn, request_id, domain_id, req)
+    log.info("QUEUED: %s", request_id)
+    body = QueryResponse(request_id=str(request_id), status="queued").model_dump()
+    return JSONResponse(status_code=202, content=body, headers={"Location": f"/request/{request_id}"})
+
+
+@app.post("/query/stream")
+async def query_stream(req: QueryRequest):
+    """Same pipeline as /query as Server-Sent Events: request, plan, step (one per finished step),
+    token (reporter output as generated) and a closing final event carrying the QueryResponse."""
+
+    async def sse() -> AsyncIterator[str]:
+        try:
+            async for name, data in get_pipeline().events(req):
+                yield f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+        except Exception as e:
+            log.exception("Stream failed")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@asynccontextmanager
+async def _session():
+    """Borrow a pooled session-store connection; creates the pool if startup could not reach the DB."""
+    try:
+        get_pool()
+    except RuntimeError:
+        await _init_session_pool()
+    async with acquire() as conn:
+        yield conn
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""Write-behind persistence for request state (plans, step results, status updates).
+
+Writes from every in-flight request go into one bounded in-process queue. A background flusher
+writes them in batches: one transaction with one executemany per table, once batch_size rows are
+queued or flush_interval seconds after the first row. When the database falls behind, the queue
+fills up and writers wait in put (backpressure) rather than buffering without limit.
+
+Terminal status updates are awaited and flushed at once, together with everything queued before
+them. So /request/{id}, job completion and the answer cache never see a finished request whose
+steps are still in memory. stop() drains the queue on shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Callable
+
+import asyncpg
+
+from src.core.config.models import PersistenceConfig
+from src.core.contracts.orchestrator import Plan
+from src.orchestrator.session import plan_row, request_final_row, step_result_row, write_batch
+
+log = logging.getLogger("orchestrator")
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[asyncpg.Connection]]
+
+_PLAN, _STEP, _FINAL, _TOUCH = "plan", "step", "final", "touch"
+# (kind, row, future resolved once the row is committed, or None when nobody waits)
+_Entry = tuple[str, Any, "asyncio.Future[None] | None"]
+
+
+class WriteBehindPersister:
+    def __init__(self, config: PersistenceConfig, session: SessionFactory):
+        self.config = config
+        self.session = session
+        self._queue: asyncio.Queue[_Entry] = asyncio.Queue(maxsize=max(1, config.queue_size))
+        self._task: asyncio.Task | None = None
+        self._stats = {"rows": 0, "batches": 0, "failed_rows": 0, "max_batch": 0, "backpressure_waits": 0, "write_ms": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> asyncio.Task | None:
+        """Start the flusher. Without it (disabled, or not started yet) every write goes straight to the database."""
+        if self.config.enabled and not self.running:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def save_plan(self, request_id: uuid.UUID, plan: Plan) -> None:
+        await self._put(_PLAN, plan_row(request_id, plan))
+
+    async def save_step_result(
+        self,
+        request_id: uuid.UUID,
+        step_index: int,
+        agent_name: str,
+        input_payload: dict,
+        output_payload: dict | str,
+        status: str,
+        latency_ms: int | None,
+    ) -> None:
+        await self._put(_STEP, step_result_row(request_id, step_index, agent_name, input_payload, output_payload, status, latency_ms))
+
+    async def update_request_final(
+        self,
+        request_id: uuid.UUID,
+        status: str,
+        final_answer: str | None = None,
+        error_message: str | None = None,
+    ) -> None:
+        """Terminal status: returns once it (and every row queued before it) is committed."""
+        await self._put(_FINAL, request_final_row(request_id, status, final_answer, error_message), wait=True)
+
+    async def touch_request(self, request_id: uuid.UUID) -> None:
+        await self._put(_TOUCH, request_id)
+
+    async def _put(self, kind: str, row: Any, wait: bool = False) -> None:
+        if not self.running:
+            await self._write([(kind, row, None)])
+            return
+        fut: asyncio.Future[None] | None = asyncio.get_running_loop().create_future() if wait else None
+        if self._queue.full():
+            self._stats["backpressure_waits"] += 1
+        await self._queue.put((kind, row, fut))
+        if fut is not None:
+            await fut
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.config.flush_interval
+            while len(batch) < self.config.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0 or any(fut is not None for _, _, fut in batch):
+                    break
+                getter = asyncio.ensure_future(self._queue.get())
+                done, _ = await asyncio.wait({getter}, timeout=timeout)
+                if getter not in done:
+                    getter.cancel()
+                    break
+                batch.append(getter.result())
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list[_Entry]) -> None:
+        started = time.perf_counter()
+        try:
+            await self._write(batch)
+        except Exception as e:
+            # One bad row (e.g. its request was deleted) must not lose the rest of the batch.
+            log.warning("Write-behind batch of %s rows failed (%s); retrying row by row", len(batch), e)
+            for entry in batch:
+                try:
+                    await self._write([entry])
+                except Exception as row_error:
+                    self._stats["failed_rows"] += 1
+                    log.error("Write-behind %s row dropped: %s", entry[0], row_error)
+                    _resolve(entry[2], row_error)
+                else:
+                    _resolve(entry[2])
+        else:
+            for _, _, fut in batch:
+                _resolve(fut)
+        self._stats["rows"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+        self._stats["write_ms"] += (time.perf_counter() - started) * 1000
+
+    async def _write(self, batch: list[_Entry]) -> None:
+        rows: dict[str, list[Any]] = {_PLAN: [], _STEP: [], _FINAL: [], _TOUCH: []}
+        for kind, row, _ in batch:
+            rows[kind].append(row)
+        async with self.session() as conn:
+            await write_batch(conn, rows[_PLAN], rows[_STEP], rows[_FINAL], list(dict.fromkeys(rows[_TOUCH])))
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the flusher; later writes go straight to the database."""
+        if self._task is None:
+            return
+        if self.running:
+            await self._queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        leftover: list[_Entry] = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+            self._queue.task_done()
+        if leftover:
+            await self._flush(leftover)
+
+    def stats(self) -> dict[str, Any]:
+        batches = self._stats["batches"]
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "avg_batch": round(self._stats["rows"] / batches, 1) if batches else 0.0,
+            **self._stats,
+            "write_ms": round(self._stats["write_ms"], 1),
+        }
+
+
+def _resolve(fut: asyncio.Future[None] | None, error: Exception | None = None) -> None:
+    if fut is None or fut.done():
+        return
+    if error is None:
+        fut.set_result(None)
+    else:
+        fut.set_exception(error)
@@ -0,0 +1,224 @@
+"""The /query pipeline (answer cache, plan, execute, report) as a stream of events.
+
+POST /query drains the stream and returns the final event; /query/stream forwards every event
+as it happens, so clients see the plan after planning, each step as it finishes and the
+reporter's tokens as they are generated.
+
+Events are (name, data) pairs:
+  request  {request_id, cached_from?}            request row created
+  plan     {steps, from_cache}                   plan ready
+  delta    {step_index, agent_name, text}        agent output chunk while a step runs (streaming, agent_client.streaming)
+  step     StepResult                            one step finished
+  token    {text}                                reporter output chunk (streaming only)
+  final    QueryResponse                         always last
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from typing import Any, AsyncIterator
+
+from src.core.config.models import DomainConfig, PersistenceConfig
+from src.core.contracts.gateway import QueryRequest, QueryResponse
+from src.core.contracts.orchestrator import Plan, StepResult
+from src.orchestrator.answer_cache import AnswerCache
+from src.orchestrator.executor import run_plan
+from src.orchestrator.persistence import SessionFactory, WriteBehindPersister
+from src.orchestrator.plan_cache import PlanCache
+from src.orchestrator.planner import abuild_plan
+from src.orchestrator.reporter import astream_final_answer, asynthesize_final_answer
+from src.orchestrator.trace_cache import TraceCache
+from src.orchestrator.session import (
+    create_cached_request,
+    create_request,
+    delete_failed_step_results,
+    get_completed_steps,
+    get_plan,
+    mark_request_running,
+)
+
+log = logging.getLogger("orchestrator")
+
+Event = tuple[str, dict[str, Any]]
+
+
+def _preview(text: str | None, n: int) -> str:
+    if not text:
+        return "(empty)"
+    return (text[:n] + "…") if len(text) > n else text
+
+
+class QueryPipeline:
+    def __init__(
+        self,
+        config: DomainConfig,
+        plan_cache: PlanCache,
+        answer_cache: AnswerCache,
+        session: SessionFactory,
+        persister: WriteBehindPersister | None = None,
+        trace_cache: TraceCache | None = None,
+    ):
+        self.config = config
+        self.plan_cache = plan_cache
+        self.answer_cache = answer_cache
+        self.session = session
+        self.trace_cache = trace_cache
+        # Without a (started) persister, plan, step and status writes go straight to the database.
+        self.persister = persister or WriteBehindPersister(PersistenceConfig(enabled=False), session)
+
+    async def run(self, req: QueryRequest) -> QueryResponse:
+        """Run the whole pipeline and return its final response (POST /query)."""
+        final: dict[str, Any] = {}
+        async for name, data in self.events(req, stream_tokens=False):
+            if name == "final":
+                final = data
+        return QueryResponse(**final)
+
+    async def _update_status(self, request_id: Any, status: str, final_answer: str | None = None, error_message: str | None = None) -> None:
+        await self.persister.update_request_final(request_id, status, final_answer=final_answer, error_message=error_message)
+
+    async def _heartbeat(self, request_id: uuid.UUID) -> None:
+        """Keep app.requests.updated_at fresh while this process works on the request (see jobs.recover_stale_requests)."""
+        while True:
+            await asyncio.sleep(self.config.execution.heartbeat_seconds)
+            try:
+                await self.persister.touch_request(request_id)
+            except Exception as e:
+                log.warning("heartbeat for %s failed: %s", request_id, e)
+
+    async def answer_from_cache(self, req: QueryRequest) -> QueryResponse | None:
+        """Serve req from the answer cache: records a completed request pointing at the original."""
+        domain_id = req.domain_id or self.config.domain_id
+        if req.no_cache or not self.answer_cache.enabled:
+            return None
+        async with self.session() as conn:
+            hit = await self.answer_cache.lookup(conn, self.answer_cache.key(req.query, domain_id))
+            if hit is None:
+                return None
+            original_id, final_answer = hit
+            request_id = await create_cached_request(conn, domain_id, req.query, final_answer, original_id)
+        log.info("FINAL ANSWER served from cache (request %s)", original_id)
+        return QueryResponse(request_id=str(request_id), status="completed", final_answer=final_answer, cached_from=str(original_id))
+
+    async def events(self, req: QueryRequest, stream_tokens: bool = True, request_id: uuid.UUID | None = None) -> AsyncIterator[Event]:
+        """Pipeline events for req. With request_id (a queued or recovered request run by a job worker)
+        the answer cache was already consulted at enqueue time and the existing request row is used;
+        if it already has a plan, planning is skipped and checkpointed successful steps are not rerun."""
+        config = self.config
+        domain_id = req.domain_id or config.domain_id
+        log.info("QUERY: %s", _preview(req.query, 200))
+
+        cache_key = self.answer_cache.key(req.query, domain_id) if self.answer_cache.enabled else None
+        plan: Plan | None = None
+        completed: list[StepResult] = []
+        if request_id is None:
+            cached = await self.answer_from_cache(req)
+            if cached is not None:
+                yield "request", {"request_id": cached.request_id, "cached_from": cached.cached_from}
+                yield "final", cached.model_dump()
+                return
+            async with self.session() as conn:
+                request_id = await create_request(conn, domain_id, req.query, req.session_id, payload=req.model_dump_json())
+        else:
+            # Queued or recovered request: resume from its checkpointed plan and successful steps.
+            async with self.session() as conn:
+                await mark_request_running(conn, request_id)
+                if self.trace_cache is not None:
+                    # A requeued job can rerun a request that already finished once; its cached trace is stale now.
+                    self.trace_cache.discard(request_id)
+                plan = await get_plan(conn, request_id)
+                if plan is not None:
+                    await delete_failed_step_results(conn, request_id)
+                    completed = await get_completed_steps(conn, request_id)
+        yield "request", {"request_id": str(request_id)}
+
+        try:
+            if plan is None:
+                plan, query_vector = await self.plan_cache.lookup(req.query, config)
+                if plan is None:
+                    plan = await abuild_plan(req.query, config)
+                    self.plan_cache.put(req.query, config, plan, query_vector)
+                await self.persister.save_plan(request_id, plan)
+            elif completed:
+                log.info("RESUME %s: %s of %s steps already done", request_id, len(completed), len(plan.steps))
+        except Exception as e:
+            log.exception("Plan failed")
+            await self._update_status(request_id, "failed", error_message=str(e))
+            yield "final", QueryResponse(request_id=str(request_id), status="failed", error=str(e)).model_dump()
+            return
+
+        if plan.from_cache:
+            log.info("PLAN served from cache (%s steps)", len(plan.steps))
+        for i, s in enumerate(plan.steps, 1):
+            log.info("PLAN step %s → %s: %s", i, s.agent_name, _preview(s.task_description, 80))
+        yield "plan", {"steps": [s.model_dump() for s in plan.steps], "from_cache": plan.from_cache}
+        for sr in completed:
+            yield "step", sr.model_dump()
+
+        progress: asyncio.Queue[Event] = asyncio.Queue()
+        step_by_idx = {s.step_index: s for s in plan.steps}
+
+        async def on_step(sr: StepResult) -> None:
+            # Checkpoint each step as it finishes (write-behind: a crash loses at most the steps still
+            # running plus the last flush_interval of writes, which a resume simply runs again).
+            step = step_by_idx.get(sr.step_index)
+            await self.persister.save_step_result(
+                request_id,
+                sr.step_index,
+                sr.agent_name,
+                {"task": step.task_description if step else "", "context_tokens": sr.context_tokens},
+                sr.output,
+                sr.status,
+                sr.latency_ms,
+            )
+            await progress.put(("step", sr.model_dump()))
+
+        async def on_delta(step_index: int, agent_name: str, text: str) -> None:
+            await progress.put(("delta", {"step_index": step_index, "agent_name": agent_name, "text": text}))
+
+        heartbeat = asyncio.create_task(self._heartbeat(request_id))
+        try:
+            execution = asyncio.create_task(
+                run_plan(plan, req.query, config, on_step=on_step, on_delta=on_delta if stream_tokens else None, completed=completed)
+            )
+            try:
+                while not (execution.done() and progress.empty()):
+                    getter = asyncio.ensure_future(progress.get())
+                    await asyncio.wait({getter, execution}, return_when=asyncio.FIRST_COMPLETED)
+                    if getter.done():
+                        yield getter.result()
+                    else:
+                        getter.cancel()
+                step_results = execution.result()
+            finally:
+                if not execution.done():
+                    execution.cancel()
+
+            budget = config.get_context_budget(config.orchestrator)
+            try:
+                if stream_tokens:
+                    chunks: list[str] = []
+                    async for text in astream_final_answer(req.query, step_results, budget):
+                        chunks.append(text)
+                        yield "token", {"text": text}
+                    final_answer = "".join(chunks)
+                else:
+                    final_answer = await asynthesize_final_answer(req.query, step_results, budget)
+            except Exception as e:
+                log.exception("Synthesis failed")
+                await self._update_status(request_id, "partial", error_message=str(e))
+                yield "final", QueryResponse(request_id=str(request_id), status="partial", final_answer=None, error=str(e)).model_dump()
+                return
+        finally:
+            heartbeat.cancel()
+
+        log.info("FINAL ANSWER: %s", _preview(final_answer, 300))
+        await self._update_status(request_id, "completed", final_answer=final_answer)
+        if cache_key is not None and final_answer and all(sr.status in ("success", "cached") for sr in step_results):
+            try:
+                async with self.session() as conn:
+                    await self.answer_cache.put(conn, cache_key, domain_id, req.query, request_id, final_answer)
+            except Exception as e:
+                log.warning("Answer not cached: %s", e)
+        yield "final", QueryResponse(request_id=str(request_id), status="completed", final_answer=final_answer).model_dump()
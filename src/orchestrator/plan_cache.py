@@ -0,0 +1,154 @@
+"""Plan cache: skip the planner LLM for question shapes that were already planned.
+
+Keyed by domain, the set of available agents and a query fingerprint. The exact tier matches the
+normalized query text; the optional embedding tier matches the nearest cached query above a
+cosine-similarity threshold, with one matrix-vector product over the scope's most recent
+max_semantic_scan embeddings.
+"""
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from src.core.config.models import DomainConfig, PlanCacheConfig
+from src.core.contracts.orchestrator import Plan, Step
+from src.core.hashing import normalize_query, stable_hash
+
+log = logging.getLogger("plan_cache")
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(v)) or 1.0
+    return v / norm
+
+
+class PlanCache:
+    def __init__(self, config: PlanCacheConfig):
+        self.config = config
+        # key -> (scope, steps as dicts, unit embedding or None)
+        self._entries: OrderedDict[str, tuple[str, list[dict[str, Any]], np.ndarray | None]] = OrderedDict()
+        # scope -> (keys, matrix of their unit embeddings, one row each); rebuilt after entries change
+        self._index: dict[str, tuple[list[str], np.ndarray]] | None = None
+        self._embeddings: Any = None
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "seeded": 0}
+
+    @property
+    def semantic(self) -> bool:
+        return self.config.similarity_threshold is not None
+
+    def _embedder(self) -> Any:
+        if self._embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._embeddings = OpenAIEmbeddings(model=self.config.embedding_model)
+        return self._embeddings
+
+    @staticmethod
+    def scope(domain_config: DomainConfig) -> str:
+        """Plans are only valid for the same domain and the same set of agents."""
+        return stable_hash(domain_config.domain_id, sorted(a.name for a in domain_config.agents))
+
+    def _key(self, scope: str, query: str) -> str:
+        return stable_hash(scope, normalize_query(query))
+
+    @staticmethod
+    def _valid(steps: list[dict[str, Any]], domain_config: DomainConfig) -> bool:
+        names = {a.name for a in domain_config.agents}
+        return bool(steps) and all(s.get("agent_name") in names for s in steps)
+
+    def _semantic_index(self, scope: str) -> tuple[list[str], np.ndarray] | None:
+        if self._index is None:
+            rows: dict[str, tuple[list[str], list[np.ndarray]]] = {}
+            for k, (s, _, v) in reversed(self._entries.items()):  # most recent first
+                if v is None:
+                    continue
+                keys, vectors = rows.setdefault(s, ([], []))
+                if len(keys) < self.config.max_semantic_scan:
+                    keys.append(k)
+                    vectors.append(v)
+            self._index = {s: (keys, np.vstack(vectors)) for s, (keys, vectors) in rows.items() if keys}
+        return self._index.get(scope)
+
+    async def lookup(self, query: str, domain_config: DomainConfig) -> tuple[Plan | None, np.ndarray | None]:
+        """Return (cached plan marked from_cache, query embedding). The embedding is handed back so a
+        miss can be stored with put() without embedding the query twice."""
+        if not self.config.enabled:
+            return None, None
+        scope = self.scope(domain_config)
+        key = self._key(scope, query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._stats["exact_hits"] += 1
+            return self._plan(entry[1]), entry[2]
+        vector = None
+        if self.semantic:
+            try:
+                vector = _unit(await self._embedder().aembed_query(normalize_query(query)))
+            except Exception as e:
+                log.warning("plan cache embedding failed: %s", e)
+            index = self._semantic_index(scope) if vector is not None else None
+            if index is not None:
+                keys, matrix = index
+                sims = matrix @ vector
+                i = int(np.argmax(sims))
+                if sims[i] >= self.config.similarity_threshold:
+                    best_key = keys[i]
+                    self._entries.move_to_end(best_key)
+                    self._stats["semantic_hits"] += 1
+                    log.info("plan cache: semantic hit (similarity %.3f)", sims[i])
+                    return self._plan(self._entries[best_key][1]), vector
+        self._stats["misses"] += 1
+        return None, vector
+
+    def put(self, query: str, domain_config: DomainConfig, plan: Plan, vector: np.ndarray | None = None) -> None:
+        if not self.config.enabled or plan.from_cache:
+            return
+        steps = [s.model_dump() for s in plan.steps]
+        if not self._valid(steps, domain_config):
+            return
+        self._store(self.scope(domain_config), query, steps, vector)
+
+    def _store(self, scope: str, query: str, steps: list[dict[str, Any]], vector: np.ndarray | None) -> None:
+        key = self._key(scope, query)
+        self._entries[key] = (scope, steps, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+        self._index = None
+
+    async def seed(self, history: list[tuple[str, list[dict[str, Any]]]], domain_config: DomainConfig) -> None:
+        """Load (query, steps) pairs from app.plans/app.requests history, newest first."""
+        if not self.config.enabled:
+            return
+        scope = self.scope(domain_config)
+        pairs = [(q, steps) for q, steps in reversed(history) if self._valid(steps, domain_config)]
+        vectors: list[np.ndarray | None] = [None] * len(pairs)
+        if self.semantic and pairs:
+            try:
+                raw = await self._embedder().aembed_documents([normalize_query(q) for q, _ in pairs])
+                vectors = [_unit(v) for v in raw]
+            except Exception as e:
+                log.warning("plan cache seed embeddings failed; exact tier only: %s", e)
+        for (query, steps), vector in zip(pairs, vectors):
+            self._store(scope, query, steps, vector)
+        self._stats["seeded"] += len(pairs)
+        log.info("plan cache seeded with %s plans", len(pairs))
+
+    @staticmethod
+    def _plan(steps: list[dict[str, Any]]) -> Plan:
+        return Plan(steps=[Step(**s) for s in steps], from_cache=True)
+
+    def stats(self) -> dict[str, Any]:
+        hits = self._stats["exact_hits"] + self._stats["semantic_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            "enabled": self.config.enabled,
+            "semantic": self.semantic,
+            "entries": len(self._entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
@@ -1,33 +1,55 @@
 """Generate a Plan (steps) from user query using LLM."""
 from __future__ import annotations
 
-from langchain_openai import ChatOpenAI
+import json
+from typing import Any
+
 from langchain_core.prompts import ChatPromptTemplate
 
 from src.core.config.models import DomainConfig
 from src.core.contracts.orchestrator import Plan, Step
+from src.core.llm_cache import get_chat_model
+from src.orchestrator.llm import llm_slot
 
 
 # In the template, only {agent_names} and {query} are variables; JSON example uses {{ }} for literal braces
 SYSTEM = """You are a planner. Given a user query and a list of available agents, output a JSON plan.
 Available agents: {agent_names}
 Output only valid JSON with this exact structure (no markdown, no explanation):
-{{ "steps": [{{ "step_index": 1, "agent_name": "<name>", "task_description": "<what to do>" }}, ...] }}
-Use only agent names from the list. Order steps logically."""
+{{ "steps": [{{ "step_index": 1, "agent_name": "<name>", "task_description": "<what to do>", "depends_on": [] }}, ...] }}
+Use only agent names from the list. Order steps logically.
+"depends_on" lists the step_index values whose results a step needs ([] if none). Steps that do not depend on each other run in parallel."""
 
 
-def build_plan(query: str, domain_config: DomainConfig) -> Plan:
-    agent_names = ", ".join(a.name for a in domain_config.agents)
+def _chain() -> Any:
     prompt = ChatPromptTemplate.from_messages([
         ("system", SYSTEM),
         ("human", "{query}"),
     ])
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    chain = prompt | llm
-    out = chain.invoke({"query": query, "agent_names": agent_names})
+    llm = get_chat_model(model="gpt-4o-mini", temperature=0)
+    return prompt | llm
+
+
+def _inputs(query: str, domain_config: DomainConfig) -> dict[str, str]:
+    agent_names = ", ".join(a.name for a in domain_config.agents)
+    return {"query": query, "agent_names": agent_names}
+
+
+def build_plan(query: str, domain_config: DomainConfig) -> Plan:
+    out = _chain().invoke(_inputs(query, domain_config))
+    return _parse_plan(out)
+
+
+async def abuild_plan(query: str, domain_config: DomainConfig) -> Plan:
+    """Async build_plan: awaits the LLM without blocking the event loop, within the process LLM limit."""
+    async with llm_slot():
+        out = await _chain().ainvoke(_inputs(query, domain_config))
+    return _parse_plan(out)
+
+
+def _parse_plan(out: Any) -> Plan:
     text = out.content if hasattr(out, "content") else str(out)
     # Parse JSON from response (strip markdown if present)
-    import json
     text = text.strip()
     if text.startswith("```"):
         text = text.split("```")[1]
@@ -35,5 +57,23 @@ def build_plan(query: str, domain_config: DomainConfig) -> Plan:
             text = text[4:]
     text = text.strip()
     data = json.loads(text)
-    steps = [Step(step_index=s["step_index"], agent_name=s["agent_name"], task_description=s["task_description"]) for s in data.get("steps", [])]
+    steps = [
+        Step(
+            step_index=s["step_index"],
+            agent_name=s["agent_name"],
+            task_description=s["task_description"],
+            depends_on=_parse_depends_on(s.get("depends_on")),
+        )
+        for s in data.get("steps", [])
+    ]
     return Plan(steps=steps)
+
+
+def _parse_depends_on(raw) -> list[int] | None:
+    """Keep integer step references; anything else means "no dependency info" (sequential fallback)."""
+    if not isinstance(raw, list):
+        return None
+    try:
+        return [int(d) for d in raw]
+    except (TypeError, ValueError):
+        return None
@@ -1,11 +1,17 @@
 """Synthesize final answer from step results using LLM."""
 from __future__ import annotations
 
-from langchain_openai import ChatOpenAI
+import logging
+from typing import Any, AsyncIterator
+
 from langchain_core.prompts import ChatPromptTemplate
 
 from src.core.contracts.orchestrator import StepResult
+from src.core.llm_cache import get_chat_model
+from src.orchestrator.context import count_tokens, fit_outputs
+from src.orchestrator.llm import llm_slot
 
+log = logging.getLogger("reporter")
 
 PROMPT = """You are a reporter. Given the user query and the results from each step, write a clear, concise final answer or report.
 Do not invent information. Use only the provided step results.
@@ -18,15 +24,39 @@ Step results:
 Write the final answer/report:"""
 
 
-def synthesize_final_answer(query: str, step_results: list[StepResult]) -> str:
-    parts = []
-    for sr in step_results:
-        out = sr.output
-        if isinstance(out, dict):
-            out = str(out)
-        parts.append(f"Step {sr.step_index} ({sr.agent_name}): {out}")
-    step_results_text = "\n\n".join(parts)
+def _chain() -> Any:
     prompt = ChatPromptTemplate.from_messages([("human", PROMPT)])
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    out = (prompt | llm).invoke({"query": query, "step_results": step_results_text})
+    llm = get_chat_model(model="gpt-4o-mini", temperature=0)
+    return prompt | llm
+
+
+def _inputs(query: str, step_results: list[StepResult], token_budget: int | None = None) -> dict[str, str]:
+    """With a token budget, step outputs share what is left after the prompt and query; long ones are compacted."""
+    if token_budget is None:
+        parts = [f"Step {sr.step_index} ({sr.agent_name}): {sr.output}" for sr in step_results]
+    else:
+        parts = fit_outputs(step_results, token_budget - count_tokens(PROMPT) - count_tokens(query))
+    text = "\n\n".join(parts)
+    log.info("reporter context: %s tokens (budget %s)", count_tokens(text), token_budget)
+    return {"query": query, "step_results": text}
+
+
+def synthesize_final_answer(query: str, step_results: list[StepResult], token_budget: int | None = None) -> str:
+    out = _chain().invoke(_inputs(query, step_results, token_budget))
     return out.content if hasattr(out, "content") else str(out)
+
+
+async def asynthesize_final_answer(query: str, step_results: list[StepResult], token_budget: int | None = None) -> str:
+    """Async synthesize_final_answer: awaits the LLM without blocking the event loop, within the process LLM limit."""
+    async with llm_slot():
+        out = await _chain().ainvoke(_inputs(query, step_results, token_budget))
+    return out.content if hasattr(out, "content") else str(out)
+
+
+async def astream_final_answer(query: str, step_results: list[StepResult], token_budget: int | None = None) -> AsyncIterator[str]:
+    """Yield the final answer as the LLM generates it (streamed calls bypass the LLM cache)."""
+    async with llm_slot():
+        async for chunk in _chain().astream(_inputs(query, step_results, token_budget)):
+            text = chunk.content if hasattr(chunk, "content") else str(chunk)
+            if text:
+                yield text
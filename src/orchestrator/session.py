@@ -1,14 +1,26 @@
 """Persist and load request state (requests, plans, step_results) in app Postgres."""
 from __future__ import annotations
 
+import asyncio
+import datetime
 import json
+import os
+import time
 import uuid
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 import asyncpg
 
+from src.core.config.models import PoolConfig
 from src.core.contracts.orchestrator import Plan, StepResult
 
+# App-lifetime pool shared by every request handler (see init_pool / acquire).
+_pool: asyncpg.Pool | None = None
+_pool_config = PoolConfig()
+_pool_lock = asyncio.Lock()
+_waiters = 0
+
 
 def get_app_db_url(env: dict[str, str]) -> str:
     url = env.get("POSTGRES_APP_URL")
@@ -17,23 +29,158 @@ def get_app_db_url(env: dict[str, str]) -> str:
     return url.replace("postgresql+asyncpg://", "postgresql://")
 
 
+async def init_pool(url: str, pool_config: PoolConfig | None = None) -> asyncpg.Pool:
+    """Create the shared session-store pool (idempotent). Call once on app startup."""
+    global _pool, _pool_config
+    async with _pool_lock:
+        if _pool is not None:
+            return _pool
+        cfg = pool_config or PoolConfig()
+        _pool = await asyncpg.create_pool(
+            url,
+            min_size=cfg.min_size,
+            max_size=cfg.max_size,
+            statement_cache_size=cfg.statement_cache_size,
+            max_inactive_connection_lifetime=cfg.max_inactive_connection_lifetime,
+        )
+        _pool_config = cfg
+        return _pool
+
+
+async def close_pool() -> None:
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
+
+def get_pool() -> asyncpg.Pool:
+    if _pool is None:
+        raise RuntimeError("Session store pool not initialized. Call init_pool() on startup.")
+    return _pool
+
+
+@asynccontextmanager
+async def acquire() -> AsyncIterator[asyncpg.Connection]:
+    """Borrow a connection from the shared pool; waits at most pool.acquire_timeout seconds."""
+    global _waiters
+    pool = get_pool()
+    _waiters += 1
+    try:
+        conn = await pool.acquire(timeout=_pool_config.acquire_timeout)
+    finally:
+        _waiters -= 1
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+def pool_stats() -> dict[str, Any]:
+    """Snapshot of the shared pool for sizing: connections in use, idle, and callers waiting to acquire."""
+    if _pool is None:
+        return {"initialized": False}
+    size = _pool.get_size()
+    idle = _pool.get_idle_size()
+    return {
+        "initialized": True,
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "waiters": _waiters,
+    }
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MIN_TS = datetime.datetime(1, 1, 1, tzinfo=datetime.timezone.utc)
+_MAX_TS = datetime.datetime(9999, 12, 31, tzinfo=datetime.timezone.utc)
+
+
+def new_request_id() -> uuid.UUID:
+    """Time-ordered (UUIDv7) request id; its millisecond timestamp is the request's created_at."""
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (ms & (2**48 - 1)) << 80 | 0x7 << 76 | (rand >> 68 & 0xFFF) << 64 | 0b10 << 62 | rand & (2**62 - 1)
+    return uuid.UUID(int=value)
+
+
+def request_created_at(request_id: uuid.UUID) -> datetime.datetime | None:
+    """created_at of a request minted by new_request_id; None for older (random) ids."""
+    if request_id.version != 7:
+        return None
+    return _EPOCH + datetime.timedelta(milliseconds=request_id.int >> 80)
+
+
+def created_at_bounds(request_id: uuid.UUID) -> tuple[datetime.datetime, datetime.datetime]:
+    """Partition key range to pair with a request id lookup, so Postgres scans only that request's
+    partition (migration 005). Exact for time-ordered ids; unbounded for ids minted before them."""
+    created_at = request_created_at(request_id)
+    return (created_at, created_at) if created_at else (_MIN_TS, _MAX_TS)
+
+
+# Plans and step results share their request's created_at, i.e. its partition (migration 005)
+_SAVE_PLAN_SQL = """
+    INSERT INTO app.plans (request_id, steps, created_at)
+    SELECT $1, $2::jsonb, r.created_at FROM app.requests r WHERE r.id = $1 AND r.created_at BETWEEN $3 AND $4
+    ON CONFLICT (request_id, created_at) DO UPDATE SET steps = EXCLUDED.steps
+"""
+
+_SAVE_STEP_SQL = """
+    INSERT INTO app.step_results (request_id, step_index, agent_name, input_payload, output_payload, status, latency_ms, created_at)
+    SELECT $1, $2, $3, $4::jsonb, $5::jsonb, $6, $7, r.created_at FROM app.requests r
+    WHERE r.id = $1 AND r.created_at BETWEEN $8 AND $9
+"""
+
+_UPDATE_FINAL_SQL = """
+    UPDATE app.requests SET status = $1, final_answer = $2, error_message = $3, updated_at = now()
+    WHERE id = $4 AND created_at BETWEEN $5 AND $6
+"""
+
+_TOUCH_SQL = """
+    UPDATE app.requests SET updated_at = now()
+    WHERE id = $1 AND created_at BETWEEN $2 AND $3 AND status = 'running'
+"""
+
+
 async def create_request(
     conn: asyncpg.Connection,
     domain_id: str,
     query: str,
     session_id: str | uuid.UUID | None = None,
+    status: str = "running",
+    payload: str | None = None,
 ) -> uuid.UUID:
+    """payload is the QueryRequest JSON, kept so a recovered request resumes with the same options."""
     del session_id  # unused in minimal schema
-    row = await conn.fetchrow(
+    request_id = new_request_id()
+    await conn.execute(
         """
-        INSERT INTO app.requests (domain_id, query, status)
-        VALUES ($1, $2, 'running')
-        RETURNING id
+        INSERT INTO app.requests (id, domain_id, query, status, created_at, payload)
+        VALUES ($1, $2, $3, $4, $5, $6::jsonb)
         """,
+        request_id,
         domain_id,
         query,
+        status,
+        request_created_at(request_id),
+        payload,
+    )
+    return request_id
+
+
+async def mark_request_running(conn: asyncpg.Connection, request_id: uuid.UUID) -> None:
+    """A queued request picked up by a job worker."""
+    await conn.execute(
+        """
+        UPDATE app.requests SET status = 'running', error_message = NULL, updated_at = now()
+        WHERE id = $1 AND created_at BETWEEN $2 AND $3
+        """,
+        request_id,
+        *created_at_bounds(request_id),
     )
-    return row["id"]
 
 
 async def update_request_final(
@@ -43,27 +190,102 @@ async def update_request_final(
     final_answer: str | None = None,
     error_message: str | None = None,
 ) -> None:
+    await conn.execute(_UPDATE_FINAL_SQL, *request_final_row(request_id, status, final_answer, error_message))
+
+
+async def create_cached_request(
+    conn: asyncpg.Connection,
+    domain_id: str,
+    query: str,
+    final_answer: str,
+    cached_from: uuid.UUID,
+) -> uuid.UUID:
+    """Record a request answered from the answer cache; cached_from is the request that produced the answer."""
+    request_id = new_request_id()
     await conn.execute(
         """
-        UPDATE app.requests SET status = $1, final_answer = $2, error_message = $3, updated_at = now()
-        WHERE id = $4
+        INSERT INTO app.requests (id, domain_id, query, status, final_answer, cached_from, created_at)
+        VALUES ($1, $2, $3, 'completed', $4, $5, $6)
         """,
-        status,
-        final_answer,
-        error_message,
         request_id,
+        domain_id,
+        query,
+        final_answer,
+        cached_from,
+        request_created_at(request_id),
     )
+    return request_id
 
 
-async def save_plan(conn: asyncpg.Connection, request_id: uuid.UUID, plan: Plan) -> None:
-    steps_json = json.dumps([s.model_dump() for s in plan.steps])
+async def get_cached_answer(conn: asyncpg.Connection, cache_key: str) -> dict[str, Any] | None:
+    """Unexpired answer_cache row for a key: request_id, final_answer, expires_at."""
+    row = await conn.fetchrow(
+        """
+        SELECT request_id, final_answer, expires_at FROM app.answer_cache
+        WHERE cache_key = $1 AND expires_at > now()
+        """,
+        cache_key,
+    )
+    return dict(row) if row else None
+
+
+async def put_cached_answer(
+    conn: asyncpg.Connection,
+    cache_key: str,
+    domain_id: str,
+    query: str,
+    request_id: uuid.UUID,
+    final_answer: str,
+    ttl_seconds: float,
+) -> None:
     await conn.execute(
-        "INSERT INTO app.plans (request_id, steps) VALUES ($1, $2::jsonb)",
+        """
+        INSERT INTO app.answer_cache (cache_key, domain_id, query, request_id, final_answer, expires_at)
+        VALUES ($1, $2, $3, $4, $5, now() + make_interval(secs => $6))
+        ON CONFLICT (cache_key) DO UPDATE SET
+            request_id = EXCLUDED.request_id, final_answer = EXCLUDED.final_answer,
+            created_at = now(), expires_at = EXCLUDED.expires_at
+        """,
+        cache_key,
+        domain_id,
+        query,
         request_id,
-        steps_json,
+        final_answer,
+        float(ttl_seconds),
     )
 
 
+async def delete_expired_answers(conn: asyncpg.Connection) -> int:
+    result = await conn.execute("DELETE FROM app.answer_cache WHERE expires_at <= now()")
+    return int(result.split()[-1])
+
+
+def plan_row(request_id: uuid.UUID, plan: Plan) -> tuple:
+    return (request_id, json.dumps([s.model_dump() for s in plan.steps]), *created_at_bounds(request_id))
+
+
+def step_result_row(
+    request_id: uuid.UUID,
+    step_index: int,
+    agent_name: str,
+    input_payload: dict,
+    output_payload: dict | str,
+    status: str,
+    latency_ms: int | None,
+) -> tuple:
+    in_json = json.dumps(input_payload)
+    out_json = json.dumps(output_payload) if isinstance(output_payload, dict) else json.dumps({"text": output_payload})
+    return (request_id, step_index, agent_name, in_json, out_json, status, latency_ms, *created_at_bounds(request_id))
+
+
+def request_final_row(request_id: uuid.UUID, status: str, final_answer: str | None = None, error_message: str | None = None) -> tuple:
+    return (status, final_answer, error_message, request_id, *created_at_bounds(request_id))
+
+
+async def save_plan(conn: asyncpg.Connection, request_id: uuid.UUID, plan: Plan) -> None:
+    await conn.execute(_SAVE_PLAN_SQL, *plan_row(request_id, plan))
+
+
 async def save_step_result(
     conn: asyncpg.Connection,
     request_id: uuid.UUID,
@@ -74,26 +296,90 @@ async def save_step_result(
     status: str,
     latency_ms: int | None,
 ) -> None:
-    in_json = json.dumps(input_payload)
-    out_json = json.dumps(output_payload) if isinstance(output_payload, dict) else json.dumps({"text": output_payload})
+    await conn.execute(
+        _SAVE_STEP_SQL,
+        *step_result_row(request_id, step_index, agent_name, input_payload, output_payload, status, latency_ms),
+    )
+
+
+async def write_batch(
+    conn: asyncpg.Connection,
+    plans: list[tuple] = (),
+    step_results: list[tuple] = (),
+    finals: list[tuple] = (),
+    touches: list[uuid.UUID] = (),
+) -> None:
+    """Write rows built by plan_row / step_result_row / request_final_row in one transaction,
+    one executemany per table. Plans and steps go first so a request never reads as finished
+    before its steps are visible; finals are applied in the order given."""
+    async with conn.transaction():
+        if plans:
+            await conn.executemany(_SAVE_PLAN_SQL, plans)
+        if step_results:
+            await conn.executemany(_SAVE_STEP_SQL, step_results)
+        if touches:
+            await conn.executemany(_TOUCH_SQL, [(rid, *created_at_bounds(rid)) for rid in touches])
+        if finals:
+            await conn.executemany(_UPDATE_FINAL_SQL, finals)
+
+
+async def delete_failed_step_results(conn: asyncpg.Connection, request_id: uuid.UUID) -> None:
+    """Drop unsuccessful step results before a request is resumed; those steps run again."""
     await conn.execute(
         """
-        INSERT INTO app.step_results (request_id, step_index, agent_name, input_payload, output_payload, status, latency_ms)
-        VALUES ($1, $2, $3, $4::jsonb, $5::jsonb, $6, $7)
+        DELETE FROM app.step_results
+        WHERE request_id = $1 AND created_at BETWEEN $2 AND $3 AND status NOT IN ('success', 'cached')
         """,
         request_id,
-        step_index,
-        agent_name,
-        in_json,
-        out_json,
-        status,
-        latency_ms,
+        *created_at_bounds(request_id),
+    )
+
+
+async def get_completed_steps(conn: asyncpg.Connection, request_id: uuid.UUID) -> list[StepResult]:
+    """Successful step results already checkpointed for a request, for resuming it."""
+    rows = await conn.fetch(
+        """
+        SELECT DISTINCT ON (step_index) step_index, agent_name, input_payload, output_payload, status, latency_ms
+        FROM app.step_results
+        WHERE request_id = $1 AND created_at BETWEEN $2 AND $3 AND status IN ('success', 'cached')
+        ORDER BY step_index
+        """,
+        request_id,
+        *created_at_bounds(request_id),
     )
+    results = []
+    for r in rows:
+        out = r["output_payload"]
+        if isinstance(out, str):
+            out = json.loads(out)
+        if isinstance(out, dict) and set(out) == {"text"}:
+            out = out["text"]  # save_step_result wraps plain-text output
+        inp = r["input_payload"]
+        if isinstance(inp, str):
+            inp = json.loads(inp)
+        results.append(StepResult(
+            step_index=r["step_index"],
+            agent_name=r["agent_name"],
+            output=out,
+            status=r["status"],
+            latency_ms=r["latency_ms"],
+            context_tokens=(inp or {}).get("context_tokens"),
+        ))
+    return results
+
+
+async def touch_request(conn: asyncpg.Connection, request_id: uuid.UUID) -> None:
+    """Heartbeat for a running request; the recovery sweep treats a stale updated_at as a dead run."""
+    await conn.execute(_TOUCH_SQL, request_id, *created_at_bounds(request_id))
 
 
 async def get_plan(conn: asyncpg.Connection, request_id: uuid.UUID) -> Plan | None:
     from src.core.contracts.orchestrator import Step
-    row = await conn.fetchrow("SELECT steps FROM app.plans WHERE request_id = $1", request_id)
+    row = await conn.fetchrow(
+        "SELECT steps FROM app.plans WHERE request_id = $1 AND created_at BETWEEN $2 AND $3",
+        request_id,
+        *created_at_bounds(request_id),
+    )
     if not row:
         return None
     steps_raw = row["steps"]
@@ -108,13 +394,14 @@ async def get_request(
     conn: asyncpg.Connection,
     request_id: uuid.UUID,
 ) -> dict[str, Any] | None:
-    """Load one request by id. Returns dict with id, domain_id, query, status, final_answer, error_message, created_at."""
+    """Load one request by id. Returns dict with id, domain_id, query, status, final_answer, error_message, created_at, cached_from."""
     row = await conn.fetchrow(
         """
-        SELECT id, domain_id, query, status, final_answer, error_message, created_at
-        FROM app.requests WHERE id = $1
+        SELECT id, domain_id, query, status, final_answer, error_message, created_at, cached_from
+        FROM app.requests WHERE id = $1 AND created_at BETWEEN $2 AND $3
         """,
         request_id,
+        *created_at_bounds(request_id),
     )
     if not row:
         return None
@@ -126,6 +413,7 @@ async def get_request(
         "final_answer": row["final_answer"],
         "error_message": row["error_message"],
         "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+        "cached_from": str(row["cached_from"]) if row["cached_from"] else None,
     }
 
 
@@ -137,9 +425,10 @@ async def get_step_results(
     rows = await conn.fetch(
         """
         SELECT step_index, agent_name, input_payload, output_payload, status, latency_ms
-        FROM app.step_results WHERE request_id = $1 ORDER BY step_index
+        FROM app.step_results WHERE request_id = $1 AND created_at BETWEEN $2 AND $3 ORDER BY step_index
         """,
         request_id,
+        *created_at_bounds(request_id),
     )
     return [
         {
@@ -154,6 +443,48 @@ async def get_step_results(
     ]
 
 
+_TRACE_SQL = """
+    SELECT r.id, r.status, json_build_object(
+        'request_id', r.id,
+        'query', r.query,
+        'status', r.status,
+        'final_answer', r.final_answer,
+        'error_message', r.error_message,
+        'created_at', r.created_at,
+        'cached_from', r.cached_from,
+        'plan', json_build_object('steps', COALESCE((SELECT p.steps FROM app.plans p WHERE p.request_id = r.id AND p.created_at = r.created_at), '[]'::jsonb)),
+        'step_results', COALESCE((
+            SELECT json_agg(json_build_object(
+                'step_index', s.step_index,
+                'agent_name', s.agent_name,
+                'input_payload', s.input_payload,
+                'output_payload', s.output_payload,
+                'status', s.status,
+                'latency_ms', s.latency_ms
+            ) ORDER BY s.step_index, s.created_at)
+            FROM app.step_results s WHERE s.request_id = r.id AND s.created_at = r.created_at
+        ), '[]'::json)
+    )::text AS trace
+    FROM app.requests r
+"""
+
+
+async def get_trace(conn: asyncpg.Connection, request_id: uuid.UUID) -> tuple[str, str] | None:
+    """(status, trace JSON text) for a request: the request row, its plan and step results,
+    aggregated by Postgres in a single statement."""
+    row = await conn.fetchrow(_TRACE_SQL + " WHERE r.id = $1 AND r.created_at BETWEEN $2 AND $3", request_id, *created_at_bounds(request_id))
+    return (row["status"], row["trace"]) if row else None
+
+
+async def get_latest_trace(conn: asyncpg.Connection, domain_id: str | None = None) -> tuple[uuid.UUID, str, str] | None:
+    """(request_id, status, trace JSON text) for the most recent request, optionally of one domain."""
+    if domain_id:
+        row = await conn.fetchrow(_TRACE_SQL + " WHERE r.domain_id = $1 ORDER BY r.created_at DESC LIMIT 1", domain_id)
+    else:
+        row = await conn.fetchrow(_TRACE_SQL + " ORDER BY r.created_at DESC LIMIT 1")
+    return (row["id"], row["status"], row["trace"]) if row else None
+
+
 async def get_latest_request_id(
     conn: asyncpg.Connection,
     domain_id: str | None = None,
@@ -169,3 +500,83 @@ async def get_latest_request_id(
             "SELECT id FROM app.requests ORDER BY created_at DESC LIMIT 1",
         )
     return row["id"] if row else None
+
+
+async def list_requests(
+    conn: asyncpg.Connection,
+    domain_id: str | None = None,
+    statuses: list[str] | None = None,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    after: tuple[datetime.datetime, uuid.UUID] | None = None,
+    limit: int = 50,
+) -> list[dict[str, Any]]:
+    """Request summaries, newest first. after is the (created_at, id) of the last row of the previous
+    page (keyset pagination), so every page is one index range scan however deep it is."""
+    where: list[str] = []
+    args: list[Any] = []
+
+    def arg(value: Any) -> str:
+        args.append(value)
+        return f"${len(args)}"
+
+    if domain_id:
+        where.append(f"domain_id = {arg(domain_id)}")
+    if statuses:
+        where.append(f"status = ANY({arg(list(statuses))}::text[])")
+    if since is not None:
+        where.append(f"created_at >= {arg(since)}")
+    if until is not None:
+        where.append(f"created_at < {arg(until)}")
+    if after is not None:
+        where.append(f"(created_at, id) < ({arg(after[0])}, {arg(after[1])})")
+    rows = await conn.fetch(
+        f"""
+        SELECT id, domain_id, status, left(query, 200) AS query, left(error_message, 200) AS error_message,
+               cached_from, created_at, updated_at
+        FROM app.requests
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY created_at DESC, id DESC
+        LIMIT {arg(limit)}
+        """,
+        *args,
+    )
+    return [
+        {
+            "request_id": str(r["id"]),
+            "domain_id": r["domain_id"],
+            "status": r["status"],
+            "query": r["query"],
+            "error_message": r["error_message"],
+            "cached_from": str(r["cached_from"]) if r["cached_from"] else None,
+            "created_at": r["created_at"],
+            "updated_at": r["updated_at"],
+        }
+        for r in rows
+    ]
+
+
+async def get_recent_plans(
+    conn: asyncpg.Connection,
+    domain_id: str,
+    limit: int,
+) -> list[tuple[str, list[dict[str, Any]]]]:
+    """(query, plan steps) for the most recent completed requests of a domain, newest first."""
+    rows = await conn.fetch(
+        """
+        SELECT r.query, p.steps
+        FROM app.requests r JOIN app.plans p ON p.request_id = r.id AND p.created_at = r.created_at
+        WHERE r.domain_id = $1 AND r.status = 'completed'
+        ORDER BY r.created_at DESC LIMIT $2
+        """,
+        domain_id,
+        limit,
+    )
+    out = []
+    for r in rows:
+        steps = r["steps"]
+        if isinstance(steps, str):
+            steps = json.loads(steps)
+        if isinstance(steps, list):
+            out.append((r["query"], steps))
+    return out
@@ -0,0 +1,75 @@
+"""Per-step result cache shared across requests.
+
+Different queries often decompose into the same agent step ("researcher: retrieve safety
+guidelines for product X"). A successful StepResult is reused for the agent's
+step_cache_ttl_seconds when the agent, its config, the task and the context digest all match.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from src.core.config.models import AgentConfig
+from src.core.contracts.orchestrator import StepResult
+from src.core.hashing import config_fingerprint, stable_hash
+
+
+def context_digest(prior: list[StepResult]) -> str:
+    """Digest of the step outputs a step is given. The original query is deliberately left out so
+    identical steps of different queries share an entry; only give a TTL to agents whose tasks
+    are self-contained."""
+    return stable_hash([(sr.step_index, sr.agent_name, sr.output) for sr in prior])
+
+
+class StepCache:
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        # key -> (expires at, monotonic clock; output)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    @staticmethod
+    def key(agent: AgentConfig, task: str, digest: str) -> str:
+        return stable_hash(agent.name, task, digest, config_fingerprint(agent))
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[1]
+
+    def put(self, key: str, output: Any, ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._stats["stored"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+
+_cache: StepCache | None = None
+
+
+def get_step_cache(max_entries: int = 1000) -> StepCache:
+    """Process-wide cache; max_entries applies when it is first created."""
+    global _cache
+    if _cache is None:
+        _cache = StepCache(max_entries)
+    return _cache
+
+
+def step_cache_stats() -> dict[str, Any]:
+    return get_step_cache().stats() if _cache is not None else {"entries": 0}
@@ -0,0 +1,53 @@
+"""Cache of finished request traces for GET /request/{id} and /trace/last.
+
+A trace (request, plan, step results) no longer changes once its request is completed, failed
+or partial, so those are kept as ready-to-send JSON bytes in a bounded LRU along with their ETag.
+Running requests are always read from the database.
+"""
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+
+def trace_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class TraceCache:
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        # request_id -> (JSON body, ETag)
+        self._entries: OrderedDict[uuid.UUID, tuple[bytes, str]] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    def get(self, request_id: uuid.UUID) -> tuple[bytes, str] | None:
+        entry = self._entries.get(request_id)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(request_id)
+        self._stats["hits"] += 1
+        return entry
+
+    def put(self, request_id: uuid.UUID, body: bytes, etag: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[request_id] = (body, etag)
+        self._entries.move_to_end(request_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._stats["stored"] += 1
+
+    def discard(self, request_id: uuid.UUID) -> None:
+        self._entries.pop(request_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
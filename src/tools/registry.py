@@ -2,29 +2,46 @@ from __future__ import annotations
 
 from typing import Any
 
+from src.data_access.relational.client import PostgresClient
+from src.tools.rel_db.named import create_named_query_tool, find_named_query
 from src.tools.rel_db.query import create_query_facts_tool
+from src.tools.rel_db.schema import create_describe_schema_tool
 from src.tools.vector.search import create_search_docs_tool
 
 
+def default_rel_db_client(clients: dict[str, Any]) -> PostgresClient | None:
+    """First connected Postgres client; app_db (the orchestrator's own store) is never exposed to tools."""
+    for k, v in clients.items():
+        if k == "app_db":
+            continue
+        if isinstance(v, PostgresClient):
+            return v
+    return None
+
+
 def get_tools(tool_names: list[str], clients: dict[str, Any]) -> list[Any]:
     """Build a list of LangChain tools from tool_names, injecting clients."""
     result = []
     for name in tool_names:
         if name == "query_facts":
-            # Use first available Postgres client (skip app_db if we want only connected DBs for tools)
-            pg_url = None
-            for k, v in clients.items():
-                if k == "app_db":
-                    continue
-                if isinstance(v, str) and v.startswith("postgresql"):
-                    pg_url = v
-                    break
-            if not pg_url:
+            pg_client = default_rel_db_client(clients)
+            if pg_client is None:
                 continue
-            result.append(create_query_facts_tool(pg_url))
+            result.append(create_query_facts_tool(pg_client))
+        elif name == "describe_schema":
+            pg_client = default_rel_db_client(clients)
+            if pg_client is None:
+                continue
+            result.append(create_describe_schema_tool(pg_client))
         elif name == "search_docs":
             retriever = clients.get("docs")
             if retriever is None:
                 continue
             result.append(create_search_docs_tool(retriever))
+        else:
+            # Named queries declared under a data source's "named_queries" are tools in their own right.
+            found = find_named_query(clients, name)
+            if found is None:
+                continue
+            result.append(create_named_query_tool(*found))
     return result
@@ -1,3 +1,5 @@
 from src.tools.rel_db.query import create_query_facts_tool
+from src.tools.rel_db.schema import create_describe_schema_tool, get_catalog
+from src.tools.rel_db.named import create_named_query_tool, find_named_query
 
-__all__ = ["create_query_facts_tool"]
+__all__ = ["create_query_facts_tool", "create_describe_schema_tool", "get_catalog", "create_named_query_tool", "find_named_query"]
@@ -0,0 +1,171 @@
+"""Result cache for relational tool queries: LRU by bytes, per-source TTL, table-level invalidation."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import asyncpg
+
+from src.data_access.relational.client import PostgresClient
+
+log = logging.getLogger("query_cache")
+
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_TABLE_REF = re.compile(r"\b(?:from|join)\s+((?:\"[^\"]+\"|[a-z_][\w$]*)(?:\.(?:\"[^\"]+\"|[a-z_][\w$]*))?)", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """Case-fold and collapse whitespace outside quoted literals/identifiers; drop a trailing semicolon."""
+    parts = _QUOTED.split(sql.strip().rstrip(";"))
+    out = []
+    for i, part in enumerate(parts):
+        out.append(part if i % 2 else " ".join(part.lower().split()))
+    return "".join(out).strip()
+
+
+def table_name(ref: str) -> str:
+    """Bare, case-folded table name used as the invalidation key ("app.Parts" -> "parts")."""
+    return ref.split(".")[-1].strip('"').lower()
+
+
+def tables_in(sql: str) -> list[str]:
+    """Tables referenced after FROM/JOIN (fallback when no EXPLAIN plan is available)."""
+    return list(dict.fromkeys(table_name(m) for m in _TABLE_REF.findall(sql)))
+
+
+class QueryResultCache:
+    """Rendered tool results keyed on (data source, normalized SQL, arguments). Thread-safe, since sync tool
+    calls run on the client's background loop thread."""
+
+    def __init__(self, source_id: str, ttl_seconds: float, max_bytes: int):
+        self.source_id = source_id
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, str, frozenset[str], int]] = OrderedDict()
+        self._by_table: dict[str, set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_bytes > 0
+
+    def key(self, sql: str, args: tuple = ()) -> str:
+        return f"{self.source_id}\x00{normalize_sql(sql)}\x00{args!r}"
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: str, value: str, tables: list[str]) -> None:
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            names = frozenset(table_name(t) for t in tables)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, names, size)
+            self._bytes += size
+            for t in names:
+                self._by_table.setdefault(t, set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        _, _, names, size = self._entries.pop(key)
+        self._bytes -= size
+        for t in names:
+            keys = self._by_table.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[t]
+
+    def invalidate_table(self, table: str) -> int:
+        with self._lock:
+            keys = list(self._by_table.get(table_name(table), ()))
+            for key in keys:
+                self._drop(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "source_id": self.source_id,
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+
+_caches: dict[str, QueryResultCache] = {}
+
+
+def get_result_cache(client: PostgresClient) -> QueryResultCache:
+    """Process-wide cache per data source, shared by query_facts and the named query tools."""
+    cache = _caches.get(client.source_id)
+    if cache is None:
+        source = client.source
+        cache = _caches[client.source_id] = QueryResultCache(source.id, source.cache_ttl_seconds, source.cache_max_bytes)
+    return cache
+
+
+def result_cache_stats() -> dict[str, Any]:
+    return {k: c.stats() for k, c in _caches.items()}
+
+
+async def listen_for_invalidations(client: PostgresClient, cache: QueryResultCache, channel: str, retry_seconds: float = 5.0) -> None:
+    """LISTEN on `channel` (payload = changed table name) and drop cached results that read that table.
+
+    Runs until cancelled. Whenever the listening connection is lost the whole cache is cleared,
+    because notifications sent while disconnected are gone.
+    """
+
+    def on_notify(conn: Any, pid: int, ch: str, payload: str) -> None:
+        dropped = cache.invalidate_table(payload)
+        if dropped:
+            log.info("%s: %s changed, dropped %s cached results", cache.source_id, payload, dropped)
+
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(client.url)
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda c: closed.set())
+            await conn.add_listener(channel, on_notify)
+            log.info("%s: listening on %s for cache invalidation", cache.source_id, channel)
+            await closed.wait()
+        except asyncio.CancelledError:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+            raise
+        except Exception as e:
+            log.warning("%s: invalidation listener failed: %s", cache.source_id, e)
+        cache.clear()
+        await asyncio.sleep(retry_seconds)
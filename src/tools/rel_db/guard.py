@@ -0,0 +1,87 @@
+"""EXPLAIN-based pre-flight for model-written SQL: run, limit, or reject before it touches the data."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+import asyncpg
+
+from src.core.config.models import DataSourceConfig
+from src.core.exceptions import QueryRejected
+
+
+@dataclass
+class QueryEstimate:
+    total_cost: float
+    plan_rows: int
+    relations: list[str] = field(default_factory=list)  # tables the plan reads
+
+
+def _relations(node: dict[str, Any], out: list[str]) -> None:
+    name = node.get("Relation Name")
+    if name:
+        schema = node.get("Schema")
+        qualified = f"{schema}.{name}" if schema else name
+        if qualified not in out:
+            out.append(qualified)
+    for child in node.get("Plans", []):
+        _relations(child, out)
+
+
+async def explain(conn: asyncpg.Connection, query: str) -> QueryEstimate:
+    raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON, VERBOSE) {query}")
+    doc = json.loads(raw) if isinstance(raw, str) else raw
+    plan = doc[0]["Plan"]
+    relations: list[str] = []
+    _relations(plan, relations)
+    return QueryEstimate(total_cost=float(plan.get("Total Cost", 0.0)), plan_rows=int(plan.get("Plan Rows", 0)), relations=relations)
+
+
+def _within(est: QueryEstimate, source: DataSourceConfig) -> bool:
+    if source.max_query_cost is not None and est.total_cost > source.max_query_cost:
+        return False
+    if source.max_estimated_rows is not None and est.plan_rows > source.max_estimated_rows:
+        return False
+    return True
+
+
+def _limited(query: str, limit: int) -> str:
+    # Newlines keep a trailing "-- comment" in the model's SQL from swallowing the wrapper.
+    return f"SELECT * FROM (\n{query.strip().rstrip(';')}\n) AS limited_q LIMIT {int(limit)}"
+
+
+def _rejection(est: QueryEstimate, source: DataSourceConfig) -> str:
+    limits = []
+    if source.max_query_cost is not None:
+        limits.append(f"cost limit {source.max_query_cost:,.0f}")
+    if source.max_estimated_rows is not None:
+        limits.append(f"row limit {source.max_estimated_rows:,}")
+    tables = ", ".join(est.relations) or "the tables involved"
+    return (
+        f"Query rejected before execution: estimated cost {est.total_cost:,.0f} and about {est.plan_rows:,} rows "
+        f"exceed the {' / '.join(limits)} for data source '{source.id}' (reads {tables}). "
+        "Narrow it: filter with WHERE on specific ids, dates or lines, aggregate with GROUP BY instead of listing rows, "
+        "and avoid joins without a join condition. Then try again."
+    )
+
+
+async def check_query_cost(conn: asyncpg.Connection, query: str, source: DataSourceConfig) -> tuple[str, QueryEstimate | None]:
+    """Return the SQL to run (the query itself, or a LIMIT-wrapped rewrite when that brings the estimate
+    within the source's thresholds) and the plan estimate. Raise QueryRejected (message meant for the model) otherwise."""
+    if source.max_query_cost is None and source.max_estimated_rows is None:
+        return query, None
+    est = await explain(conn, query)
+    if _within(est, source):
+        return query, est
+    # Only max_rows + 1 rows are ever read, so a LIMIT is semantically free; it often lets the planner
+    # stop early (e.g. a join without ORDER BY). Sorting or aggregating the whole table stays expensive.
+    limited = _limited(query, source.max_rows + 1)
+    try:
+        async with conn.transaction():  # savepoint: a failed rewrite must not abort the outer transaction
+            limited_est = await explain(conn, limited)
+    except asyncpg.PostgresError:
+        raise QueryRejected(_rejection(est, source))
+    if _within(limited_est, source):
+        return limited, est
+    raise QueryRejected(_rejection(est, source))
@@ -0,0 +1,91 @@
+"""Named, parameterized queries from the domain config, each exposed as its own LangChain tool."""
+from __future__ import annotations
+
+import datetime
+from typing import Any
+
+from langchain_core.tools import StructuredTool
+from pydantic import Field, create_model
+
+from src.core.config.models import NamedQueryConfig
+from src.data_access.relational.client import PostgresClient
+from src.tools.rel_db.cache import get_result_cache, tables_in
+from src.tools.rel_db.query import format_rows
+
+_PARAM_TYPES: dict[str, type] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "date": datetime.date,
+    "datetime": datetime.datetime,
+}
+
+
+def find_named_query(clients: dict[str, Any], name: str) -> tuple[PostgresClient, NamedQueryConfig] | None:
+    """Locate the data source that declares a named query called `name`."""
+    for client in clients.values():
+        if not isinstance(client, PostgresClient):
+            continue
+        for nq in client.source.named_queries:
+            if nq.name == name:
+                return client, nq
+    return None
+
+
+def _args_schema(nq: NamedQueryConfig) -> type:
+    fields: dict[str, Any] = {}
+    for p in nq.params:
+        typ = _PARAM_TYPES.get(p.type)
+        if typ is None:
+            raise ValueError(f"Named query {nq.name}: unsupported param type {p.type!r} for {p.name}")
+        default = ... if p.default is None else p.default
+        fields[p.name] = (typ, Field(default, description=p.description))
+    return create_model(f"{nq.name}_args", **fields)
+
+
+def create_named_query_tool(client: PostgresClient, nq: NamedQueryConfig) -> Any:
+    """Create a tool that runs one fixed SQL statement with typed arguments.
+
+    No SQL is written by the model and no EXPLAIN pre-flight runs: arguments are bound as
+    parameters, and asyncpg keeps the prepared statement in each pooled connection's
+    statement cache (pool.statement_cache_size), so repeat calls skip parse and plan.
+    """
+    source = client.source
+    names = [p.name for p in nq.params]
+    schema = _args_schema(nq)
+    cache = get_result_cache(client)
+    tables = tables_in(nq.sql)
+
+    async def arun(**kwargs: Any) -> str:
+        # StructuredTool passes only the arguments the model supplied; validating again fills in
+        # configured defaults instead of binding NULL for an omitted parameter.
+        try:
+            values = schema(**kwargs)
+        except ValueError as e:
+            return f"Invalid arguments: {e}"
+        args = tuple(getattr(values, n) for n in names)
+        key = cache.key(nq.sql, args) if cache.enabled else None
+        if key is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+        try:
+            result = await client.fetch_bounded(nq.sql, *args, max_rows=source.max_rows, max_bytes=source.max_result_bytes)
+        except Exception as e:
+            return f"Query failed: {e}"
+        text = format_rows(result)
+        if key is not None:
+            cache.put(key, text, tables)
+        return text
+
+    def run(**kwargs: Any) -> str:
+        return client.run_sync(arun, **kwargs)
+
+    return StructuredTool.from_function(
+        func=run,
+        coroutine=arun,
+        name=nq.name,
+        description=nq.description,
+        args_schema=schema,
+    )
@@ -1,45 +1,67 @@
 from __future__ import annotations
 
-import asyncio
 from typing import Any
 
-import asyncpg
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
+from src.core.exceptions import QueryRejected
+from src.data_access.relational.client import BoundedRows, PostgresClient
+from src.tools.rel_db.cache import get_result_cache, tables_in
+from src.tools.rel_db.guard import check_query_cost
 
-def _run_async(coro):
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(coro)
 
+def format_rows(result: BoundedRows) -> str:
+    """Render rows for the model, with a truncation notice when the cursor stopped early."""
+    if not result.rows:
+        return "No rows returned."
+    text = str(result.rows)
+    if result.truncated:
+        n = len(result.rows)
+        text += (
+            f"\n(truncated: showing {n} of {n + 1}+ rows. "
+            "Add WHERE filters, aggregates (COUNT/SUM/GROUP BY) or ORDER BY ... LIMIT to get a complete answer.)"
+        )
+    return text
 
-async def _execute_read_only(pg_url: str, query: str) -> list[dict[str, Any]]:
-    url = pg_url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(url)
-    try:
-        rows = await conn.fetch(query)
-        return [dict(r) for r in rows]
-    finally:
-        await conn.close()
 
+def create_query_facts_tool(client: PostgresClient) -> Any:
+    """Create a LangChain tool that runs read-only SQL through the data source's pooled client."""
+    source = client.source
+    cache = get_result_cache(client)
 
-def create_query_facts_tool(pg_url: str, source_id: str = "manufacturing_db") -> Any:
-    """Create a LangChain tool that runs read-only SQL against the given Postgres URL."""
-
-    @tool
-    def query_facts(query: str) -> str:
-        """Run a read-only SQL query to get facts from the database. Input should be a valid SELECT statement."""
+    async def aquery_facts(query: str) -> str:
         if not query.strip().upper().startswith("SELECT"):
             return "Error: Only SELECT queries are allowed."
+        key = cache.key(query) if cache.enabled else None
+        if key is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+        touched: list[str] = []
+
+        async def preflight(conn, sql: str) -> str:
+            sql, estimate = await check_query_cost(conn, sql, source)
+            touched.extend(estimate.relations if estimate else tables_in(sql))
+            return sql
+
         try:
-            rows = _run_async(_execute_read_only(pg_url, query))
-            if not rows:
-                return "No rows returned."
-            return str(rows[:50])  # Limit to 50 rows for context
+            result = await client.fetch_bounded(
+                query,
+                max_rows=source.max_rows,
+                max_bytes=source.max_result_bytes,
+                preflight=preflight,
+            )
+        except QueryRejected as e:
+            return str(e)
         except Exception as e:
             return f"Query failed: {e}"
+        text = format_rows(result)
+        if key is not None:
+            cache.put(key, text, touched)
+        return text
+
+    def query_facts(query: str) -> str:
+        """Run a read-only SQL query to get facts from the database. Input should be a valid SELECT statement."""
+        return client.run_sync(aquery_facts, query)
 
-    return query_facts
+    return StructuredTool.from_function(func=query_facts, coroutine=aquery_facts)
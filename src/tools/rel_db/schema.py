@@ -0,0 +1,161 @@
+"""Schema catalog for a relational data source: built once, cached, refreshed on a TTL."""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.tools import StructuredTool
+
+from src.data_access.relational.client import PostgresClient
+
+log = logging.getLogger("schema_catalog")
+
+_SYSTEM_SCHEMAS = ("pg_catalog", "information_schema", "pg_toast")
+
+_COLUMNS_SQL = """
+SELECT c.table_schema, c.table_name, t.table_type, c.column_name, c.data_type, c.is_nullable
+FROM information_schema.columns c
+JOIN information_schema.tables t ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+WHERE c.table_schema <> ALL($1::text[])
+ORDER BY c.table_schema, c.table_name, c.ordinal_position
+"""
+
+_ROW_ESTIMATES_SQL = """
+SELECT n.nspname AS table_schema, c.relname AS table_name, c.reltuples::bigint AS row_estimate
+FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE c.relkind IN ('r', 'p', 'm') AND n.nspname <> ALL($1::text[])
+"""
+
+_FOREIGN_KEYS_SQL = """
+SELECT tc.table_schema, tc.table_name, kcu.column_name,
+       ccu.table_schema AS ref_schema, ccu.table_name AS ref_table, ccu.column_name AS ref_column
+FROM information_schema.table_constraints tc
+JOIN information_schema.key_column_usage kcu
+  ON kcu.constraint_schema = tc.constraint_schema AND kcu.constraint_name = tc.constraint_name
+JOIN information_schema.constraint_column_usage ccu
+  ON ccu.constraint_schema = tc.constraint_schema AND ccu.constraint_name = tc.constraint_name
+WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema <> ALL($1::text[])
+"""
+
+
+@dataclass
+class TableInfo:
+    name: str  # schema-qualified unless in "public"
+    kind: str  # "table" | "view"
+    columns: list[tuple[str, str, bool]] = field(default_factory=list)  # (name, type, nullable)
+    row_estimate: int | None = None
+    foreign_keys: list[str] = field(default_factory=list)  # "col -> other_table.col"
+
+
+def _qualified(schema: str, table: str) -> str:
+    return table if schema == "public" else f"{schema}.{table}"
+
+
+class SchemaCatalog:
+    """Tables, columns, types, row estimates and foreign keys of one data source."""
+
+    def __init__(self, client: PostgresClient, ttl_seconds: float):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.tables: dict[str, TableInfo] = {}
+        self.loaded_at: float | None = None
+
+    @property
+    def stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl_seconds
+
+    async def refresh(self) -> None:
+        async with self.client.read_only() as conn:
+            columns = await conn.fetch(_COLUMNS_SQL, list(_SYSTEM_SCHEMAS))
+            estimates = await conn.fetch(_ROW_ESTIMATES_SQL, list(_SYSTEM_SCHEMAS))
+            fks = await conn.fetch(_FOREIGN_KEYS_SQL, list(_SYSTEM_SCHEMAS))
+        tables: dict[str, TableInfo] = {}
+        for r in columns:
+            name = _qualified(r["table_schema"], r["table_name"])
+            info = tables.get(name)
+            if info is None:
+                kind = "view" if r["table_type"] == "VIEW" else "table"
+                info = tables[name] = TableInfo(name=name, kind=kind)
+            info.columns.append((r["column_name"], r["data_type"], r["is_nullable"] == "YES"))
+        for r in estimates:
+            info = tables.get(_qualified(r["table_schema"], r["table_name"]))
+            if info is not None and r["row_estimate"] >= 0:  # -1 = never analyzed
+                info.row_estimate = r["row_estimate"]
+        for r in fks:
+            info = tables.get(_qualified(r["table_schema"], r["table_name"]))
+            if info is not None:
+                info.foreign_keys.append(f"{r['column_name']} -> {_qualified(r['ref_schema'], r['ref_table'])}.{r['ref_column']}")
+        self.tables = tables
+        self.loaded_at = time.monotonic()
+        log.info("schema catalog for %s: %s tables", self.client.source_id, len(tables))
+
+    async def ensure_fresh(self) -> None:
+        """Refresh when past the TTL; on failure keep serving the previous snapshot if there is one."""
+        if not self.stale:
+            return
+        try:
+            await self.refresh()
+        except Exception:
+            if self.loaded_at is None:
+                raise
+            log.warning("schema catalog refresh failed for %s; serving cached copy", self.client.source_id, exc_info=True)
+
+    def render_table(self, info: TableInfo) -> str:
+        rows = f", ~{info.row_estimate:,} rows" if info.row_estimate is not None else ""
+        lines = [f"{info.name} ({info.kind}{rows})"]
+        for col, typ, nullable in info.columns:
+            lines.append(f"  {col} {typ}{'' if nullable else ' NOT NULL'}")
+        for fk in info.foreign_keys:
+            lines.append(f"  FK {fk}")
+        return "\n".join(lines)
+
+    def render(self, table: str = "", max_bytes: int | None = None) -> str:
+        if not self.tables:
+            return "No tables found."
+        if table:
+            info = self.tables.get(table) or self.tables.get(table.removeprefix("public."))
+            if info is None:
+                return f"Unknown table '{table}'. Tables: {', '.join(sorted(self.tables))}"
+            return self.render_table(info)
+        full = "\n\n".join(self.render_table(t) for t in self.tables.values())
+        if max_bytes is None or len(full) <= max_bytes:
+            return full
+        # Too large for one answer: list tables and let the model ask for the ones it needs.
+        summary = [
+            f"{t.name} ({t.kind}, {len(t.columns)} columns"
+            + (f", ~{t.row_estimate:,} rows)" if t.row_estimate is not None else ")")
+            for t in self.tables.values()
+        ]
+        return "Tables (call describe_schema with a table name for its columns):\n" + "\n".join(summary)
+
+
+_catalogs: dict[str, SchemaCatalog] = {}
+
+
+def get_catalog(client: PostgresClient) -> SchemaCatalog:
+    """Process-wide catalog per data source, so every tool instance shares one snapshot."""
+    catalog = _catalogs.get(client.source_id)
+    if catalog is None:
+        catalog = _catalogs[client.source_id] = SchemaCatalog(client, client.source.schema_ttl_seconds)
+    return catalog
+
+
+def create_describe_schema_tool(client: PostgresClient) -> Any:
+    """Create a LangChain tool that describes the data source's tables from the cached catalog."""
+    catalog = get_catalog(client)
+
+    async def adescribe_schema(table: str = "") -> str:
+        try:
+            await catalog.ensure_fresh()
+        except Exception as e:
+            return f"Schema lookup failed: {e}"
+        return catalog.render(table.strip(), max_bytes=client.source.max_result_bytes)
+
+    def describe_schema(table: str = "") -> str:
+        """List the database tables with their columns, types, approximate row counts and foreign keys.
+        Call this before writing SQL for query_facts. Pass a table name to describe only that table."""
+        return client.run_sync(adescribe_schema, table)
+
+    return StructuredTool.from_function(func=describe_schema, coroutine=adescribe_schema)
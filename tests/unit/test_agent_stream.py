@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+import src.agent.main as agent_main
+from src.agent.admission import AdmissionController
+from src.core.contracts.agent import AgentInvokeRequest, AgentStreamEvent
+
+
+class SlowRunner:
+    async def astream(self, input_text):
+        await asyncio.sleep(0)
+        yield AgentStreamEvent(type="final", result="done", status="success")
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    controller = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=0.1)
+    monkeypatch.setattr(agent_main, "AGENT_RUNNER", SlowRunner())
+    monkeypatch.setattr(agent_main, "ADMISSION", controller)
+    return controller
+
+
+async def test_stream_slot_released_when_client_disconnects_before_body(admission):
+    response = await agent_main.invoke_stream(AgentInvokeRequest(task="t"))
+    assert admission.stats()["in_flight"] == 1
+
+    async def send(message):
+        raise OSError("client went away")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    with pytest.raises(ClientDisconnect):
+        await response(scope, receive, send)
+
+    assert admission.stats()["in_flight"] == 0
+
+
+async def test_stream_slot_released_after_full_body(admission):
+    response = await agent_main.invoke_stream(AgentInvokeRequest(task="t"))
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        await asyncio.sleep(10)
+
+    await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+    assert b'"final"' in b"".join(m.get("body", b"") for m in sent)
+    assert admission.stats()["in_flight"] == 0
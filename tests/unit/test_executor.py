@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.core.config.models import AgentConfig, DomainConfig
+from src.core.contracts.orchestrator import Plan, Step, StepResult
+from src.orchestrator import executor
+
+AGENT = AgentConfig(name="researcher", port=8001, system_prompt="", tool_names=[])
+DOMAIN = DomainConfig(domain_id="t", domain_name="T", env_file_path="", orchestrator=AGENT, agents=[AGENT])
+
+
+def _plan(deps: dict[int, list[int] | None]) -> Plan:
+    return Plan(steps=[Step(step_index=i, agent_name="researcher", task_description=f"task {i}", depends_on=d) for i, d in deps.items()])
+
+
+class FakeSteps:
+    """Stands in for executor.run_step: records contexts and the peak number of steps running at once."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.contexts: dict[int, str] = {}
+        self.order: list[int] = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, step, context, domain_config, digest=None, on_delta=None, **kwargs):
+        self.contexts[step.step_index] = context
+        self.order.append(step.step_index)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return StepResult(step_index=step.step_index, agent_name=step.agent_name, output=f"out {step.step_index}", status="success")
+
+
+async def test_dag_step_sees_only_its_dependencies(monkeypatch):
+    steps = FakeSteps()
+    monkeypatch.setattr(executor, "run_step", steps)
+
+    results = await executor.run_plan(_plan({1: [], 2: [], 3: [1]}), "q", DOMAIN)
+
+    assert "out 1" in steps.contexts[3] and "out 2" not in steps.contexts[3]
+    assert [r.step_index for r in results] == [1, 2, 3]
+
+
+async def test_dag_caps_concurrent_steps(monkeypatch):
+    steps = FakeSteps()
+    monkeypatch.setattr(executor, "run_step", steps)
+
+    await executor.run_plan(_plan({i: [] for i in range(1, 6)}), "q", DOMAIN, max_parallel=2)
+
+    assert steps.peak == 2
+    assert sorted(steps.order) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize(
+    "deps",
+    [
+        pytest.param({1: [2], 2: [1], 3: []}, id="cycle"),
+        pytest.param({1: [], 2: None, 3: [1]}, id="missing-depends-on"),
+    ],
+)
+async def test_falls_back_to_sequential(monkeypatch, deps):
+    steps = FakeSteps()
+    monkeypatch.setattr(executor, "run_step", steps)
+    plan = _plan(deps)
+
+    results = await executor.run_plan(plan, "q", DOMAIN, max_parallel=4)
+
+    assert executor._dependency_order(plan) is None
+    assert steps.order == [1, 2, 3] and steps.peak == 1
+    assert "out 2" in steps.contexts[3]  # the previous step's output, whatever depends_on said
+    assert [r.step_index for r in results] == [1, 2, 3]
+
+
+async def test_failing_on_step_cancels_running_siblings(monkeypatch):
+    cancelled = []
+
+    async def run_step(step, context, domain_config, digest=None, on_delta=None, **kwargs):
+        if step.step_index == 2:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(step.step_index)
+                raise
+        return StepResult(step_index=step.step_index, agent_name=step.agent_name, output="out", status="success")
+
+    async def on_step(sr):
+        raise RuntimeError("persist failed")
+
+    monkeypatch.setattr(executor, "run_step", run_step)
+
+    with pytest.raises(RuntimeError, match="persist failed"):
+        await asyncio.wait_for(executor.run_plan(_plan({1: [], 2: []}), "q", DOMAIN, on_step=on_step), timeout=1)
+
+    assert cancelled == [2]
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.gateway import main as gateway
+
+ETAG = '"abc123"'
+REQUEST_ID = "0190f5c2-0000-7000-8000-000000000001"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Orchestrator stand-in: records each request and answers like its /query and /request routes."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        path = request.url.path
+        if path == "/query":
+            headers = {"Location": f"/request/{REQUEST_ID}"} if request.url.params.get("mode") == "async" else {}
+            return httpx.Response(202, json={"request_id": REQUEST_ID, "status": "queued"}, headers=headers)
+        if path.startswith("/request/missing"):
+            return httpx.Response(404, json={"detail": "Request not found"})
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304, headers={"ETag": ETAG, "Cache-Control": "no-cache"})
+        return httpx.Response(200, json={"status": "running"}, headers={"ETag": ETAG, "Cache-Control": "no-cache"})
+
+    real_client = httpx.AsyncClient
+
+    def client(*args, **kwargs):
+        return real_client(*args, transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(gateway.httpx, "AsyncClient", client)
+    monkeypatch.setenv("ORCHESTRATOR_BASE_URL", "http://orchestrator")
+    return seen
+
+
+def test_async_query_location_is_served_by_the_gateway(upstream):
+    api = TestClient(gateway.app)
+
+    r = api.post("/query?mode=async", json={"query": "q"})
+    trace = api.get(r.headers["Location"])
+
+    assert r.status_code == 202 and r.headers["Location"] == f"/request/{REQUEST_ID}"
+    assert trace.status_code == 200 and trace.json() == {"status": "running"}
+    assert trace.headers["ETag"] == ETAG
+
+
+def test_missing_upstream_location_is_not_sent_empty(upstream):
+    r = TestClient(gateway.app).post("/query", json={"query": "q"})
+
+    assert r.status_code == 202 and "location" not in r.headers
+
+
+def test_wait_forwards_if_none_match_and_passes_304_through(upstream):
+    r = TestClient(gateway.app).get(f"/request/{REQUEST_ID}/wait?timeout=5", headers={"If-None-Match": ETAG})
+
+    assert r.status_code == 304 and r.headers["ETag"] == ETAG
+    assert upstream[-1].url.path == f"/request/{REQUEST_ID}/wait"
+    assert upstream[-1].url.params["timeout"] == "5.0"
+
+
+def test_upstream_errors_keep_status_and_detail(upstream):
+    r = TestClient(gateway.app).get("/request/missing")
+
+    assert r.status_code == 404 and r.json() == {"detail": "Request not found"}
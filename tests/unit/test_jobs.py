@@ -0,0 +1,253 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.core.config.models import AgentConfig, DomainConfig, JobsConfig
+from src.core.contracts.gateway import QueryRequest
+from src.core.contracts.orchestrator import Plan, Step, StepResult
+from src.orchestrator import executor, jobs
+from src.orchestrator.jobs import CompletionListener, JobWorker
+
+
+@asynccontextmanager
+async def fake_session():
+    yield object()
+
+
+class FakePipeline:
+    def __init__(self, final=None, error=None):
+        self.final = final
+        self.error = error
+        self.calls = []
+
+    async def events(self, req, stream_tokens=True, request_id=None):
+        self.calls.append((req.query, request_id))
+        if self.error is not None:
+            raise self.error
+        yield "final", self.final
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    recorded = []
+
+    async def finish_job(conn, request_id, status, error=None):
+        recorded.append(("finish", request_id, status, error))
+
+    async def release_job(conn, request_id, worker_id, error=None):
+        recorded.append(("release", request_id, error))
+
+    async def update_request_final(conn, request_id, status, final_answer=None, error_message=None):
+        recorded.append(("final", request_id, status, error_message))
+
+    monkeypatch.setattr(jobs, "finish_job", finish_job)
+    monkeypatch.setattr(jobs, "release_job", release_job)
+    monkeypatch.setattr(jobs, "update_request_final", update_request_final)
+    return recorded
+
+
+def _job(attempts=1):
+    return {"request_id": uuid.uuid4(), "payload": '{"query": "q"}', "attempts": attempts}
+
+
+def _worker(pipeline, **config):
+    return JobWorker(pipeline, fake_session, JobsConfig(**config), db_url="postgresql://unused")
+
+
+@pytest.mark.parametrize("status, job_status", [("completed", "done"), ("partial", "done"), ("failed", "failed")])
+async def test_execute_finishes_job_with_the_request_outcome(calls, status, job_status):
+    pipeline = FakePipeline(final={"status": status, "error": "boom" if status == "failed" else None})
+    job = _job()
+
+    await _worker(pipeline)._execute(job)
+
+    assert pipeline.calls == [("q", job["request_id"])]
+    assert calls == [("finish", job["request_id"], job_status, "boom" if status == "failed" else None)]
+
+
+class RecoveryConn:
+    """Fake connection for recover_stale_requests: returns the given stale rows, records executes."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetch(self, sql, *args):
+        return self.rows
+
+    async def execute(self, sql, *args):
+        self.executed.append((" ".join(sql.split()), args))
+
+
+async def test_recovered_request_keeps_its_original_options():
+    original = QueryRequest(query="q", domain_id="d", session_id="s1", no_cache=True).model_dump_json()
+    legacy_id, rid = uuid.uuid4(), uuid.uuid4()
+    conn = RecoveryConn([
+        {"id": rid, "created_at": None, "domain_id": "d", "query": "q", "payload": original},
+        {"id": legacy_id, "created_at": None, "domain_id": "d", "query": "old", "payload": None},
+    ])
+
+    recovered = await jobs.recover_stale_requests(conn, 120)
+
+    payloads = {args[0]: QueryRequest.model_validate_json(args[2]) for sql, args in conn.executed if "INSERT INTO app.jobs" in sql}
+    assert recovered == [rid, legacy_id]
+    assert payloads[rid].no_cache is True and payloads[rid].session_id == "s1"
+    assert payloads[legacy_id] == QueryRequest(query="old", domain_id="d")
+
+
+async def test_execute_releases_job_for_retry_when_pipeline_raises(calls):
+    job = _job()
+    worker = _worker(FakePipeline(error=RuntimeError("agent down")))
+
+    await worker._execute(job)
+
+    assert calls == [("release", job["request_id"], "agent down")]
+    assert worker.stats()["retried"] == 1
+
+
+async def test_execute_gives_up_after_max_attempts_without_running(calls):
+    pipeline = FakePipeline(final={"status": "completed"})
+    job = _job(attempts=4)
+
+    await _worker(pipeline, max_attempts=3)._execute(job)
+
+    assert pipeline.calls == []
+    assert calls == [
+        ("final", job["request_id"], "failed", "Gave up after 3 attempts"),
+        ("finish", job["request_id"], "failed", "Gave up after 3 attempts"),
+    ]
+
+
+async def test_run_claims_until_queue_is_empty(calls, monkeypatch):
+    queued = [_job() for _ in range(3)]
+
+    async def claim_job(conn, worker_id, lease_seconds):
+        return queued.pop(0) if queued else None
+
+    monkeypatch.setattr(jobs, "claim_job", claim_job)
+    pipeline = FakePipeline(final={"status": "completed"})
+    worker = _worker(pipeline, workers=2, poll_interval=0.01)
+
+    task = asyncio.create_task(worker._run())
+    for _ in range(100):
+        if worker.stats()["completed"] == 3:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert worker.stats()["claimed"] == worker.stats()["completed"] == 3
+    assert [c[2] for c in calls] == ["done"] * 3
+
+
+async def test_claim_failures_back_off_and_recover(calls, monkeypatch):
+    attempts = []
+    queued = [_job()]
+
+    async def claim_job(conn, worker_id, lease_seconds):
+        attempts.append(asyncio.get_running_loop().time())
+        if len(attempts) <= 3:
+            raise OSError("connection refused")
+        return queued.pop(0) if queued else None
+
+    monkeypatch.setattr(jobs, "claim_job", claim_job)
+    monkeypatch.setattr(jobs, "_RETRY_SECONDS", 0.02)
+    worker = _worker(FakePipeline(final={"status": "completed"}), workers=1, poll_interval=0.001)
+
+    task = asyncio.create_task(worker._run())
+    for _ in range(100):
+        if worker.stats()["completed"] == 1:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert worker.stats()["completed"] == 1
+    gaps = [b - a for a, b in zip(attempts, attempts[1:4])]
+    assert gaps[0] >= 0.02 and gaps[2] >= 0.08  # 0.02, 0.04, 0.08
+
+
+async def test_listener_connection_is_retried_until_the_database_is_up(monkeypatch):
+    class FakeConn:
+        def __init__(self):
+            self.listeners = []
+
+        async def add_listener(self, channel, callback):
+            self.listeners.append(channel)
+
+        def is_closed(self):
+            return False
+
+        async def close(self):
+            pass
+
+    attempts = []
+
+    async def connect(url):
+        attempts.append(url)
+        if len(attempts) < 3:
+            raise OSError("connection refused")
+        return FakeConn()
+
+    monkeypatch.setattr(jobs.asyncpg, "connect", connect)
+    monkeypatch.setattr(jobs, "_RETRY_SECONDS", 0.001)
+    listener = CompletionListener("postgresql://db")
+
+    await asyncio.wait_for(listener.start(), timeout=1)
+
+    assert len(attempts) == 3
+    assert listener._conn.listeners == [jobs.REQUEST_DONE_CHANNEL]
+    await listener.close()
+
+
+async def test_completion_listener_wakes_registered_waiters_only():
+    listener = CompletionListener("postgresql://unused")
+    fut = listener.register("a")
+    other = listener.register("b")
+
+    listener._on_notify(None, 0, jobs.REQUEST_DONE_CHANNEL, "a")
+
+    assert await CompletionListener.wait(fut, 0.1) is True
+    assert await CompletionListener.wait(other, 0.01) is False
+    listener.discard("b", other)
+    assert listener._waiters == {}
+
+
+def test_completion_listener_reports_every_completion():
+    done = []
+    listener = CompletionListener("postgresql://unused", on_done=done.append)
+
+    listener._on_notify(None, 0, jobs.REQUEST_DONE_CHANNEL, "a")
+
+    assert done == ["a"]
+
+
+async def test_run_plan_resumes_without_rerunning_completed_steps(monkeypatch):
+    agent = AgentConfig(name="researcher", port=8001, system_prompt="", tool_names=[])
+    domain_config = DomainConfig(domain_id="t", domain_name="T", env_file_path="", orchestrator=agent, agents=[agent])
+    ran = []
+
+    async def run_step(step, context, domain_config, digest=None, on_delta=None, **kwargs):
+        ran.append((step.step_index, context))
+        return StepResult(step_index=step.step_index, agent_name=step.agent_name, output=f"out {step.step_index}", status="success")
+
+    monkeypatch.setattr(executor, "run_step", run_step)
+    plan = Plan(steps=[Step(step_index=i, agent_name="researcher", task_description=f"task {i}") for i in (1, 2, 3)])
+    checkpoint = StepResult(step_index=1, agent_name="researcher", output="saved 1", status="success")
+    finished = []
+
+    async def on_step(sr):
+        finished.append(sr.step_index)
+
+    results = await executor.run_plan(plan, "q", domain_config, on_step=on_step, completed=[checkpoint])
+
+    assert [i for i, _ in ran] == [2, 3]
+    assert "saved 1" in ran[0][1]  # the checkpointed output feeds the next step
+    assert finished == [2, 3]
+    assert results[0] is checkpoint and [r.output for r in results[1:]] == ["out 2", "out 3"]
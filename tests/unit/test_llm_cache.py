@@ -0,0 +1,59 @@
+import threading
+import time
+
+from langchain_core.outputs import Generation
+
+from src.core import llm_cache
+from src.core.llm_cache import MemoizingLLMCache
+
+
+async def test_async_lookup_reads_sqlite_off_the_event_loop(tmp_path, monkeypatch):
+    writer = MemoizingLLMCache(sqlite_path=tmp_path / "llm.sqlite")
+    await writer.aupdate("prompt", "model", [Generation(text="answer")])
+    reader = MemoizingLLMCache(sqlite_path=tmp_path / "llm.sqlite")
+    loop_thread = threading.get_ident()
+    disk_threads = []
+    disk_get = reader._disk_get
+
+    def recording_disk_get(key):
+        disk_threads.append(threading.get_ident())
+        return disk_get(key)
+
+    monkeypatch.setattr(reader, "_disk_get", recording_disk_get)
+
+    first = await reader.alookup("prompt", "model")
+    second = await reader.alookup("prompt", "model")
+
+    assert first[0].text == second[0].text == "answer"
+    assert len(disk_threads) == 1 and disk_threads[0] != loop_thread
+    assert reader.stats()["disk_hits"] == 1 and reader.stats()["memory_hits"] == 1
+
+
+async def test_misses_without_update_do_not_accumulate(monkeypatch):
+    monkeypatch.setattr(llm_cache, "_MAX_PENDING", 3)
+    cache = MemoizingLLMCache()
+
+    for i in range(10):
+        assert await cache.alookup(f"prompt {i}", "model") is None
+
+    assert list(cache._pending) == [MemoizingLLMCache._key(f"prompt {i}", "model") for i in (7, 8, 9)]
+    await cache.aupdate("prompt 9", "model", [Generation(text="late")])
+    assert len(cache._pending) == 2
+    assert cache.stats()["misses"] == 10
+
+
+
+async def test_memory_tier_does_not_wait_for_the_disk_lock(tmp_path):
+    cache = MemoizingLLMCache(sqlite_path=tmp_path / "llm.sqlite")
+    await cache.aupdate("prompt", "model", [Generation(text="answer")])
+
+    with cache._db_lock:  # another thread is writing to SQLite or waiting on a WAL lock
+        started = time.perf_counter()
+        hit = await cache.alookup("prompt", "model")
+        cache._miss(cache._key("new prompt", "model"))
+        cache._store(cache._key("new prompt", "model"), [Generation(text="fresh")])
+        elapsed = time.perf_counter() - started
+
+    assert hit[0].text == "answer"
+    assert elapsed < 0.05
+    assert cache.stats()["memory_hits"] == 1
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.config.models import AgentConfig, DomainConfig
+from src.orchestrator import llm, planner, reporter
+
+DELAY = 0.2
+PLAN = json.dumps({"steps": [{"step_index": 1, "agent_name": "researcher", "task_description": "look it up", "depends_on": []}]})
+
+
+class SlowChain:
+    """Stands in for prompt | llm: each ainvoke sleeps, and the peak overlap is recorded."""
+
+    def __init__(self, content):
+        self.content = content
+        self.in_flight = 0
+        self.peak = 0
+
+    async def ainvoke(self, inputs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(DELAY)
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(content=self.content)
+
+
+@pytest.fixture
+def domain_config():
+    agent = AgentConfig(name="researcher", port=8001, system_prompt="", tool_names=[])
+    return DomainConfig(domain_id="test", domain_name="Test", env_file_path="", orchestrator=agent, agents=[agent])
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_limit():
+    yield
+    llm.configure_llm_concurrency(16)
+
+
+async def _timed(calls):
+    started = time.perf_counter()
+    results = await asyncio.gather(*calls)
+    return results, time.perf_counter() - started
+
+
+async def test_abuild_plan_calls_overlap(monkeypatch, domain_config):
+    chain = SlowChain(PLAN)
+    monkeypatch.setattr(planner, "_chain", lambda: chain)
+    llm.configure_llm_concurrency(16)
+
+    plans, elapsed = await _timed(planner.abuild_plan(f"query {i}", domain_config) for i in range(8))
+
+    assert all(p.steps[0].agent_name == "researcher" for p in plans)
+    assert chain.peak == 8
+    assert elapsed < 3 * DELAY  # sequential would take 8 * DELAY
+
+
+async def test_abuild_plan_respects_max_concurrent_llm_calls(monkeypatch, domain_config):
+    chain = SlowChain(PLAN)
+    monkeypatch.setattr(planner, "_chain", lambda: chain)
+    llm.configure_llm_concurrency(2)
+
+    _, elapsed = await _timed(planner.abuild_plan(f"query {i}", domain_config) for i in range(6))
+
+    assert chain.peak == 2
+    assert 3 * DELAY <= elapsed < 5 * DELAY
+    assert llm.llm_stats()["in_flight"] == 0 and llm.llm_stats()["waiting"] == 0
+
+
+async def test_planner_and_reporter_share_the_limit(monkeypatch, domain_config):
+    plan_chain, report_chain = SlowChain(PLAN), SlowChain("answer")
+    monkeypatch.setattr(planner, "_chain", lambda: plan_chain)
+    monkeypatch.setattr(reporter, "_chain", lambda: report_chain)
+    llm.configure_llm_concurrency(3)
+
+    calls = [planner.abuild_plan("q", domain_config) for _ in range(3)]
+    calls += [reporter.asynthesize_final_answer("q", []) for _ in range(3)]
+    results, elapsed = await _timed(calls)
+
+    assert results[3:] == ["answer"] * 3
+    assert 2 * DELAY <= elapsed < 4 * DELAY
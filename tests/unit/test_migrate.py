@@ -0,0 +1,69 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+_spec = importlib.util.spec_from_file_location("migrate", ROOT / "scripts" / "migrate.py")
+migrate = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(migrate)
+
+FILES = [("001_initial", "", "a" * 64), ("002_answer_cache", "", "b" * 64), ("003_jobs", "", "c" * 64)]
+
+
+def test_split_statements_ignores_semicolons_in_quotes_dollar_quotes_and_comments():
+    sql = "SELECT 'a;b''c'; DO $x$ BEGIN PERFORM 1; END $x$; /* ; */ -- ;\nSELECT \"x;\";\n-- trailing comment\n"
+
+    assert migrate.split_statements(sql) == ["SELECT 'a;b''c'", "DO $x$ BEGIN PERFORM 1; END $x$", '/* ; */ -- ;\nSELECT "x;"']
+
+
+def test_no_transaction_directive_is_found_in_shipped_migrations():
+    versions = {version: migrate.NO_TRANSACTION.search(sql) is not None for version, sql, _ in migrate.discover()}
+
+    assert versions["004_request_history_indexes"] is True
+    assert versions["005_partition_history"] is False
+    assert versions["006_step_results_request_created_at"] is True
+
+
+def test_plan_applies_only_unrecorded_files():
+    adopt, pending = migrate.plan(FILES, {"001_initial": "a" * 64})
+
+    assert adopt == []
+    assert [v for v, _, _ in pending] == ["002_answer_cache", "003_jobs"]
+
+
+def test_plan_baseline_records_files_up_to_version_without_running_them():
+    adopt, pending = migrate.plan(FILES, {}, baseline="002_answer_cache")
+
+    assert [v for v, _, _ in adopt] == ["001_initial", "002_answer_cache"]
+    assert [v for v, _, _ in pending] == ["003_jobs"]
+
+
+def test_plan_rejects_changed_or_unknown_files():
+    with pytest.raises(SystemExit, match="checksum mismatch"):
+        migrate.plan(FILES, {"001_initial": "f" * 64})
+    with pytest.raises(SystemExit, match="Unknown baseline"):
+        migrate.plan(FILES, {}, baseline="009_missing")
+
+
+def test_concurrent_indexes_names_only_the_indexes_a_file_builds():
+    statements = [
+        "-- comment\nCREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON app.requests(created_at)",
+        "create unique index concurrently idx_b on only public.t (x)",
+        "CREATE INDEX idx_plain ON app.requests(status)",
+        "DROP INDEX CONCURRENTLY IF EXISTS app.idx_old",
+        "CREATE INDEX CONCURRENTLY idx_c ON requests(id)",
+    ]
+
+    assert migrate.concurrent_indexes(statements) == [("app", "idx_a"), ("public", "idx_b"), ("app", "idx_c")]
+
+
+def test_concurrent_indexes_of_shipped_004():
+    sql = next(sql for version, sql, _ in migrate.discover() if version == "004_request_history_indexes")
+
+    assert [name for _, name in migrate.concurrent_indexes(migrate.split_statements(sql))] == [
+        "idx_requests_created_id",
+        "idx_requests_domain_created_id",
+        "idx_requests_status_created_id",
+    ]
@@ -0,0 +1,43 @@
+from typing import Any
+
+from src.core.config.models import DataSourceConfig, NamedQueryConfig, QueryParamConfig
+from src.data_access.relational.client import BoundedRows, PostgresClient
+from src.tools.rel_db.named import create_named_query_tool
+
+LEAD_TIMES = NamedQueryConfig(
+    name="supplier_lead_times",
+    description="Lead times per supplier over the last N days.",
+    sql="SELECT supplier_name FROM purchase_orders WHERE order_date >= CURRENT_DATE - $1::int",
+    params=[QueryParamConfig(name="days", type="int", description="Look-back window", default=90)],
+)
+
+
+class RecordingClient(PostgresClient):
+    def __init__(self, source_id: str):
+        super().__init__("postgresql://unused", DataSourceConfig(id=source_id, type="rel_db", engine="postgres", connection_id="UNUSED"))
+        self.calls: list[tuple[Any, ...]] = []
+
+    async def fetch_bounded(self, query: str, *args: Any, **kwargs: Any) -> BoundedRows:
+        self.calls.append(args)
+        return BoundedRows(rows=[{"supplier_name": "Acme"}])
+
+
+async def test_omitted_parameter_binds_configured_default():
+    client = RecordingClient("named_default")
+    tool = create_named_query_tool(client, LEAD_TIMES)
+
+    # Older langchain-core hands the coroutine only the keys the model supplied
+    result = await tool.coroutine()
+    await tool.ainvoke({})
+
+    assert client.calls == [(90,), (90,)]
+    assert "Acme" in result
+
+
+async def test_supplied_parameter_is_bound_and_coerced():
+    client = RecordingClient("named_supplied")
+    tool = create_named_query_tool(client, LEAD_TIMES)
+
+    await tool.ainvoke({"days": "30"})
+
+    assert client.calls == [(30,)]
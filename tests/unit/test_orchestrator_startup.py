@@ -0,0 +1,53 @@
+import uuid
+
+from src.orchestrator import main
+
+
+class Started:
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.started = False
+        Started.instances.append(self)
+
+    def start(self):
+        self.started = True
+
+
+async def test_jobs_start_when_database_is_down_at_boot(monkeypatch):
+    async def unreachable():
+        raise OSError("connection refused")
+
+    class FakePersister:
+        def start(self):
+            pass
+
+    Started.instances = []
+    monkeypatch.setenv("POSTGRES_APP_URL", "postgresql://db/app")
+    monkeypatch.setattr(main, "_init_session_pool", unreachable)
+    monkeypatch.setattr(main, "get_persister", FakePersister)
+    monkeypatch.setattr(main, "get_agent_client", lambda config: None)
+    monkeypatch.setattr(main, "configure_llm_cache", lambda config, root: None)
+    monkeypatch.setattr(main, "get_pipeline", lambda: object())
+    monkeypatch.setattr(main, "CompletionListener", Started)
+    monkeypatch.setattr(main, "JobWorker", Started)
+    monkeypatch.setattr(main, "COMPLETIONS", None)
+    monkeypatch.setattr(main, "JOB_WORKER", None)
+
+    await main.startup()
+
+    assert main.COMPLETIONS.started and main.JOB_WORKER.started
+    assert main.COMPLETIONS.args == ("postgresql://db/app",)
+
+
+def test_completion_drops_the_cached_trace(monkeypatch):
+    cache = main.TraceCache()
+    monkeypatch.setattr(main, "TRACE_CACHE", cache)
+    request_id = uuid.uuid4()
+    cache.put(request_id, b"{}", "etag")
+
+    main._discard_trace(str(request_id))
+    main._discard_trace("not-a-uuid")
+
+    assert cache.get(request_id) is None
@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.core.config.models import PersistenceConfig
+from src.core.contracts.orchestrator import Plan, Step
+from src.orchestrator import persistence
+from src.orchestrator.persistence import WriteBehindPersister
+
+
+@asynccontextmanager
+async def fake_session():
+    yield object()
+
+
+class Recorder:
+    """Replaces session.write_batch; records each committed batch as (plans, steps, finals, touches)."""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.batches = []
+        self.delay = delay
+        self.fail_on = fail_on
+
+    async def __call__(self, conn, plans, step_results, finals, touches):
+        await asyncio.sleep(self.delay)
+        if self.fail_on is not None and any(self.fail_on in row for row in (*plans, *step_results, *finals)):
+            raise ValueError("bad row")
+        self.batches.append((plans, step_results, finals, touches))
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    rec = Recorder()
+    monkeypatch.setattr(persistence, "write_batch", rec)
+    return rec
+
+
+PLAN = Plan(steps=[Step(step_index=1, agent_name="researcher", task_description="t")])
+
+
+async def _persister(**config):
+    p = WriteBehindPersister(PersistenceConfig(**config), fake_session)
+    p.start()
+    return p
+
+
+async def test_final_status_waits_for_rows_queued_before_it(recorder):
+    p = await _persister(flush_interval=10)
+    rid = uuid.uuid4()
+
+    await p.save_plan(rid, PLAN)
+    await p.save_step_result(rid, 1, "researcher", {}, "out", "success", 5)
+    await p.touch_request(rid)
+    await p.touch_request(rid)
+    assert recorder.batches == []  # buffered, flush_interval not reached
+    await p.update_request_final(rid, "completed", final_answer="done")
+
+    (plans, steps, finals, touches), = recorder.batches
+    assert [r[0] for r in plans] == [rid] and [r[:2] for r in steps] == [(rid, 1)]
+    assert finals[0][:4] == ("completed", "done", None, rid)
+    assert touches == [rid]  # duplicates collapsed
+    await p.stop()
+
+
+async def test_rows_flush_after_interval_and_batches_keep_order(recorder):
+    p = await _persister(flush_interval=0.01, batch_size=2)
+    rid = uuid.uuid4()
+
+    for i in range(5):
+        await p.save_step_result(rid, i, "researcher", {}, "out", "success", None)
+    await asyncio.sleep(0.1)
+
+    assert [[r[1] for r in steps] for _, steps, _, _ in recorder.batches] == [[0, 1], [2, 3], [4]]
+    assert p.stats()["max_batch"] == 2
+    await p.stop()
+
+
+async def test_full_queue_applies_backpressure(monkeypatch):
+    rec = Recorder(delay=0.05)
+    monkeypatch.setattr(persistence, "write_batch", rec)
+    p = await _persister(flush_interval=0, batch_size=1, queue_size=1)
+    rid = uuid.uuid4()
+
+    for i in range(4):
+        await p.save_step_result(rid, i, "researcher", {}, "out", "success", None)
+    await p.stop()
+
+    assert p.stats()["backpressure_waits"] >= 1
+    assert [steps[0][1] for _, steps, _, _ in rec.batches] == [0, 1, 2, 3]
+
+
+async def test_failed_batch_is_retried_row_by_row(monkeypatch):
+    bad = uuid.uuid4()
+    rec = Recorder(fail_on=bad)
+    monkeypatch.setattr(persistence, "write_batch", rec)
+    p = await _persister(flush_interval=10)
+    good = uuid.uuid4()
+
+    await p.save_step_result(good, 1, "researcher", {}, "out", "success", None)
+    await p.save_step_result(bad, 1, "researcher", {}, "out", "success", None)
+    await p.update_request_final(good, "completed")
+    with pytest.raises(ValueError):
+        await p.update_request_final(bad, "completed")
+
+    (_, steps, _, _), (_, _, finals, _) = rec.batches
+    assert [r[0] for r in steps] == [good] and [r[3] for r in finals] == [good]
+    assert p.stats()["failed_rows"] == 2
+    await p.stop()
+
+
+async def test_stop_drains_queue_and_later_writes_go_direct(recorder):
+    p = await _persister(flush_interval=0.05)
+    rid = uuid.uuid4()
+    await p.save_plan(rid, PLAN)
+
+    await p.stop()
+    assert len(recorder.batches) == 1 and not p.running
+    await p.touch_request(rid)
+
+    assert recorder.batches[-1] == ([], [], [], [rid])
+
+
+async def test_disabled_writes_each_row_directly(recorder):
+    p = await _persister(enabled=False)
+
+    await p.save_plan(uuid.uuid4(), PLAN)
+
+    assert p._task is None and len(recorder.batches) == 1
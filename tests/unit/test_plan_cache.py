@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from src.core.config.models import AgentConfig, DomainConfig, PlanCacheConfig
+from src.core.contracts.orchestrator import Plan, Step
+from src.orchestrator.plan_cache import PlanCache
+
+DIM = 1536
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings: each query maps to a fixed direction; "near" variants sit close to it."""
+
+    def __init__(self):
+        self.vectors = {}
+
+    def _vector(self, text):
+        base = text.removesuffix(" please")
+        if base not in self.vectors:
+            self.vectors[base] = np.random.default_rng(len(self.vectors)).standard_normal(DIM)
+        v = self.vectors[base]
+        return list(v + 0.05 * np.ones(DIM) if text != base else v)
+
+    async def aembed_query(self, text):
+        return self._vector(text)
+
+    async def aembed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+
+@pytest.fixture
+def domain_config():
+    agents = [AgentConfig(name=n, port=8001, system_prompt="", tool_names=[]) for n in ("researcher", "analyst")]
+    return DomainConfig(domain_id="test", domain_name="Test", env_file_path="", orchestrator=agents[0], agents=agents)
+
+
+def _cache(**config):
+    cache = PlanCache(PlanCacheConfig(similarity_threshold=0.9, **config))
+    cache._embeddings = FakeEmbeddings()
+    return cache
+
+
+def _plan(agent):
+    return Plan(steps=[Step(step_index=1, agent_name=agent, task_description="t")])
+
+
+async def _remember(cache, query, agent, domain_config):
+    plan, vector = await cache.lookup(query, domain_config)
+    assert plan is None
+    cache.put(query, domain_config, _plan(agent), vector)
+
+
+async def test_semantic_hit_picks_the_most_similar_plan(domain_config):
+    cache = _cache()
+    for i in range(50):
+        await _remember(cache, f"query {i}", "analyst", domain_config)
+    await _remember(cache, "count failed batches", "researcher", domain_config)
+
+    plan, vector = await cache.lookup("count failed batches please", domain_config)
+
+    assert plan.from_cache and plan.steps[0].agent_name == "researcher"
+    assert isinstance(vector, np.ndarray) and vector.shape == (DIM,)
+    assert cache.stats()["semantic_hits"] == 1
+
+
+async def test_semantic_scan_is_bounded_to_recent_entries(domain_config):
+    cache = _cache(max_semantic_scan=10)
+    await _remember(cache, "count failed batches", "researcher", domain_config)
+    for i in range(10):
+        await _remember(cache, f"query {i}", "analyst", domain_config)
+
+    plan, _ = await cache.lookup("count failed batches please", domain_config)
+
+    assert plan is None  # the matching plan is older than the 10 most recent
+    assert cache._semantic_index(PlanCache.scope(domain_config))[1].shape == (10, DIM)
+
+
+async def test_index_follows_evictions(domain_config):
+    cache = _cache(max_entries=3)
+    await _remember(cache, "count failed batches", "researcher", domain_config)
+    for i in range(3):
+        await _remember(cache, f"query {i}", "analyst", domain_config)
+
+    plan, _ = await cache.lookup("count failed batches please", domain_config)
+
+    assert plan is None
+    keys, matrix = cache._semantic_index(PlanCache.scope(domain_config))
+    assert len(keys) == matrix.shape[0] == 3 and set(keys) <= set(cache._entries)
@@ -0,0 +1,76 @@
+import datetime
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+
+from src.orchestrator import main
+from src.orchestrator.session import list_requests
+
+T0 = datetime.datetime(2026, 3, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+
+
+def test_cursor_round_trip_keeps_microseconds_and_offset():
+    request_id = uuid.uuid4()
+
+    cursor = main._encode_cursor(T0, str(request_id))
+
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert main._decode_cursor(cursor) == (T0, request_id)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm8tc2VwYXJhdG9y", main._encode_cursor(T0, "not-a-uuid")])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        main._decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+class RecordingConn:
+    def __init__(self):
+        self.sql = None
+        self.args = None
+
+    async def fetch(self, sql, *args):
+        self.sql, self.args = sql, args
+        return []
+
+
+async def test_list_requests_keyset_clause_binds_cursor_after_filters():
+    conn = RecordingConn()
+    after = (T0, uuid.uuid4())
+
+    await list_requests(conn, "manufacturing", ["failed", "partial"], after=after, limit=3)
+
+    assert "(created_at, id) < ($3, $4)" in conn.sql and "LIMIT $5" in conn.sql
+    assert conn.args == ("manufacturing", ["failed", "partial"], T0, after[1], 3)
+
+
+async def test_pages_follow_next_cursor_without_gaps_or_repeats(monkeypatch):
+    rows = [
+        {"request_id": str(uuid.uuid4()), "created_at": T0 - datetime.timedelta(seconds=i // 2)}
+        for i in range(5)
+    ]  # pairs share a created_at, so the id breaks the tie
+    rows.sort(key=lambda r: (r["created_at"], r["request_id"]), reverse=True)
+
+    async def fake_list_requests(conn, domain_id, statuses, since, until, after, limit):
+        older = [r for r in rows if after is None or (r["created_at"], uuid.UUID(r["request_id"])) < after]
+        return older[:limit]
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    monkeypatch.setattr(main, "list_requests", fake_list_requests)
+    monkeypatch.setattr(main, "_session", fake_session)
+
+    seen, cursor = [], None
+    while True:
+        page = await main.list_request_history(cursor=cursor, limit=2)
+        seen += [r["request_id"] for r in page["requests"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [r["request_id"] for r in rows]
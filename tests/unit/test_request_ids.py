@@ -0,0 +1,39 @@
+import datetime
+import uuid
+
+from src.orchestrator.session import created_at_bounds, new_request_id, request_created_at
+
+
+def test_new_request_id_is_uuid7_carrying_its_creation_time():
+    before = datetime.datetime.now(datetime.timezone.utc)
+    request_id = new_request_id()
+    after = datetime.datetime.now(datetime.timezone.utc)
+
+    assert request_id.version == 7
+    assert request_id.variant == uuid.RFC_4122
+    created_at = request_created_at(request_id)
+    assert before - datetime.timedelta(milliseconds=1) <= created_at <= after
+    assert created_at.microsecond % 1000 == 0
+
+
+def test_new_request_ids_are_unique_and_time_ordered():
+    ids = [new_request_id() for _ in range(1000)]
+
+    assert len(set(ids)) == len(ids)
+    created = [request_created_at(i) for i in ids]
+    assert created == sorted(created)
+
+
+def test_created_at_bounds_pin_uuid7_ids_to_one_instant():
+    request_id = new_request_id()
+
+    lo, hi = created_at_bounds(request_id)
+
+    assert lo == hi == request_created_at(request_id)
+
+
+def test_created_at_bounds_leave_legacy_ids_unbounded():
+    lo, hi = created_at_bounds(uuid.uuid4())
+
+    assert lo.year == 1 and hi.year == 9999
+    assert request_created_at(uuid.uuid4()) is None